@@ -1,17 +1,29 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
 from typing import Literal
 
-from fastapi import APIRouter, Depends, Header, HTTPException, Query, status
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, status
+from fastapi.responses import PlainTextResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import settings
-from app.db.session import get_db
+from app.core.metrics import worker_id
+from app.db.session import get_db, pool_status
+from app.models.user import User
+from app.repositories.broadcast_repo import BroadcastRepository
+from app.repositories.outbox_repo import OutboxRepository
 from app.repositories.query_log_repo import QueryLogRepository
 from app.repositories.user_repo import UserRepository
-from app.services.google_sheets_sync import GoogleSheetsSyncService
-from app.services.limits import reset_daily_limits, reset_monthly_limits
+from app.schemas.admin import BroadcastCreate, BulkUserOperation
+from app.services.limits import daily_reset_values, monthly_reset_values, reset_daily_limits, reset_monthly_limits
+from app.services.loop_monitor import loop_monitor
+from app.services.user_import import UserImportService, iter_lines
 
 router = APIRouter(prefix="/admin", tags=["admin"])
 
+# One profiling session at a time per process.
+_profile_lock = asyncio.Lock()
+
 
 def verify_admin_token(x_admin_token: str | None = Header(default=None)) -> None:
     if x_admin_token != settings.admin_token:
@@ -91,6 +103,15 @@ async def admin_list_query_logs(
                 "total_tokens": item.total_tokens,
                 "status": item.status,
                 "error_message": item.error_message,
+                "db_statements": item.db_statements,
+                "db_rows_affected": item.db_rows_affected,
+                "db_time_ms": item.db_time_ms,
+                "model": item.model,
+                "queue_wait_ms": item.queue_wait_ms,
+                "upstream_ms": item.upstream_ms,
+                "ttfb_ms": item.ttfb_ms,
+                "telegram_ms": item.telegram_ms,
+                "total_ms": item.total_ms,
                 "created_at": item.created_at,
             }
             for item in logs
@@ -98,6 +119,22 @@ async def admin_list_query_logs(
     }
 
 
+@router.get("/query-logs/latency", dependencies=[Depends(verify_admin_token)])
+async def admin_query_log_latency(
+    since: datetime | None = Query(default=None),
+    until: datetime | None = Query(default=None),
+    action: str | None = Query(default=None),
+    db: AsyncSession = Depends(get_db),
+) -> dict:
+    # Naive datetimes are read as UTC.
+    until = (until or datetime.now(timezone.utc)).replace(tzinfo=(until and until.tzinfo) or timezone.utc)
+    since = since.replace(tzinfo=since.tzinfo or timezone.utc) if since else until - timedelta(hours=24)
+    if since >= until:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="since must be before until")
+    items = await QueryLogRepository(db).latency_summary(since=since, until=until, action=action)
+    return {"since": since, "until": until, "items": items}
+
+
 @router.get("/stats", dependencies=[Depends(verify_admin_token)])
 async def admin_stats(db: AsyncSession = Depends(get_db)) -> dict:
     user_stats = await UserRepository(db).get_stats()
@@ -203,11 +240,68 @@ async def admin_grant_image_credits(
     }
 
 
+def _bulk_values(operation: BulkUserOperation) -> dict:
+    if operation.action == "set_plan":
+        return {"plan": "pro" if operation.plan == "paid" else operation.plan}
+    if operation.action in {"ban", "unban"}:
+        return {"is_banned": operation.action == "ban"}
+    if operation.action == "grant_image_credits":
+        return {"bonus_image_credits": User.bonus_image_credits + operation.amount}
+
+    values = {}
+    if operation.scope in {"daily", "all"}:
+        values.update(daily_reset_values())
+    if operation.scope in {"monthly", "all"}:
+        values.update(monthly_reset_values())
+    return values
+
+
+@router.post("/users/bulk", dependencies=[Depends(verify_admin_token)])
+async def admin_bulk_users(operation: BulkUserOperation, db: AsyncSession = Depends(get_db)) -> dict:
+    user_filter = operation.filter
+    affected = await UserRepository(db).bulk_update(
+        _bulk_values(operation),
+        telegram_ids=operation.telegram_ids,
+        search=user_filter.search if user_filter else None,
+        plan=user_filter.plan if user_filter else None,
+        is_banned=user_filter.is_banned if user_filter else None,
+    )
+    await db.commit()
+    return {"ok": True, "action": operation.action, "affected": affected}
+
+
+@router.post("/users/import", dependencies=[Depends(verify_admin_token)])
+async def admin_import_users(
+    request: Request,
+    format: Literal["csv", "ndjson"] = Query(default="csv"),
+    db: AsyncSession = Depends(get_db),
+) -> dict:
+    try:
+        result = await UserImportService(db).import_lines(iter_lines(request.stream()), format)
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
+
+    return {
+        "ok": True,
+        "format": format,
+        "rows_read": result.rows_read,
+        "rows_rejected": result.rows_rejected,
+        "distinct_users": result.distinct_users,
+        "created": result.created,
+        "updated": result.updated,
+        "elapsed_seconds": result.elapsed_seconds,
+        "rows_per_sec": result.rows_per_sec,
+    }
+
+
 @router.post("/sync/google-sheets", dependencies=[Depends(verify_admin_token)])
 async def admin_google_sheets_sync(
     direction: Literal["push", "pull", "both"] = Query(default="both"),
     db: AsyncSession = Depends(get_db),
 ) -> dict:
+    # Optional integrations are imported on first use so webhook workers never load them.
+    from app.services.google_sheets_sync import GoogleSheetsSyncService
+
     service = GoogleSheetsSyncService(db)
     try:
         if direction == "push":
@@ -225,4 +319,138 @@ async def admin_google_sheets_sync(
         "pulled_updated": result.pulled_updated,
         "pulled_created": result.pulled_created,
         "pushed_rows": result.pushed_rows,
+        "push_mode": result.push_mode,
+        "pulled_rows": result.pulled_rows,
+        "pull_rows_per_sec": result.pull_rows_per_sec,
     }
+
+
+@router.get("/sync/outbox", dependencies=[Depends(verify_admin_token)])
+async def admin_outbox_status(db: AsyncSession = Depends(get_db)) -> dict:
+    return {"enabled": settings.outbox_sync_enabled, "sinks": await OutboxRepository(db).get_status()}
+
+
+@router.get("/db/pool", dependencies=[Depends(verify_admin_token)])
+async def admin_db_pool() -> dict:
+    return {"worker": worker_id(), **pool_status()}
+
+
+@router.get("/loop/stalls", dependencies=[Depends(verify_admin_token)])
+async def admin_loop_stalls() -> dict:
+    return {
+        "worker": worker_id(),
+        "enabled": loop_monitor.enabled,
+        "stall_threshold_ms": round(loop_monitor.stall_threshold * 1000),
+        "lag_seconds": loop_monitor.quantiles(),
+        "stalls": list(reversed(loop_monitor.stalls)),
+    }
+
+
+@router.post("/profile/cpu", dependencies=[Depends(verify_admin_token)])
+async def admin_profile_cpu(
+    seconds: float = Query(default=10, gt=0, le=120),
+    interval_ms: float = Query(default=10, ge=1, le=1000),
+    include_idle: bool = Query(default=False),
+    top: int = Query(default=30, ge=1, le=500),
+    format: Literal["json", "collapsed"] = Query(default="json"),
+):
+    if _profile_lock.locked():
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="A profile is already running")
+    from app.services.profiler import SamplingProfiler, loop_entry
+
+    async with _profile_lock:
+        profiler = SamplingProfiler(interval_seconds=interval_ms / 1000, include_idle=include_idle, loop=loop_entry())
+        result = await asyncio.to_thread(profiler.run, seconds)
+
+    if format == "collapsed":
+        return PlainTextResponse(result.collapsed(), headers={"X-Worker": worker_id()})
+    return {
+        "worker": worker_id(),
+        "seconds": result.duration_seconds,
+        "interval_ms": interval_ms,
+        "samples": result.samples,
+        "idle_samples": result.idle_samples,
+        "top": result.top(top),
+        "collapsed": result.collapsed(),
+    }
+
+
+@router.post("/profile/memory", dependencies=[Depends(verify_admin_token)])
+async def admin_profile_memory(
+    seconds: float = Query(default=10, gt=0, le=300),
+    frames: int = Query(default=1, ge=1, le=25),
+    group_by: Literal["lineno", "filename", "traceback"] = Query(default="lineno"),
+    top: int = Query(default=30, ge=1, le=500),
+) -> dict:
+    if _profile_lock.locked():
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="A profile is already running")
+    from app.services.profiler import finish_memory_trace, start_memory_trace
+
+    async with _profile_lock:
+        # Snapshots walk every live allocation, so take them off the event loop.
+        before, started_here = await asyncio.to_thread(start_memory_trace, frames)
+        try:
+            await asyncio.sleep(seconds)
+        finally:
+            report = await asyncio.to_thread(finish_memory_trace, before, started_here, group_by, top)
+    return {"worker": worker_id(), "seconds": seconds, "group_by": group_by, **report}
+
+
+def _broadcast_to_dict(item) -> dict:
+    processed = item.sent_count + item.blocked_count + item.failed_count
+    return {
+        "id": item.id,
+        "text": item.text,
+        "status": item.status,
+        "filter": {"search": item.filter_search, "plan": item.filter_plan, "is_banned": item.filter_is_banned},
+        "total_recipients": item.total_recipients,
+        "sent": item.sent_count,
+        "blocked": item.blocked_count,
+        "failed": item.failed_count,
+        "progress": round(processed / item.total_recipients, 4) if item.total_recipients else 1.0,
+        "created_at": item.created_at,
+        "finished_at": item.finished_at,
+    }
+
+
+@router.post("/broadcasts", dependencies=[Depends(verify_admin_token)])
+async def admin_create_broadcast(payload: BroadcastCreate, db: AsyncSession = Depends(get_db)) -> dict:
+    user_filter = payload.filter
+    total = await UserRepository(db).count_users(
+        search=user_filter.search, plan=user_filter.plan, is_banned=user_filter.is_banned
+    )
+    item = await BroadcastRepository(db).create(
+        text=payload.text,
+        total_recipients=total,
+        search=user_filter.search,
+        plan=user_filter.plan,
+        is_banned=user_filter.is_banned,
+    )
+    await db.commit()
+    return {"ok": True, "broadcast": _broadcast_to_dict(item)}
+
+
+@router.get("/broadcasts", dependencies=[Depends(verify_admin_token)])
+async def admin_list_broadcasts(
+    limit: int = Query(default=20, ge=1, le=200),
+    db: AsyncSession = Depends(get_db),
+) -> dict:
+    items = await BroadcastRepository(db).list_broadcasts(limit=limit)
+    return {"items": [_broadcast_to_dict(item) for item in items]}
+
+
+@router.post("/broadcasts/{broadcast_id}/{action}", dependencies=[Depends(verify_admin_token)])
+async def admin_control_broadcast(
+    broadcast_id: int,
+    action: Literal["pause", "resume", "cancel"],
+    db: AsyncSession = Depends(get_db),
+) -> dict:
+    next_status, from_statuses = {
+        "pause": ("paused", ("running",)),
+        "resume": ("running", ("paused",)),
+        "cancel": ("cancelled", ("running", "paused")),
+    }[action]
+    if not await BroadcastRepository(db).set_status(broadcast_id, next_status, from_statuses):
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=f"Cannot {action} this broadcast")
+    await db.commit()
+    return {"ok": True, "status": next_status}
@@ -87,12 +87,32 @@ async def crm_page() -> str:
     <button class="btn" onclick="syncSheets('both')">Sheets Both</button>
   </div>
 
+  <div class="row">
+    <span class="muted" id="selectedInfo">Вибрано: 0</span>
+    <label class="muted"><input type="checkbox" id="bulkFilter" style="min-width:auto" /> застосувати до всього фільтру</label>
+    <button class="btn" onclick="bulk('set_plan', {plan:'free'})">FREE</button>
+    <button class="btn" onclick="bulk('set_plan', {plan:'student'})">STUDENT</button>
+    <button class="btn" onclick="bulk('set_plan', {plan:'pro'})">PRO</button>
+    <button class="btn" onclick="bulk('ban')">BAN</button>
+    <button class="btn" onclick="bulk('unban')">UNBAN</button>
+    <button class="btn" onclick="bulk('reset_limits', {scope:'daily'})">reset day</button>
+    <button class="btn" onclick="bulk('reset_limits', {scope:'monthly'})">reset month</button>
+    <button class="btn" onclick="bulk('grant_image_credits', {amount:5})">+5 img</button>
+  </div>
+
+  <div class="row">
+    <textarea id="broadcastText" rows="3" maxlength="4096" placeholder="Текст розсилки" style="flex:1"></textarea>
+    <button class="btn primary" onclick="createBroadcast()">Розсилка за фільтром</button>
+  </div>
+  <div class="muted" id="broadcasts"></div>
+
   <div class="muted" id="totalInfo"></div>
 
   <div class="table-wrap">
     <table id="usersTable">
       <thead>
         <tr>
+          <th><input type="checkbox" id="selectAll" style="min-width:auto" onchange="toggleAll(this.checked)" /></th>
           <th>telegram_id</th><th>username</th><th>lang</th><th>plan</th><th>banned</th>
           <th>price_usd</th><th>req_m</th><th>tok_m</th><th>img_m</th><th>photo_m</th><th>long_m</th><th>bonus_img</th><th>created</th><th>actions</th>
         </tr>
@@ -162,6 +182,7 @@ async function loadUsers(){
 
   const rows = data.items.map(u => `
     <tr>
+      <td><input type="checkbox" class="sel" value="${u.telegram_id}" style="min-width:auto" onchange="updateSelected()" /></td>
       <td>${u.telegram_id}</td>
       <td>${u.username ?? ''}</td>
       <td>${u.language}</td>
@@ -180,6 +201,68 @@ async function loadUsers(){
   `).join('');
 
   document.querySelector('#usersTable tbody').innerHTML = rows;
+  $('selectAll').checked = false;
+  updateSelected();
+}
+
+function currentFilter(){
+  const f = {};
+  if($('search').value.trim()) f.search = $('search').value.trim();
+  if($('plan').value) f.plan = $('plan').value;
+  if($('banned').value) f.is_banned = $('banned').value === 'true';
+  return f;
+}
+
+function selectedIds(){ return [...document.querySelectorAll('.sel:checked')].map(c => Number(c.value)); }
+function updateSelected(){ $('selectedInfo').textContent = `Вибрано: ${selectedIds().length}`; }
+function toggleAll(checked){ document.querySelectorAll('.sel').forEach(c => { c.checked = checked; }); updateSelected(); }
+
+async function bulk(action, params={}){
+  const body = { action, ...params };
+  if($('bulkFilter').checked){
+    body.filter = currentFilter();
+    if(!Object.keys(body.filter).length){
+      if(!confirm(`Фільтр порожній: ${action} для ВСІХ користувачів?`)) return;
+      body.all = true;
+    }
+  } else {
+    body.telegram_ids = selectedIds();
+    if(!body.telegram_ids.length){ setStatus('Нічого не вибрано', true); return; }
+  }
+  try {
+    const r = await api('/admin/users/bulk', { method:'POST', body: JSON.stringify(body) });
+    setStatus(`Bulk ${action}: ${r.affected}`);
+    await loadAll();
+  } catch(e){
+    setStatus(String(e.message || e), true);
+  }
+}
+
+async function createBroadcast(){
+  const text = $('broadcastText').value.trim();
+  if(!text){ setStatus('Порожній текст розсилки', true); return; }
+  const filter = { is_banned: false, ...currentFilter() };
+  try {
+    const r = await api('/admin/broadcasts', { method:'POST', body: JSON.stringify({ text, filter }) });
+    $('broadcastText').value = '';
+    setStatus(`Розсилка #${r.broadcast.id}: ${r.broadcast.total_recipients} отримувачів`);
+    await loadBroadcasts();
+  } catch(e){
+    setStatus(String(e.message || e), true);
+  }
+}
+
+async function controlBroadcast(id, action){ await api(`/admin/broadcasts/${id}/${action}`, { method:'POST' }); await loadBroadcasts(); }
+
+async function loadBroadcasts(){
+  const r = await api('/admin/broadcasts?limit=5');
+  $('broadcasts').innerHTML = r.items.map(b => `
+    <div>#${b.id} [${b.status}] ${Math.round(b.progress * 100)}% — sent ${b.sent}, blocked ${b.blocked}, failed ${b.failed} / ${b.total_recipients}
+      ${b.status === 'running' ? `<button class="btn" onclick="controlBroadcast(${b.id}, 'pause')">pause</button>` : ''}
+      ${b.status === 'paused' ? `<button class="btn" onclick="controlBroadcast(${b.id}, 'resume')">resume</button>` : ''}
+      ${['running', 'paused'].includes(b.status) ? `<button class="btn" onclick="controlBroadcast(${b.id}, 'cancel')">cancel</button>` : ''}
+    </div>
+  `).join('');
 }
 
 async function setPlan(id, plan){ await api(`/admin/users/${id}/plan/${plan}`, { method:'POST' }); await loadAll(); }
@@ -188,13 +271,13 @@ async function resetLimits(id, scope){ await api(`/admin/users/${id}/reset-limit
 async function addCredits(id, amount){ await api(`/admin/users/${id}/grant-image-credits?amount=${amount}`, { method:'POST' }); await loadAll(); }
 async function syncSheets(direction){
   const r = await api(`/admin/sync/google-sheets?direction=${direction}`, { method:'POST' });
-  setStatus(`Sheets ${direction}: push=${r.pushed_rows}, pull_upd=${r.pulled_updated}, pull_new=${r.pulled_created}`);
+  setStatus(`Sheets ${direction}: push=${r.pushed_rows}${r.push_mode ? ` (${r.push_mode})` : ''}, pull_upd=${r.pulled_updated}, pull_new=${r.pulled_created}`);
   await loadAll();
 }
 
 async function loadAll(){
   try {
-    await Promise.all([loadStats(), loadUsers()]);
+    await Promise.all([loadStats(), loadUsers(), loadBroadcasts()]);
     setStatus('Оновлено');
   } catch(e){
     setStatus(String(e.message || e), true);
@@ -1,4 +1,7 @@
 from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+
+from app.services.readiness import readiness
 
 router = APIRouter(tags=["health"])
 
@@ -6,3 +9,9 @@ router = APIRouter(tags=["health"])
 @router.get("/health")
 async def health() -> dict[str, str]:
     return {"status": "ok"}
+
+
+@router.get("/health/ready")
+async def health_ready() -> JSONResponse:
+    ok, report = await readiness.check()
+    return JSONResponse(report, status_code=200 if ok else 503)
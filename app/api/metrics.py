@@ -0,0 +1,32 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from app.core.metrics import (
+    db_pool_connections,
+    db_pool_wait_seconds,
+    db_pool_waits,
+    recorder_buffered,
+    registry,
+)
+from app.db.session import pool_status
+from app.services.loop_monitor import loop_monitor
+from app.services.update_recorder import update_recorder
+
+router = APIRouter(tags=["metrics"])
+
+
+def _collect_gauges() -> None:
+    pool = pool_status()
+    db_pool_connections.set(pool["size"], "size")
+    db_pool_connections.set(pool["checked_out"], "checked_out")
+    db_pool_connections.set(pool["overflow"], "overflow")
+    db_pool_waits.set(pool["waits"])
+    db_pool_wait_seconds.set(pool["wait_seconds_total"])
+    recorder_buffered.set(len(update_recorder.buffer))
+    loop_monitor.export()
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def metrics() -> PlainTextResponse:
+    _collect_gauges()
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
@@ -1,20 +1,58 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.ext.asyncio import AsyncSession
+import secrets
+
+from fastapi import APIRouter, HTTPException, Request, Response, status
 
 from app.core.config import settings
-from app.db.session import get_db
-from app.schemas.telegram import TelegramUpdate
+from app.core.metrics import webhook_seconds, webhooks_in_flight
+from app.core.timings import RequestTimings
+from app.db.session import SessionLocal
+from app.db.statement_stats import report_statement_stats, track_statements
 from app.services.bot_logic import BotService
+from app.services.drain import drain
 from app.services.telegram_api import TelegramAPI
+from app.services.update_parser import MalformedUpdate, parse_update
+from app.services.update_recorder import update_recorder
 
 router = APIRouter(prefix="/telegram", tags=["telegram"])
 
 
 @router.post("/webhook/{secret}")
-async def telegram_webhook(secret: str, update: TelegramUpdate, db: AsyncSession = Depends(get_db)) -> dict[str, bool]:
-    if secret != settings.telegram_webhook_secret:
+async def telegram_webhook(secret: str, request: Request, response: Response) -> dict:
+    if not secrets.compare_digest(secret, settings.telegram_webhook_secret):
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Invalid webhook secret")
+    if drain.draining:
+        # Telegram redelivers on a non-2xx answer, so the update is handled by the next process instead.
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Shutting down")
+
+    timings = RequestTimings()
+    body = await request.body()
+    update_recorder.record(body)
+    try:
+        update = parse_update(body)
+    except MalformedUpdate:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Malformed update")
+    if update is None:
+        # An update type the bot ignores: acknowledge it without opening a DB session.
+        return {"ok": True}
 
-    bot = BotService(db=db, telegram_api=TelegramAPI(settings.telegram_bot_token))
-    await bot.handle_update(update)
+    update_type = "callback_query" if update.callback_query else "message"
+    webhooks_in_flight.inc()
+    try:
+        with webhook_seconds.time(update_type), track_statements() as stats:
+            async with SessionLocal() as db:
+                bot = BotService(
+                    db=db,
+                    telegram_api=TelegramAPI(settings.telegram_bot_token),
+                    defer_replies=True,
+                    timings=timings,
+                )
+                deferred = await bot.handle_update(update)
+    finally:
+        webhooks_in_flight.dec()
+    request.state.db_stats = stats
+    response.headers["Server-Timing"] = f'db;dur={stats.db_ms};desc="{stats.statements} statements, {stats.rows_affected} rows affected"'
+    report_statement_stats(update.update_id, stats)
+    if deferred:
+        # Telegram executes one Bot API method carried in the webhook response body.
+        return deferred.as_webhook_response()
     return {"ok": True}
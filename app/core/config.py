@@ -1,3 +1,4 @@
+from pydantic import Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -9,11 +10,36 @@ class Settings(BaseSettings):
 
     database_url: str
     redis_url: str = ""
+    leader_key: str = "student-bot:leader"
+    leader_lease_seconds: float = 15.0
+    leader_renew_seconds: float = 5.0
+    db_statement_warn_threshold: int = 25
+    db_pool_warm_connections: int = 5
+    readiness_upstream_ttl_seconds: float = 30.0
+    readiness_require_upstreams: bool = False
+    shutdown_drain_seconds: float = 20.0
 
     telegram_bot_token: str
     telegram_webhook_secret: str
     telegram_webhook_url: str = ""
+    telegram_api_base_url: str = "https://api.telegram.org"
+    telegram_global_rate_per_sec: float = Field(default=30.0, gt=0)
+    telegram_global_burst: int = Field(default=30, ge=1)
+    telegram_chat_rate_per_sec: float = Field(default=1.0, gt=0)
+    telegram_chat_burst: int = Field(default=3, ge=1)
+    telegram_max_retries: int = 3
+    update_recorder_enabled: bool = False
+    update_recorder_dir: str = "recordings"
+    update_recorder_segment_seconds: int = 600
+    update_recorder_salt: str = ""
+    poller_timeout_seconds: int = 30
+    poller_batch_size: int = 100
+    poller_concurrency: int = 40
+    loop_monitor_enabled: bool = False
+    loop_monitor_interval_seconds: float = 0.1
+    loop_monitor_stall_ms: int = 200
     openai_api_key: str = ""
+    openai_base_url: str = "https://api.openai.com/v1"
     openai_model: str = "gpt-4.1-mini"
     openai_image_model: str = "gpt-image-1"
     student_price_usd: int = 9
@@ -21,6 +47,12 @@ class Settings(BaseSettings):
     google_sheets_id: str = ""
     google_sheets_worksheet: str = "users"
     google_service_account_file: str = "credentials/google-service-account.json"
+    broadcast_worker_enabled: bool = True
+    broadcast_rate_per_sec: float = Field(default=25.0, gt=0)
+    broadcast_concurrency: int = Field(default=20, ge=1)
+    outbox_sync_enabled: bool = False
+    outbox_poll_interval_seconds: float = 5.0
+    outbox_batch_size: int = 1000
 
     admin_token: str
     default_timezone: str = "Europe/Kyiv"
@@ -322,6 +322,14 @@ I18N = {
         "pl": "Nie udało się wygenerować obrazu. Spróbuj innego opisu.",
         "es": "No se pudo generar la imagen. Prueba otro prompt.",
     },
+    "restart_error": {
+        "uk": "Бот перезапускається, запит скасовано без списання ліміту. Надішли його ще раз за хвилину.",
+        "en": "The bot is restarting; your request was cancelled and not counted. Please send it again in a minute.",
+        "ru": "Бот перезапускается, запрос отменён без списания лимита. Отправь его ещё раз через минуту.",
+        "kk": "Бот қайта іске қосылуда, сұрау лимитті азайтпай тоқтатылды. Бір минуттан кейін қайта жібер.",
+        "pl": "Bot się restartuje; prośba została anulowana i nie wliczona do limitu. Wyślij ją ponownie za minutę.",
+        "es": "El bot se está reiniciando; tu solicitud se canceló y no cuenta en el límite. Envíala de nuevo en un minuto.",
+    },
     "photo_analysis_prompt_request": {
         "uk": "Надішли фото та, за бажанням, підпис із питанням (наприклад: 'поясни цю задачу').",
         "en": "Send a photo and optionally add a caption question (for example: 'explain this task').",
@@ -357,8 +365,35 @@ I18N = {
 }
 
 
+MENU_KEYS = (
+    "menu_explain",
+    "menu_solve",
+    "menu_summary",
+    "menu_image",
+    "menu_photo_analysis",
+    "menu_long_text",
+    "menu_limit",
+    "menu_invite",
+    "menu_subscription",
+    "menu_language",
+)
+
+# Compiled once at import: (key, language) -> text with the fallback language already applied.
+CATALOG: dict[tuple[str, str], str] = {
+    (key, lang): values.get(lang, values[FALLBACK_LANGUAGE])
+    for key, values in I18N.items()
+    for lang in SUPPORTED_LANGUAGES
+}
+
+# Reverse index over every menu label in every language: text -> (menu key, language).
+MENU_INDEX: dict[str, tuple[str, str]] = {}
+for _key in MENU_KEYS:
+    for _lang, _text in I18N[_key].items():
+        MENU_INDEX.setdefault(_text, (_key, _lang))
+
+
 def t(key: str, lang: str) -> str:
-    language = lang if lang in SUPPORTED_LANGUAGES else FALLBACK_LANGUAGE
-    if key not in I18N:
-        return key
-    return I18N[key].get(language, I18N[key][FALLBACK_LANGUAGE])
+    text = CATALOG.get((key, lang))
+    if text is None:
+        return CATALOG.get((key, FALLBACK_LANGUAGE), key)
+    return text
@@ -0,0 +1,189 @@
+import os
+import socket
+import time
+from bisect import bisect_left
+from collections.abc import Iterator
+from contextlib import contextmanager
+
+# Seconds; covers fast DB round trips up to long image generations.
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55)
+LAG_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names: tuple[str, ...], values: tuple, *extra: str) -> str:
+    parts = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    parts.extend(part for part in extra if part)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def worker_id() -> str:
+    # Each uvicorn worker keeps its own registry; this names the process a scrape or admin answer came from.
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+# Hand-rolled instead of prometheus_client: plain dict updates on the event loop thread, no locks,
+# about a microsecond per observation. Label values are passed positionally in declaration order.
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str, labels: tuple[str, ...] = ()):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = labels
+        self.values: dict[tuple, float] = {}
+
+    def inc(self, *labels, amount: float = 1) -> None:
+        self.values[labels] = self.values.get(labels, 0) + amount
+
+    def set(self, value: float, *labels) -> None:
+        # For totals kept elsewhere (e.g. pool stats), copied in at scrape time.
+        self.values[labels] = value
+
+    def samples(self, const: str = "") -> Iterator[str]:
+        for labels, value in self.values.items():
+            yield f"{self.name}{_labels(self.label_names, labels, const)} {_number(value)}"
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, *labels, amount: float = 1) -> None:
+        self.values[labels] = self.values.get(labels, 0) - amount
+
+
+class Histogram:
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help_text: str,
+        labels: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = LATENCY_BUCKETS,
+    ):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = labels
+        self.buckets = buckets
+        # Per label set: [count per bucket..., count above the last bucket, sum].
+        self.series: dict[tuple, list[float]] = {}
+
+    def observe(self, value: float, *labels) -> None:
+        series = self.series.get(labels)
+        if series is None:
+            series = self.series[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+        series[bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+
+    @contextmanager
+    def time(self, *labels) -> Iterator[None]:
+        started_at = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started_at, *labels)
+
+    def samples(self, const: str = "") -> Iterator[str]:
+        for labels, series in self.series.items():
+            cumulative = 0
+            for bound, count in zip((*self.buckets, float("inf")), series):
+                cumulative += count
+                le = 'le="' + _number(bound) + '"'
+                yield f"{self.name}_bucket{_labels(self.label_names, labels, const, le)} {cumulative}"
+            yield f"{self.name}_sum{_labels(self.label_names, labels, const)} {_number(series[-1])}"
+            yield f"{self.name}_count{_labels(self.label_names, labels, const)} {cumulative}"
+
+
+class Registry:
+    def __init__(self):
+        self.metrics: list[Counter | Histogram] = []
+
+    def register(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        # Every series carries worker="host:pid": scrapes land on a random worker, and without the label
+        # Prometheus would read another worker's lower counters as a reset.
+        const = f'worker="{_escape(worker_id())}"'
+        lines = []
+        for metric in self.metrics:
+            lines.append(f"# HELP {metric.name} {metric.help_text}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples(const))
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+webhook_seconds = registry.register(
+    Histogram("bot_webhook_update_seconds", "Webhook update handling time.", labels=("type",))
+)
+webhooks_in_flight = registry.register(Gauge("bot_webhooks_in_flight", "Webhook updates being handled."))
+db_update_seconds = registry.register(Histogram("bot_db_update_seconds", "SQL time spent per update."))
+db_update_statements = registry.register(
+    Histogram("bot_db_update_statements", "SQL statements executed per update.", buckets=COUNT_BUCKETS)
+)
+telegram_api_seconds = registry.register(
+    Histogram("bot_telegram_api_seconds", "Telegram Bot API call latency.", labels=("method",))
+)
+llm_request_seconds = registry.register(
+    Histogram("bot_llm_request_seconds", "OpenAI Responses API call latency.", labels=("action", "model"))
+)
+image_generation_seconds = registry.register(
+    Histogram("bot_image_generation_seconds", "OpenAI image generation latency.", labels=("model",))
+)
+quota_rejections = registry.register(
+    Counter("bot_quota_rejections_total", "Requests refused by plan limits.", labels=("reason",))
+)
+upstream_errors = registry.register(
+    Counter("bot_upstream_errors_total", "Failed upstream calls.", labels=("upstream", "kind"))
+)
+deferred_replies = registry.register(
+    Counter("bot_deferred_replies_total", "Replies returned in the webhook response instead of a Bot API call.", labels=("method",))
+)
+db_pool_connections = registry.register(
+    Gauge("bot_db_pool_connections", "DB pool connections.", labels=("state",))
+)
+db_pool_waits = registry.register(Counter("bot_db_pool_waits_total", "Checkouts that waited for a free connection."))
+db_pool_wait_seconds = registry.register(Counter("bot_db_pool_wait_seconds_total", "Time spent waiting for connections."))
+leader_status = registry.register(Gauge("bot_leader", "1 on the worker that runs singleton duties."))
+recorder_buffered = registry.register(Gauge("bot_update_recorder_buffered", "Recorded updates waiting for a flush."))
+event_loop_lag_seconds = registry.register(
+    Histogram("bot_event_loop_lag_seconds", "Event loop scheduling delay.", buckets=LAG_BUCKETS)
+)
+event_loop_lag_recent = registry.register(
+    Gauge("bot_event_loop_lag_recent_seconds", "Event loop lag over the recent sample window.", labels=("quantile",))
+)
+event_loop_stalls = registry.register(
+    Counter("bot_event_loop_stalls_total", "Event loop stalls longer than the capture threshold.")
+)
+
+
+def error_kind(exc: BaseException) -> str:
+    response = getattr(exc, "response", None)
+    status_code = getattr(response, "status_code", None)
+    return str(status_code) if status_code else type(exc).__name__
+
+
+@contextmanager
+def upstream_call(histogram: Histogram, upstream: str, *labels) -> Iterator[None]:
+    started_at = time.perf_counter()
+    try:
+        yield
+    except Exception as exc:
+        upstream_errors.inc(upstream, error_kind(exc))
+        raise
+    finally:
+        histogram.observe(time.perf_counter() - started_at, *labels)
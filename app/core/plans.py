@@ -64,3 +64,12 @@ PLAN_MAP = {
     "pro": PRO_PLAN,
     "paid": PRO_PLAN,  # backward compatibility for old data
 }
+
+
+def normalize_plan(value: str | None) -> str:
+    plan = (value or "free").strip().lower()
+    if plan == "paid":
+        return "pro"
+    if plan not in {"free", "student", "pro"}:
+        return "free"
+    return plan
@@ -0,0 +1,39 @@
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+
+
+@dataclass
+class RequestTimings:
+    # perf_counter() when the update reached the process (webhook body read, poller fetch).
+    received_at: float = field(default_factory=time.perf_counter)
+    started_at: float | None = None
+    upstream_ms: float | None = None
+    ttfb_ms: float | None = None
+    telegram_ms: float | None = None
+
+    def start(self) -> None:
+        self.started_at = time.perf_counter()
+
+    @contextmanager
+    def span(self, name: str) -> Iterator[None]:
+        # Repeated spans of one kind add up, e.g. getFile + sendMessage under "telegram".
+        started_at = time.perf_counter()
+        try:
+            yield
+        finally:
+            attribute = f"{name}_ms"
+            elapsed_ms = (time.perf_counter() - started_at) * 1000
+            setattr(self, attribute, (getattr(self, attribute) or 0.0) + elapsed_ms)
+
+    def log_fields(self) -> dict:
+        now = time.perf_counter()
+        started_at = self.started_at if self.started_at is not None else now
+        return {
+            "queue_wait_ms": round((started_at - self.received_at) * 1000, 3),
+            "upstream_ms": round(self.upstream_ms, 3) if self.upstream_ms is not None else None,
+            "ttfb_ms": round(self.ttfb_ms, 3) if self.ttfb_ms is not None else None,
+            "telegram_ms": round(self.telegram_ms, 3) if self.telegram_ms is not None else None,
+            "total_ms": round((now - self.received_at) * 1000, 3),
+        }
@@ -2,15 +2,87 @@ from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncConnection
 
 
-async def ensure_schema_updates(conn: AsyncConnection) -> None:
-    # Lightweight compatibility migration for local MVP before Alembic.
-    await conn.execute(text("ALTER TABLE users ADD COLUMN IF NOT EXISTS day_key VARCHAR(10) NOT NULL DEFAULT '1970-01-01'"))
-    await conn.execute(text("ALTER TABLE users ADD COLUMN IF NOT EXISTS monthly_images_used INTEGER NOT NULL DEFAULT 0"))
-    await conn.execute(text("ALTER TABLE users ADD COLUMN IF NOT EXISTS monthly_photo_analyses_used INTEGER NOT NULL DEFAULT 0"))
-    await conn.execute(text("ALTER TABLE users ADD COLUMN IF NOT EXISTS monthly_long_texts_used INTEGER NOT NULL DEFAULT 0"))
-    await conn.execute(text("ALTER TABLE users ADD COLUMN IF NOT EXISTS daily_requests_used INTEGER NOT NULL DEFAULT 0"))
-    await conn.execute(text("ALTER TABLE users ADD COLUMN IF NOT EXISTS daily_images_used INTEGER NOT NULL DEFAULT 0"))
-    await conn.execute(text("ALTER TABLE users ADD COLUMN IF NOT EXISTS daily_photo_analyses_used INTEGER NOT NULL DEFAULT 0"))
-    await conn.execute(text("ALTER TABLE users ADD COLUMN IF NOT EXISTS daily_long_texts_used INTEGER NOT NULL DEFAULT 0"))
-    await conn.execute(text("ALTER TABLE users ADD COLUMN IF NOT EXISTS pending_action VARCHAR(64)"))
-    await conn.execute(text("ALTER TABLE users ADD COLUMN IF NOT EXISTS bonus_image_credits INTEGER NOT NULL DEFAULT 0"))
+USER_OUTBOX_TRACKED_COLUMNS = [
+    "username",
+    "first_name",
+    "language",
+    "plan",
+    "is_banned",
+    "month_key",
+    "monthly_requests_used",
+    "monthly_tokens_used",
+    "monthly_images_used",
+    "monthly_photo_analyses_used",
+    "monthly_long_texts_used",
+    "bonus_image_credits",
+]
+
+
+async def ensure_user_outbox_triggers(conn: AsyncConnection, enabled: bool) -> None:
+    if not enabled:
+        # Nobody consumes the outbox, so stop writing to it.
+        await conn.execute(text("DROP TRIGGER IF EXISTS users_outbox_insert ON users"))
+        await conn.execute(text("DROP TRIGGER IF EXISTS users_outbox_update ON users"))
+        await conn.execute(text("DROP TRIGGER IF EXISTS users_outbox_delete ON users"))
+        return
+
+    # Statement-level triggers keep the outbox in the writer's transaction for ORM, bulk and upsert paths alike.
+    new_columns = ", ".join(f"n.{column}" for column in USER_OUTBOX_TRACKED_COLUMNS)
+    old_columns = ", ".join(f"o.{column}" for column in USER_OUTBOX_TRACKED_COLUMNS)
+    await conn.execute(
+        text(
+            """
+            CREATE OR REPLACE FUNCTION user_outbox_on_insert() RETURNS trigger AS $$
+            BEGIN
+                INSERT INTO user_outbox (telegram_id) SELECT telegram_id FROM new_rows;
+                RETURN NULL;
+            END
+            $$ LANGUAGE plpgsql
+            """
+        )
+    )
+    await conn.execute(
+        text(
+            f"""
+            CREATE OR REPLACE FUNCTION user_outbox_on_update() RETURNS trigger AS $$
+            BEGIN
+                INSERT INTO user_outbox (telegram_id)
+                SELECT n.telegram_id
+                FROM new_rows n JOIN old_rows o ON o.id = n.id
+                WHERE ({new_columns}) IS DISTINCT FROM ({old_columns});
+                RETURN NULL;
+            END
+            $$ LANGUAGE plpgsql
+            """
+        )
+    )
+    await conn.execute(
+        text(
+            """
+            CREATE OR REPLACE FUNCTION user_outbox_on_delete() RETURNS trigger AS $$
+            BEGIN
+                INSERT INTO user_outbox (telegram_id) SELECT telegram_id FROM old_rows;
+                RETURN NULL;
+            END
+            $$ LANGUAGE plpgsql
+            """
+        )
+    )
+    await conn.execute(
+        text(
+            "CREATE OR REPLACE TRIGGER users_outbox_insert AFTER INSERT ON users "
+            "REFERENCING NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION user_outbox_on_insert()"
+        )
+    )
+    await conn.execute(
+        text(
+            "CREATE OR REPLACE TRIGGER users_outbox_update AFTER UPDATE ON users "
+            "REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION user_outbox_on_update()"
+        )
+    )
+    await conn.execute(
+        text(
+            "CREATE OR REPLACE TRIGGER users_outbox_delete AFTER DELETE ON users "
+            "REFERENCING OLD TABLE AS old_rows FOR EACH STATEMENT EXECUTE FUNCTION user_outbox_on_delete()"
+        )
+    )
@@ -0,0 +1,108 @@
+import logging
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from app import models  # noqa: F401
+from app.core.config import settings
+from app.db.base import Base
+from app.db.bootstrap import ensure_user_outbox_triggers
+from app.services.outbox import default_sinks
+
+logger = logging.getLogger(__name__)
+
+# Any constant works; it only has to be the same in every process that runs migrations.
+MIGRATION_LOCK_KEY = 7_240_115
+
+
+@dataclass(frozen=True)
+class Migration:
+    version: int
+    name: str
+    apply: Callable[[AsyncConnection], Awaitable[None]]
+
+
+class SchemaOutdated(RuntimeError):
+    pass
+
+
+async def _baseline(conn: AsyncConnection) -> None:
+    # Idempotent, so databases created by the old create_all-on-boot bootstrap adopt it as version 1.
+    await conn.run_sync(Base.metadata.create_all)
+    await conn.execute(text("ALTER TABLE users ADD COLUMN IF NOT EXISTS day_key VARCHAR(10) NOT NULL DEFAULT '1970-01-01'"))
+    await conn.execute(text("ALTER TABLE users ADD COLUMN IF NOT EXISTS monthly_images_used INTEGER NOT NULL DEFAULT 0"))
+    await conn.execute(text("ALTER TABLE users ADD COLUMN IF NOT EXISTS monthly_photo_analyses_used INTEGER NOT NULL DEFAULT 0"))
+    await conn.execute(text("ALTER TABLE users ADD COLUMN IF NOT EXISTS monthly_long_texts_used INTEGER NOT NULL DEFAULT 0"))
+    await conn.execute(text("ALTER TABLE users ADD COLUMN IF NOT EXISTS daily_requests_used INTEGER NOT NULL DEFAULT 0"))
+    await conn.execute(text("ALTER TABLE users ADD COLUMN IF NOT EXISTS daily_images_used INTEGER NOT NULL DEFAULT 0"))
+    await conn.execute(text("ALTER TABLE users ADD COLUMN IF NOT EXISTS daily_photo_analyses_used INTEGER NOT NULL DEFAULT 0"))
+    await conn.execute(text("ALTER TABLE users ADD COLUMN IF NOT EXISTS daily_long_texts_used INTEGER NOT NULL DEFAULT 0"))
+    await conn.execute(text("ALTER TABLE users ADD COLUMN IF NOT EXISTS pending_action VARCHAR(64)"))
+    await conn.execute(text("ALTER TABLE users ADD COLUMN IF NOT EXISTS bonus_image_credits INTEGER NOT NULL DEFAULT 0"))
+    await conn.execute(text("ALTER TABLE query_logs ADD COLUMN IF NOT EXISTS db_statements INTEGER NOT NULL DEFAULT 0"))
+    await conn.execute(text("ALTER TABLE query_logs ADD COLUMN IF NOT EXISTS db_rows_affected INTEGER NOT NULL DEFAULT 0"))
+    await conn.execute(text("ALTER TABLE query_logs ADD COLUMN IF NOT EXISTS db_time_ms DOUBLE PRECISION NOT NULL DEFAULT 0"))
+    await conn.execute(text("ALTER TABLE query_logs ADD COLUMN IF NOT EXISTS model VARCHAR(64)"))
+    for column in ("queue_wait_ms", "upstream_ms", "ttfb_ms", "telegram_ms", "total_ms"):
+        await conn.execute(text(f"ALTER TABLE query_logs ADD COLUMN IF NOT EXISTS {column} DOUBLE PRECISION"))
+    await conn.execute(text("CREATE INDEX IF NOT EXISTS ix_query_logs_created_at ON query_logs (created_at)"))
+
+
+# Append only; never edit a migration that has shipped. New tables still get created by the baseline's
+# create_all on fresh databases, so later migrations must be idempotent (IF NOT EXISTS) as well.
+MIGRATIONS = [
+    Migration(1, "baseline", _baseline),
+]
+LATEST_VERSION = MIGRATIONS[-1].version
+
+
+async def schema_version(conn: AsyncConnection) -> int:
+    # One round trip; a missing table (fresh or pre-versioning database) reads as 0.
+    try:
+        return (await conn.execute(text("SELECT max(version) FROM schema_version"))).scalar_one() or 0
+    except DBAPIError:
+        await conn.rollback()
+        return 0
+
+
+async def check_schema(conn: AsyncConnection) -> int:
+    version = await schema_version(conn)
+    if version < LATEST_VERSION:
+        raise SchemaOutdated(
+            f"Database schema is at version {version}, this build needs {LATEST_VERSION}; run `python -m app.migrate`"
+        )
+    return version
+
+
+async def migrate(conn: AsyncConnection) -> list[Migration]:
+    # Run inside one transaction: concurrent deploys wait on the advisory lock, then see the new version.
+    await conn.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": MIGRATION_LOCK_KEY})
+    await conn.execute(
+        text(
+            "CREATE TABLE IF NOT EXISTS schema_version ("
+            "version INTEGER PRIMARY KEY, name VARCHAR(128) NOT NULL, applied_at TIMESTAMPTZ NOT NULL DEFAULT now())"
+        )
+    )
+    version = (await conn.execute(text("SELECT coalesce(max(version), 0) FROM schema_version"))).scalar_one()
+
+    applied = []
+    for migration in MIGRATIONS:
+        if migration.version <= version:
+            continue
+        logger.info("Applying migration %s (%s)", migration.version, migration.name)
+        await migration.apply(conn)
+        await conn.execute(
+            text("INSERT INTO schema_version (version, name) VALUES (:version, :name)"),
+            {"version": migration.version, "name": migration.name},
+        )
+        applied.append(migration)
+
+    # Follows OUTBOX_SYNC_ENABLED and the configured sinks, so re-run the command after changing either.
+    outbox_enabled = settings.outbox_sync_enabled and bool(default_sinks())
+    if settings.outbox_sync_enabled and not outbox_enabled:
+        logger.warning("OUTBOX_SYNC_ENABLED is set but no outbox sink is configured; outbox triggers not installed")
+    await ensure_user_outbox_triggers(conn, enabled=outbox_enabled)
+    return applied
@@ -1,6 +1,14 @@
+import asyncio
+import time
+from dataclasses import dataclass
+
+from sqlalchemy import event, text
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from sqlalchemy.util.queue import AsyncAdaptedQueue
 
 from app.core.config import settings
+from app.db.statement_stats import instrument_engine
 
 
 def _normalize_async_db_url(raw_url: str) -> str:
@@ -12,8 +20,72 @@ def _normalize_async_db_url(raw_url: str) -> str:
     return url
 
 
-engine = create_async_engine(_normalize_async_db_url(settings.database_url), echo=False, future=True)
+@dataclass
+class PoolStats:
+    checkouts: int = 0
+    waits: int = 0
+    wait_seconds_total: float = 0.0
+    wait_seconds_max: float = 0.0
+
+
+pool_stats = PoolStats()
+
+
+class _TimedQueue(AsyncAdaptedQueue):
+    # The pool only blocks on its queue once size + max_overflow connections are all checked out.
+    def get(self, block=True, timeout=None):
+        if not block:
+            return super().get(block, timeout)
+        started_at = time.perf_counter()
+        try:
+            return super().get(block, timeout)
+        finally:
+            waited = time.perf_counter() - started_at
+            pool_stats.waits += 1
+            pool_stats.wait_seconds_total += waited
+            pool_stats.wait_seconds_max = max(pool_stats.wait_seconds_max, waited)
+
+
+class TimedQueuePool(AsyncAdaptedQueuePool):
+    _queue_class = _TimedQueue
+
+
+engine = create_async_engine(
+    _normalize_async_db_url(settings.database_url), echo=False, future=True, poolclass=TimedQueuePool
+)
 SessionLocal = async_sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+instrument_engine(engine)
+
+
+@event.listens_for(engine.sync_engine, "checkout")
+def _count_checkout(dbapi_connection, connection_record, connection_proxy) -> None:
+    pool_stats.checkouts += 1
+
+
+def pool_status() -> dict:
+    pool = engine.sync_engine.pool
+    return {
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "overflow": pool.overflow(),
+        "checkouts": pool_stats.checkouts,
+        "waits": pool_stats.waits,
+        "wait_seconds_total": round(pool_stats.wait_seconds_total, 6),
+        "wait_seconds_max": round(pool_stats.wait_seconds_max, 6),
+    }
+
+
+async def warm_pool(count: int) -> int:
+    # Hold the connections at the same time so the pool really opens `count` of them, then return them all.
+    count = min(count, engine.sync_engine.pool.size())
+    if count <= 0:
+        return 0
+    connections = await asyncio.gather(*(engine.connect() for _ in range(count)))
+    try:
+        await asyncio.gather(*(connection.execute(text("SELECT 1")) for connection in connections))
+    finally:
+        await asyncio.gather(*(connection.close() for connection in connections))
+    return count
 
 
 async def get_db() -> AsyncSession:
@@ -0,0 +1,90 @@
+import logging
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.core.config import settings
+from app.core.metrics import db_update_seconds, db_update_statements
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class StatementStats:
+    statements: int = 0
+    # Rows written by INSERT/UPDATE/DELETE; drivers report -1 for SELECT, so fetched rows are not counted.
+    rows_affected: int = 0
+    db_seconds: float = 0.0
+
+    @property
+    def db_ms(self) -> float:
+        return round(self.db_seconds * 1000, 3)
+
+    def as_dict(self) -> dict:
+        return {"statements": self.statements, "rows_affected": self.rows_affected, "db_ms": self.db_ms}
+
+
+class StatementBudgetExceeded(AssertionError):
+    pass
+
+
+_current: ContextVar[StatementStats | None] = ContextVar("statement_stats", default=None)
+
+
+def current_statement_stats() -> StatementStats | None:
+    return _current.get()
+
+
+@contextmanager
+def track_statements() -> Iterator[StatementStats]:
+    # Everything executed in this context (including awaited repository calls) is counted into one object.
+    stats = StatementStats()
+    token = _current.set(stats)
+    try:
+        yield stats
+    finally:
+        _current.reset(token)
+
+
+@contextmanager
+def statement_budget(max_statements: int, label: str = "block") -> Iterator[StatementStats]:
+    # For CI checks of a code path; benchmarks/statement_budget.py runs the bot's update paths under it.
+    with track_statements() as stats:
+        yield stats
+    if stats.statements > max_statements:
+        raise StatementBudgetExceeded(f"{label}: {stats.statements} SQL statements, budget {max_statements}")
+
+
+def report_statement_stats(update_id: int, stats: StatementStats) -> None:
+    db_update_seconds.observe(stats.db_seconds)
+    db_update_statements.observe(stats.statements)
+    if settings.db_statement_warn_threshold and stats.statements > settings.db_statement_warn_threshold:
+        logger.warning(
+            "Update %s ran %s SQL statements (%s rows affected, %.1f ms)", update_id, stats.statements, stats.rows_affected, stats.db_ms
+        )
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    if _current.get() is not None:
+        conn.info["statement_started_at"] = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    stats = _current.get()
+    started_at = conn.info.pop("statement_started_at", None)
+    if stats is None or started_at is None:
+        return
+    stats.statements += 1
+    stats.db_seconds += time.perf_counter() - started_at
+    if cursor.rowcount > 0:
+        stats.rows_affected += cursor.rowcount
+
+
+def instrument_engine(engine: AsyncEngine) -> None:
+    event.listen(engine.sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine.sync_engine, "after_cursor_execute", _after_cursor_execute)
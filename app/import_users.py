@@ -0,0 +1,34 @@
+import argparse
+import asyncio
+from collections.abc import AsyncIterator
+from dataclasses import asdict
+from pathlib import Path
+
+from app.db.session import SessionLocal
+from app.services.user_import import UserImportService, iter_lines
+
+CHUNK_SIZE = 1024 * 1024
+
+
+async def _read_chunks(path: Path) -> AsyncIterator[bytes]:
+    with path.open("rb") as handle:
+        while chunk := handle.read(CHUNK_SIZE):
+            yield chunk
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description="Bulk-load users from CSV or NDJSON via COPY.")
+    parser.add_argument("path", type=Path)
+    parser.add_argument("--format", choices=["csv", "ndjson"], default=None)
+    args = parser.parse_args()
+
+    fmt = args.format or ("ndjson" if args.path.suffix in {".ndjson", ".jsonl"} else "csv")
+    async with SessionLocal() as db:
+        result = await UserImportService(db).import_lines(iter_lines(_read_chunks(args.path)), fmt)
+
+    for key, value in asdict(result).items():
+        print(f"{key}: {value}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
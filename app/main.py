@@ -1,3 +1,5 @@
+import asyncio
+import logging
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
@@ -5,33 +7,73 @@ from fastapi import FastAPI
 from app.api.admin import router as admin_router
 from app.api.crm import router as crm_router
 from app.api.health import router as health_router
+from app.api.metrics import router as metrics_router
 from app.api.telegram import router as telegram_router
 from app.core.config import settings
-from app.db.base import Base
-from app.db.bootstrap import ensure_schema_updates
+from app.db.migrations import check_schema
 from app.db.session import engine
-from app import models  # noqa: F401
+from app.services.broadcast import BroadcastRunner
+from app.services.drain import drain, flush_log_handlers
+from app.services.leader import leader
+from app.services.loop_monitor import loop_monitor
+from app.services.outbox import OutboxConsumer, default_sinks
+from app.services.readiness import readiness
 from app.services.telegram_api import TelegramAPI
+from app.services.update_recorder import update_recorder
 
+logger = logging.getLogger(__name__)
 
-@asynccontextmanager
-async def lifespan(app: FastAPI):
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
-        await ensure_schema_updates(conn)
 
+async def run_singleton_duties() -> None:
+    # Exactly one worker runs these (see LeaderElection); migrations run before any worker starts.
     if settings.telegram_webhook_url:
         webhook_path = f"/telegram/webhook/{settings.telegram_webhook_secret}"
         webhook_url = f"{settings.telegram_webhook_url}{webhook_path}"
         telegram_api = TelegramAPI(settings.telegram_bot_token)
         await telegram_api.set_webhook(webhook_url)
 
+    sinks = default_sinks()
+    if settings.outbox_sync_enabled and not sinks:
+        logger.warning("OUTBOX_SYNC_ENABLED is set but no outbox sink is configured; consumer not started")
+    async with asyncio.TaskGroup() as group:
+        if settings.outbox_sync_enabled and sinks:
+            group.create_task(OutboxConsumer(sinks).run_forever())
+        if settings.broadcast_worker_enabled:
+            group.create_task(BroadcastRunner().run_forever())
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    drain.install_signal_handlers()
+    # Schema changes are applied by `python -m app.migrate` before workers start; this is one SELECT.
+    async with engine.connect() as conn:
+        await check_schema(conn)
+    # Before setWebhook, so the first deliveries find open connections.
+    await readiness.warm_up()
+
+    background_tasks = [asyncio.create_task(leader.run_forever(run_singleton_duties))]
+    if loop_monitor.enabled:
+        background_tasks.append(asyncio.create_task(loop_monitor.run_forever()))
+    if settings.update_recorder_enabled:
+        background_tasks.append(asyncio.create_task(update_recorder.run_forever()))
+
     yield
 
+    # Uvicorn runs this after in-flight requests have finished (guarded jobs stop at the drain deadline).
+    drain.begin()
+    readiness.ready = False
+    for task in background_tasks:
+        task.cancel()
+    # Let tasks run their cleanup, e.g. the recorder's final flush and the leader lease release.
+    await asyncio.gather(*background_tasks, return_exceptions=True)
+    flush_log_handlers()
+    await engine.dispose()
+
 
 app = FastAPI(title=settings.app_name, lifespan=lifespan)
 
 app.include_router(health_router)
+app.include_router(metrics_router)
 app.include_router(telegram_router)
 app.include_router(admin_router)
 app.include_router(crm_router)
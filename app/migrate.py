@@ -0,0 +1,32 @@
+import argparse
+import asyncio
+import logging
+
+from app.db.migrations import LATEST_VERSION, MIGRATIONS, migrate, schema_version
+from app.db.session import engine
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description="Apply pending schema migrations.")
+    parser.add_argument("--status", action="store_true", help="print the current and latest version and exit")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    try:
+        if args.status:
+            async with engine.connect() as conn:
+                version = await schema_version(conn)
+            print(f"schema version: {version}, latest: {LATEST_VERSION}")
+            for migration in MIGRATIONS:
+                print(f"  {migration.version} {migration.name}{'' if migration.version <= version else ' (pending)'}")
+            return
+
+        async with engine.begin() as conn:
+            applied = await migrate(conn)
+        print(f"applied: {[migration.version for migration in applied] or 'none'}, schema version: {LATEST_VERSION}")
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
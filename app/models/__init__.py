@@ -1,4 +1,8 @@
+from app.models.broadcast import Broadcast, BroadcastDelivery
+from app.models.outbox import OutboxCheckpoint, UserOutboxEvent
+from app.models.poller import PollerState
 from app.models.query_log import QueryLog
+from app.models.sheet_row import SheetRow
 from app.models.user import User
 
-__all__ = ["User", "QueryLog"]
+__all__ = ["User", "QueryLog", "SheetRow", "UserOutboxEvent", "OutboxCheckpoint", "Broadcast", "BroadcastDelivery", "PollerState"]
@@ -0,0 +1,30 @@
+from datetime import datetime
+
+from sqlalchemy import BigInteger, DateTime, Index, String, func, text
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base
+
+
+class UserOutboxEvent(Base):
+    __tablename__ = "user_outbox"
+    __table_args__ = (Index("ix_user_outbox_xid_id", "xid", "id"),)
+
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=True)
+    telegram_id: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    # Writer transaction id: events are consumed in (xid, id) order once xid is below every open transaction.
+    xid: Mapped[int] = mapped_column(
+        BigInteger, server_default=text("(pg_current_xact_id()::text)::bigint"), nullable=False
+    )
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+
+class OutboxCheckpoint(Base):
+    __tablename__ = "outbox_checkpoints"
+
+    sink: Mapped[str] = mapped_column(String(64), primary_key=True)
+    last_xid: Mapped[int] = mapped_column(BigInteger, default=0, nullable=False)
+    last_id: Mapped[int] = mapped_column(BigInteger, default=0, nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False
+    )
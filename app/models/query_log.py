@@ -1,6 +1,6 @@
 from datetime import datetime
 
-from sqlalchemy import BigInteger, DateTime, Integer, String, Text, func
+from sqlalchemy import BigInteger, DateTime, Float, Integer, String, Text, func
 from sqlalchemy.orm import Mapped, mapped_column
 
 from app.db.base import Base
@@ -13,6 +13,7 @@ class QueryLog(Base):
     telegram_id: Mapped[int] = mapped_column(BigInteger, index=True, nullable=False)
     action: Mapped[str] = mapped_column(String(64), nullable=False)
     plan: Mapped[str] = mapped_column(String(16), nullable=False)
+    model: Mapped[str | None] = mapped_column(String(64), nullable=True)
 
     prompt_text: Mapped[str] = mapped_column(Text, nullable=False)
     response_text: Mapped[str | None] = mapped_column(Text, nullable=True)
@@ -24,4 +25,18 @@ class QueryLog(Base):
     status: Mapped[str] = mapped_column(String(16), default="ok", nullable=False)
     error_message: Mapped[str | None] = mapped_column(Text, nullable=True)
 
-    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    # SQL cost of the update up to this entry (the entry's own INSERT and the final commit are not included).
+    db_statements: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    db_rows_affected: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    db_time_ms: Mapped[float] = mapped_column(Float, default=0.0, nullable=False)
+
+    # Milliseconds; upstream/ttfb/telegram stay NULL on paths that made no such call.
+    queue_wait_ms: Mapped[float | None] = mapped_column(Float, nullable=True)
+    upstream_ms: Mapped[float | None] = mapped_column(Float, nullable=True)
+    ttfb_ms: Mapped[float | None] = mapped_column(Float, nullable=True)
+    telegram_ms: Mapped[float | None] = mapped_column(Float, nullable=True)
+    total_ms: Mapped[float | None] = mapped_column(Float, nullable=True)
+
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), index=True, nullable=False
+    )
@@ -0,0 +1,147 @@
+import asyncio
+import logging
+
+import httpx
+
+from app.core.config import settings
+from app.core.timings import RequestTimings
+from app.db.migrations import check_schema
+from app.db.session import SessionLocal, engine
+from app.db.statement_stats import report_statement_stats, track_statements
+from app.repositories.poller_repo import PollerStateRepository
+from app.schemas.telegram import TelegramUpdate
+from app.services.bot_logic import BotService
+from app.services.drain import drain, flush_log_handlers
+from app.services.loop_monitor import loop_monitor
+from app.services.telegram_api import TelegramAPI
+from app.services.update_parser import RELEVANT_UPDATE_TYPES, MalformedUpdate, update_from_dict
+
+logger = logging.getLogger(__name__)
+
+ALLOWED_UPDATES = list(RELEVANT_UPDATE_TYPES)
+ERROR_BACKOFF_SECONDS = 2.0
+
+
+def _ordering_key(update: TelegramUpdate) -> int:
+    if update.callback_query:
+        return update.callback_query.from_.id
+    if update.message:
+        return update.message.from_.id if update.message.from_ else update.message.chat.id
+    return update.update_id
+
+
+class UpdatePoller:
+    def __init__(
+        self,
+        telegram_api: TelegramAPI | None = None,
+        timeout_seconds: int = settings.poller_timeout_seconds,
+        batch_size: int = settings.poller_batch_size,
+        concurrency: int = settings.poller_concurrency,
+    ):
+        self.telegram_api = telegram_api or TelegramAPI(settings.telegram_bot_token)
+        self.bot_id = settings.telegram_bot_token.split(":", 1)[0]
+        self.timeout_seconds = timeout_seconds
+        self.batch_size = batch_size
+        self.semaphore = asyncio.Semaphore(concurrency)
+        # Fetching stops while this many updates are queued or running.
+        self.max_pending = max(concurrency, batch_size) * 2
+        self.tails: dict[int, asyncio.Task] = {}
+        self.pending: set[asyncio.Task] = set()
+
+    async def _handle(self, update: TelegramUpdate, timings: RequestTimings) -> None:
+        async with self.semaphore:
+            try:
+                with track_statements() as stats:
+                    async with SessionLocal() as db:
+                        await BotService(db=db, telegram_api=self.telegram_api, timings=timings).handle_update(update)
+                report_statement_stats(update.update_id, stats)
+            except Exception:
+                logger.exception("Update %s failed", update.update_id)
+
+    async def _run_after(self, previous: asyncio.Task | None, update: TelegramUpdate, timings: RequestTimings) -> None:
+        if previous is not None:
+            await asyncio.wait([previous])
+        await self._handle(update, timings)
+
+    def _forget(self, key: int, task: asyncio.Task) -> None:
+        self.pending.discard(task)
+        if self.tails.get(key) is task:
+            del self.tails[key]
+
+    def dispatch(self, update: TelegramUpdate) -> None:
+        # Updates from one user run in arrival order, chained behind that user's previous update;
+        # different users run concurrently, as with parallel webhook deliveries.
+        key = _ordering_key(update)
+        # Queue wait then covers the time spent behind this user's earlier updates and the semaphore.
+        task = asyncio.create_task(self._run_after(self.tails.get(key), update, RequestTimings()))
+        self.tails[key] = task
+        self.pending.add(task)
+        task.add_done_callback(lambda done, key=key: self._forget(key, done))
+
+    async def _save_offset(self, next_offset: int) -> None:
+        async with SessionLocal() as db:
+            await PollerStateRepository(db).save_offset(self.bot_id, next_offset)
+            await db.commit()
+
+    async def run(self) -> None:
+        # getUpdates is refused while a webhook is set.
+        await self.telegram_api.delete_webhook()
+        async with SessionLocal() as db:
+            offset = await PollerStateRepository(db).get_offset(self.bot_id)
+        logger.info("Polling Telegram updates from offset %s", offset)
+
+        try:
+            while True:
+                while len(self.pending) >= self.max_pending:
+                    await asyncio.wait(self.pending, return_when=asyncio.FIRST_COMPLETED)
+
+                try:
+                    updates = await self.telegram_api.get_updates(
+                        offset=offset,
+                        limit=self.batch_size,
+                        timeout=self.timeout_seconds,
+                        allowed_updates=ALLOWED_UPDATES,
+                    )
+                except httpx.HTTPError:
+                    logger.exception("getUpdates failed")
+                    await asyncio.sleep(ERROR_BACKOFF_SECONDS)
+                    continue
+
+                if not updates:
+                    continue
+
+                for raw in updates:
+                    offset = max(offset, raw["update_id"] + 1)
+                    try:
+                        update = update_from_dict(raw)
+                    except MalformedUpdate:
+                        logger.warning("Skipping malformed update %s", raw.get("update_id"))
+                        continue
+                    if update is not None:
+                        self.dispatch(update)
+
+                # The next getUpdates call confirms this offset to Telegram; keep ours in step with it.
+                await self._save_offset(offset)
+        finally:
+            if self.pending:
+                await asyncio.wait(self.pending)
+
+
+async def main() -> None:
+    logging.basicConfig(level=logging.INFO)
+    drain.install_signal_handlers()
+    async with engine.connect() as conn:
+        await check_schema(conn)
+
+    monitor_task = asyncio.create_task(loop_monitor.run_forever()) if loop_monitor.enabled else None
+    try:
+        await UpdatePoller().run()
+    finally:
+        if monitor_task:
+            monitor_task.cancel()
+        flush_log_handlers()
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
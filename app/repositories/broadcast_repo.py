@@ -0,0 +1,119 @@
+from datetime import timedelta
+
+from sqlalchemy import BigInteger, any_, bindparam, func, select, update
+from sqlalchemy.dialects.postgresql import ARRAY, insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.broadcast import DELIVERY_BLOCKED, DELIVERY_FAILED, DELIVERY_SENT, Broadcast, BroadcastDelivery
+
+
+class BroadcastRepository:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def create(
+        self,
+        text: str,
+        total_recipients: int,
+        search: str | None = None,
+        plan: str | None = None,
+        is_banned: bool | None = None,
+    ) -> Broadcast:
+        item = Broadcast(
+            text=text,
+            filter_search=search,
+            filter_plan=plan,
+            filter_is_banned=is_banned,
+            total_recipients=total_recipients,
+            status="running",
+        )
+        self.db.add(item)
+        await self.db.flush()
+        return item
+
+    async def get(self, broadcast_id: int) -> Broadcast | None:
+        return await self.db.get(Broadcast, broadcast_id)
+
+    async def list_broadcasts(self, limit: int) -> list[Broadcast]:
+        query = select(Broadcast).order_by(Broadcast.id.desc()).limit(limit)
+        result = await self.db.execute(query)
+        return list(result.scalars().all())
+
+    async def get_status(self, broadcast_id: int) -> str | None:
+        query = select(Broadcast.status).where(Broadcast.id == broadcast_id)
+        return (await self.db.execute(query)).scalar_one_or_none()
+
+    async def claim_next(self, lease: timedelta) -> Broadcast | None:
+        # A lease instead of a held lock: a crashed worker's broadcast becomes claimable again when it expires.
+        candidate = (
+            select(Broadcast.id)
+            .where(
+                Broadcast.status == "running",
+                (Broadcast.lease_expires_at.is_(None)) | (Broadcast.lease_expires_at < func.now()),
+            )
+            .order_by(Broadcast.id)
+            .limit(1)
+            .with_for_update(skip_locked=True)
+            .scalar_subquery()
+        )
+        stmt = (
+            update(Broadcast)
+            .where(Broadcast.id == candidate)
+            .values(lease_expires_at=func.now() + lease)
+            .returning(Broadcast)
+            .execution_options(synchronize_session=False)
+        )
+        result = await self.db.execute(stmt)
+        return result.scalar_one_or_none()
+
+    async def renew_lease(self, broadcast_id: int, lease: timedelta) -> None:
+        stmt = update(Broadcast).where(Broadcast.id == broadcast_id).values(lease_expires_at=func.now() + lease)
+        await self.db.execute(stmt)
+
+    async def delivered_ids(self, broadcast_id: int, telegram_ids: list[int]) -> set[int]:
+        ids_param = bindparam("telegram_ids", value=telegram_ids, type_=ARRAY(BigInteger))
+        query = select(BroadcastDelivery.telegram_id).where(
+            BroadcastDelivery.broadcast_id == broadcast_id,
+            BroadcastDelivery.telegram_id == any_(ids_param),
+        )
+        return set((await self.db.execute(query)).scalars().all())
+
+    async def record_deliveries(self, broadcast_id: int, results: list[tuple[int, int]]) -> None:
+        if not results:
+            return
+
+        stmt = (
+            pg_insert(BroadcastDelivery)
+            .values([{"broadcast_id": broadcast_id, "telegram_id": tg_id, "status": code} for tg_id, code in results])
+            .on_conflict_do_nothing()
+            .returning(BroadcastDelivery.status)
+        )
+        inserted = list((await self.db.execute(stmt)).scalars().all())
+        await self.db.execute(
+            update(Broadcast)
+            .where(Broadcast.id == broadcast_id)
+            .values(
+                sent_count=Broadcast.sent_count + inserted.count(DELIVERY_SENT),
+                blocked_count=Broadcast.blocked_count + inserted.count(DELIVERY_BLOCKED),
+                failed_count=Broadcast.failed_count + inserted.count(DELIVERY_FAILED),
+            )
+        )
+
+    async def advance_checkpoint(self, broadcast_id: int, last_user_id: int, done: bool) -> None:
+        values = {"last_user_id": last_user_id}
+        if done:
+            values.update(status="done", finished_at=func.now(), lease_expires_at=None)
+        stmt = update(Broadcast).where(Broadcast.id == broadcast_id, Broadcast.status == "running").values(**values)
+        await self.db.execute(stmt)
+
+    async def set_status(self, broadcast_id: int, status: str, from_statuses: tuple[str, ...]) -> bool:
+        values = {"status": status, "lease_expires_at": None}
+        if status == "cancelled":
+            values["finished_at"] = func.now()
+        stmt = (
+            update(Broadcast)
+            .where(Broadcast.id == broadcast_id, Broadcast.status.in_(from_statuses))
+            .values(**values)
+        )
+        result = await self.db.execute(stmt)
+        return bool(result.rowcount)
@@ -0,0 +1,86 @@
+from sqlalchemy import delete, func, literal_column, select, tuple_, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.outbox import OutboxCheckpoint, UserOutboxEvent
+
+# Oldest transaction still running: no event with a smaller xid can appear after this read.
+SNAPSHOT_XMIN = literal_column("(pg_snapshot_xmin(pg_current_snapshot())::text)::bigint")
+
+
+class OutboxRepository:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get_checkpoint(self, sink: str) -> OutboxCheckpoint:
+        await self.db.execute(
+            pg_insert(OutboxCheckpoint).values(sink=sink, last_xid=0, last_id=0).on_conflict_do_nothing()
+        )
+        result = await self.db.execute(select(OutboxCheckpoint).where(OutboxCheckpoint.sink == sink))
+        return result.scalar_one()
+
+    async def advance_checkpoint(self, sink: str, previous: tuple[int, int], last: tuple[int, int]) -> bool:
+        # Compare-and-set instead of a row lock held across the sink's HTTP calls; False if another
+        # consumer moved the checkpoint meanwhile (the batch was then delivered twice, which sinks tolerate).
+        stmt = (
+            update(OutboxCheckpoint)
+            .where(
+                OutboxCheckpoint.sink == sink,
+                OutboxCheckpoint.last_xid == previous[0],
+                OutboxCheckpoint.last_id == previous[1],
+            )
+            .values(last_xid=last[0], last_id=last[1])
+        )
+        result = await self.db.execute(stmt)
+        return bool(result.rowcount)
+
+    async def fetch_batch(self, checkpoint: OutboxCheckpoint, limit: int) -> list[UserOutboxEvent]:
+        query = (
+            select(UserOutboxEvent)
+            .where(
+                tuple_(UserOutboxEvent.xid, UserOutboxEvent.id) > tuple_(checkpoint.last_xid, checkpoint.last_id),
+                UserOutboxEvent.xid < SNAPSHOT_XMIN,
+            )
+            .order_by(UserOutboxEvent.xid, UserOutboxEvent.id)
+            .limit(limit)
+        )
+        result = await self.db.execute(query)
+        return list(result.scalars().all())
+
+    async def purge_consumed(self, sinks: list[str]) -> int:
+        # Only events every configured sink has acknowledged can go; checkpoints of removed sinks are ignored,
+        # and a configured sink without a checkpoint yet has seen nothing.
+        if not sinks:
+            return 0
+        query = select(OutboxCheckpoint.last_xid, OutboxCheckpoint.last_id).where(OutboxCheckpoint.sink.in_(sinks))
+        checkpoints = (await self.db.execute(query)).all()
+        if len(checkpoints) < len(set(sinks)):
+            return 0
+        floor = min(checkpoints, key=lambda row: (row.last_xid, row.last_id))
+
+        stmt = delete(UserOutboxEvent).where(
+            tuple_(UserOutboxEvent.xid, UserOutboxEvent.id) <= tuple_(floor.last_xid, floor.last_id)
+        )
+        result = await self.db.execute(stmt)
+        return int(result.rowcount or 0)
+
+    async def get_status(self) -> list[dict]:
+        checkpoints = (await self.db.execute(select(OutboxCheckpoint).order_by(OutboxCheckpoint.sink))).scalars().all()
+        items = []
+        for checkpoint in checkpoints:
+            query = select(
+                func.count(UserOutboxEvent.id).label("pending_events"),
+                func.extract("epoch", func.now() - func.min(UserOutboxEvent.created_at)).label("lag_seconds"),
+            ).where(tuple_(UserOutboxEvent.xid, UserOutboxEvent.id) > tuple_(checkpoint.last_xid, checkpoint.last_id))
+            row = (await self.db.execute(query)).one()
+            items.append(
+                {
+                    "sink": checkpoint.sink,
+                    "last_xid": checkpoint.last_xid,
+                    "last_id": checkpoint.last_id,
+                    "pending_events": int(row.pending_events or 0),
+                    "lag_seconds": round(float(row.lag_seconds or 0), 3),
+                    "updated_at": checkpoint.updated_at,
+                }
+            )
+        return items
@@ -0,0 +1,22 @@
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.poller import PollerState
+
+
+class PollerStateRepository:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get_offset(self, bot_id: str) -> int:
+        query = select(PollerState.next_offset).where(PollerState.bot_id == bot_id)
+        return (await self.db.execute(query)).scalar_one_or_none() or 0
+
+    async def save_offset(self, bot_id: str, next_offset: int) -> None:
+        stmt = pg_insert(PollerState).values(bot_id=bot_id, next_offset=next_offset)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[PollerState.bot_id],
+            set_={"next_offset": stmt.excluded.next_offset, "updated_at": func.now()},
+        )
+        await self.db.execute(stmt)
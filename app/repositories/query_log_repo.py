@@ -1,8 +1,15 @@
+from datetime import datetime
+
 from sqlalchemy import case, func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.timings import RequestTimings
+from app.db.statement_stats import current_statement_stats
 from app.models.query_log import QueryLog
 
+TIMING_COLUMNS = ("total_ms", "upstream_ms", "ttfb_ms", "telegram_ms", "queue_wait_ms", "db_time_ms")
+LATENCY_PERCENTILES = (50, 90, 99)
+
 
 class QueryLogRepository:
     def __init__(self, db: AsyncSession):
@@ -20,11 +27,14 @@ class QueryLogRepository:
         total_tokens: int = 0,
         response_text: str | None = None,
         error_message: str | None = None,
+        model: str | None = None,
+        timings: RequestTimings | None = None,
     ) -> QueryLog:
         item = QueryLog(
             telegram_id=telegram_id,
             action=action,
             plan=plan,
+            model=model,
             prompt_text=prompt_text,
             response_text=response_text,
             input_tokens=input_tokens,
@@ -32,7 +42,13 @@ class QueryLogRepository:
             total_tokens=total_tokens,
             status=status,
             error_message=error_message,
+            **(timings.log_fields() if timings else {}),
         )
+        stats = current_statement_stats()
+        if stats is not None:
+            item.db_statements = stats.statements
+            item.db_rows_affected = stats.rows_affected
+            item.db_time_ms = stats.db_ms
         self.db.add(item)
         await self.db.flush()
         return item
@@ -63,3 +79,46 @@ class QueryLogRepository:
             "photo_analysis_logs": int(row.photo_analysis_logs or 0),
             "total_tokens_logged": int(row.total_tokens_logged or 0),
         }
+
+    async def latency_summary(self, since: datetime, until: datetime, action: str | None = None) -> list[dict]:
+        columns = [
+            QueryLog.action,
+            QueryLog.model,
+            func.count(QueryLog.id).label("count"),
+            func.sum(case((QueryLog.status == "ok", 1), else_=0)).label("ok"),
+        ]
+        for name in TIMING_COLUMNS:
+            # percentile_cont skips NULLs, so paths without an upstream call do not drag upstream_ms down.
+            columns.extend(
+                func.percentile_cont(percent / 100).within_group(getattr(QueryLog, name)).label(f"{name}_p{percent}")
+                for percent in LATENCY_PERCENTILES
+            )
+        query = (
+            select(*columns)
+            .where(QueryLog.created_at >= since, QueryLog.created_at < until)
+            .group_by(QueryLog.action, QueryLog.model)
+            .order_by(QueryLog.action, QueryLog.model)
+        )
+        if action is not None:
+            query = query.where(QueryLog.action == action)
+
+        rows = (await self.db.execute(query)).all()
+        return [
+            {
+                "action": row.action,
+                "model": row.model,
+                "count": int(row.count),
+                "ok": int(row.ok or 0),
+                **{
+                    name: {
+                        f"p{percent}": _round_ms(getattr(row, f"{name}_p{percent}")) for percent in LATENCY_PERCENTILES
+                    }
+                    for name in TIMING_COLUMNS
+                },
+            }
+            for row in rows
+        ]
+
+
+def _round_ms(value: float | None) -> float | None:
+    return round(value, 1) if value is not None else None
@@ -0,0 +1,31 @@
+from sqlalchemy import delete, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.sheet_row import SheetRow
+
+
+class SheetRowRepository:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get_all(self) -> dict[int, tuple[int, str]]:
+        query = select(SheetRow.telegram_id, SheetRow.row_number, SheetRow.row_hash)
+        result = await self.db.execute(query)
+        return {row.telegram_id: (row.row_number, row.row_hash) for row in result}
+
+    async def upsert_many(self, rows: list[dict], chunk_size: int = 1000) -> None:
+        if not rows:
+            return
+
+        stmt = pg_insert(SheetRow)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[SheetRow.telegram_id],
+            set_={"row_number": stmt.excluded.row_number, "row_hash": stmt.excluded.row_hash},
+        )
+        for start in range(0, len(rows), chunk_size):
+            await self.db.execute(stmt, rows[start : start + chunk_size])
+
+    async def replace_all(self, rows: list[dict], chunk_size: int = 1000) -> None:
+        await self.db.execute(delete(SheetRow))
+        await self.upsert_many(rows, chunk_size=chunk_size)
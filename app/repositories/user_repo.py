@@ -1,4 +1,5 @@
-from sqlalchemy import String, asc, case, cast, desc, func, or_, select
+from sqlalchemy import BigInteger, String, any_, asc, bindparam, case, cast, desc, func, or_, select, update
+from sqlalchemy.dialects.postgresql import ARRAY, insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.user import User
@@ -105,11 +106,101 @@ class UserRepository:
         total = int((await self.db.execute(count_query)).scalar() or 0)
         return items, total
 
+    async def bulk_update(
+        self,
+        values: dict,
+        telegram_ids: list[int] | None = None,
+        search: str | None = None,
+        plan: str | None = None,
+        is_banned: bool | None = None,
+    ) -> int:
+        if telegram_ids is not None:
+            ids_param = bindparam("telegram_ids", value=telegram_ids, type_=ARRAY(BigInteger))
+            conditions = [User.telegram_id == any_(ids_param)]
+        else:
+            conditions = self._build_filters(search=search, plan=plan, is_banned=is_banned)
+
+        stmt = (
+            update(User)
+            .where(*conditions)
+            .values(**values, updated_at=func.now())
+            .execution_options(synchronize_session=False)
+        )
+        result = await self.db.execute(stmt)
+        return int(result.rowcount or 0)
+
+    async def stream_recipients(
+        self,
+        after_user_id: int,
+        limit: int,
+        search: str | None = None,
+        plan: str | None = None,
+        is_banned: bool | None = None,
+    ):
+        conditions = self._build_filters(search=search, plan=plan, is_banned=is_banned)
+        query = (
+            select(User.id, User.telegram_id)
+            .where(User.id > after_user_id, *conditions)
+            .order_by(User.id.asc())
+            .limit(limit)
+            .execution_options(yield_per=1000)
+        )
+        result = await self.db.stream(query)
+        async for row in result:
+            yield row.id, row.telegram_id
+
+    async def count_users(
+        self,
+        search: str | None = None,
+        plan: str | None = None,
+        is_banned: bool | None = None,
+    ) -> int:
+        conditions = self._build_filters(search=search, plan=plan, is_banned=is_banned)
+        return int((await self.db.execute(select(func.count(User.id)).where(*conditions))).scalar() or 0)
+
     async def save(self, user: User) -> User:
         self.db.add(user)
         await self.db.flush()
         return user
 
+    async def get_rows_by_telegram_ids(
+        self,
+        telegram_ids: list[int],
+        columns: list[str],
+        chunk_size: int = 5000,
+    ) -> dict[int, dict]:
+        selected = [getattr(User, column) for column in columns]
+        rows: dict[int, dict] = {}
+        for start in range(0, len(telegram_ids), chunk_size):
+            chunk = telegram_ids[start : start + chunk_size]
+            ids_param = bindparam("telegram_ids", value=chunk, type_=ARRAY(BigInteger))
+            query = select(*selected).where(User.telegram_id == any_(ids_param))
+            result = await self.db.execute(query)
+            for row in result.mappings():
+                rows[row["telegram_id"]] = dict(row)
+        return rows
+
+    async def list_by_telegram_ids(self, telegram_ids: list[int], chunk_size: int = 5000) -> list[User]:
+        users: list[User] = []
+        for start in range(0, len(telegram_ids), chunk_size):
+            chunk = telegram_ids[start : start + chunk_size]
+            ids_param = bindparam("telegram_ids", value=chunk, type_=ARRAY(BigInteger))
+            query = select(User).where(User.telegram_id == any_(ids_param)).order_by(User.id.asc())
+            result = await self.db.execute(query)
+            users.extend(result.scalars().all())
+        return users
+
+    async def upsert_many(self, rows: list[dict], update_columns: list[str], chunk_size: int = 1000) -> None:
+        if not rows:
+            return
+
+        stmt = pg_insert(User)
+        set_ = {column: stmt.excluded[column] for column in update_columns}
+        set_["updated_at"] = func.now()
+        stmt = stmt.on_conflict_do_update(index_elements=[User.telegram_id], set_=set_)
+        for start in range(0, len(rows), chunk_size):
+            await self.db.execute(stmt, rows[start : start + chunk_size])
+
     async def list_all_users(self) -> list[User]:
         query = select(User).order_by(User.id.asc())
         result = await self.db.execute(query)
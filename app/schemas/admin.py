@@ -0,0 +1,50 @@
+from typing import Literal
+
+from pydantic import BaseModel, Field, field_validator, model_validator
+
+
+class UserFilter(BaseModel):
+    search: str | None = None
+    plan: str | None = None
+    is_banned: bool | None = None
+
+    @field_validator("search", "plan")
+    @classmethod
+    def blank_to_none(cls, value: str | None) -> str | None:
+        # Normalized here so the emptiness check below and the repository's `if search:` agree.
+        value = (value or "").strip()
+        return value or None
+
+
+class BulkUserOperation(BaseModel):
+    action: Literal["set_plan", "ban", "unban", "reset_limits", "grant_image_credits"]
+    telegram_ids: list[int] | None = Field(default=None, min_length=1, max_length=10_000)
+    filter: UserFilter | None = None
+    # An empty filter matches every user, so that has to be asked for explicitly.
+    all: bool = False
+    plan: Literal["free", "student", "pro", "paid"] | None = None
+    scope: Literal["daily", "monthly", "all"] = "all"
+    amount: int | None = Field(default=None, ge=1, le=1000)
+
+    @model_validator(mode="after")
+    def check_target_and_params(self) -> "BulkUserOperation":
+        if (self.telegram_ids is None) == (self.filter is None):
+            raise ValueError("Pass exactly one of telegram_ids or filter")
+        if self.filter is not None:
+            empty = self.filter.search is None and self.filter.plan is None and self.filter.is_banned is None
+            if empty and not self.all:
+                raise ValueError("filter is empty and would match every user; pass all: true to confirm")
+            if not empty and self.all:
+                raise ValueError("all: true only goes with an empty filter")
+        elif self.all:
+            raise ValueError("all: true only goes with an empty filter")
+        if self.action == "set_plan" and self.plan is None:
+            raise ValueError("plan is required for set_plan")
+        if self.action == "grant_image_credits" and self.amount is None:
+            raise ValueError("amount is required for grant_image_credits")
+        return self
+
+
+class BroadcastCreate(BaseModel):
+    text: str = Field(min_length=1, max_length=4096)
+    filter: UserFilter = Field(default_factory=lambda: UserFilter(is_banned=False))
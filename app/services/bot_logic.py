@@ -1,10 +1,13 @@
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import settings
-from app.core.i18n import FALLBACK_LANGUAGE, SUPPORTED_LANGUAGES, t
+from app.core.i18n import FALLBACK_LANGUAGE, MENU_INDEX, SUPPORTED_LANGUAGES, t
+from app.core.metrics import deferred_replies
+from app.core.timings import RequestTimings
 from app.repositories.query_log_repo import QueryLogRepository
 from app.repositories.user_repo import UserRepository
 from app.schemas.telegram import CallbackQuery, TelegramMessage, TelegramPhotoSize, TelegramUpdate
+from app.services.drain import ShutdownDeadline, drain
 from app.services.limits import (
     consume_monthly_tokens,
     get_daily_image_usage,
@@ -23,27 +26,59 @@ from app.services.limits import (
     rollback_request,
 )
 from app.services.llm import LLMService
-from app.services.menu import build_language_keyboard, build_main_menu, build_subscription_keyboard
-from app.services.prompts import action_from_menu_text, build_llm_prompts, is_menu_text
+from app.services.menu import LANGUAGE_MARKUP, main_menu_markup, subscription_markup
+from app.services.prompts import build_llm_prompts
 from app.services.state import clear_pending_action, get_pending_action, set_pending_action
-from app.services.telegram_api import TelegramAPI
+from app.services.telegram_api import DeferredMethod, TelegramAPI
+
+
+def _error_key(exc: Exception, default: str) -> str:
+    return "restart_error" if isinstance(exc, ShutdownDeadline) else default
 
 
 class BotService:
-    def __init__(self, db: AsyncSession, telegram_api: TelegramAPI):
+    def __init__(
+        self,
+        db: AsyncSession,
+        telegram_api: TelegramAPI,
+        defer_replies: bool = False,
+        timings: RequestTimings | None = None,
+    ):
         self.db = db
         self.telegram_api = telegram_api
         self.users = UserRepository(db)
         self.logs = QueryLogRepository(db)
         self.llm = LLMService()
+        self.defer_replies = defer_replies
+        self.deferred: DeferredMethod | None = None
+        self.timings = timings or RequestTimings()
 
-    async def handle_update(self, update: TelegramUpdate) -> None:
+    async def handle_update(self, update: TelegramUpdate) -> DeferredMethod | None:
+        self.timings.start()
         if update.callback_query:
             await self._handle_callback(update.callback_query)
-            return
-
-        if update.message:
+        elif update.message:
             await self._handle_message(update.message)
+        return self.deferred
+
+    def _defer(self, method: str, params: dict) -> bool:
+        if not self.defer_replies or self.deferred is not None:
+            return False
+        self.deferred = DeferredMethod(method=method, params=params)
+        deferred_replies.inc(method)
+        return True
+
+    async def _reply(self, chat_id: int, text: str, reply_markup: dict | str | None = None) -> None:
+        # Only for paths that send a single message: a deferred reply is delivered after any direct send.
+        params = {"chat_id": chat_id, "text": text}
+        if reply_markup:
+            params["reply_markup"] = reply_markup
+        if not self._defer("sendMessage", params):
+            await self.telegram_api.send_message(chat_id=chat_id, text=text, reply_markup=reply_markup)
+
+    async def _answer_callback(self, callback_query_id: str) -> None:
+        if not self._defer("answerCallbackQuery", {"callback_query_id": callback_query_id}):
+            await self.telegram_api.answer_callback_query(callback_query_id)
 
     async def _handle_callback(self, callback: CallbackQuery) -> None:
         if not callback.data or not callback.message:
@@ -65,11 +100,11 @@ class BotService:
             await self.users.save(user)
             await self.db.commit()
 
-            await self.telegram_api.answer_callback_query(callback.id)
+            await self._answer_callback(callback.id)
             await self.telegram_api.send_message(
                 chat_id=callback.message.chat.id,
                 text=t("start_text", user.language),
-                reply_markup=build_main_menu(user.language),
+                reply_markup=main_menu_markup(user.language),
             )
             return
 
@@ -93,11 +128,11 @@ class BotService:
             await self.users.save(user)
             await self.db.commit()
 
-            await self.telegram_api.answer_callback_query(callback.id)
+            await self._answer_callback(callback.id)
             await self.telegram_api.send_message(
                 chat_id=callback.message.chat.id,
                 text=t("plan_changed_demo", user.language).format(plan=user.plan),
-                reply_markup=build_main_menu(user.language),
+                reply_markup=main_menu_markup(user.language),
             )
             return
 
@@ -127,78 +162,16 @@ class BotService:
             await self.db.commit()
             return
 
-        if text.startswith("/start"):
-            await clear_pending_action(user)
-            await self._handle_start(message.chat.id, user)
-            await self.db.commit()
-            return
-
-        if text.startswith("/help"):
-            await self.telegram_api.send_message(chat_id=message.chat.id, text=t("help_text", user.language))
-            await self.db.commit()
-            return
-
-        if text.startswith("/cancel"):
-            await clear_pending_action(user)
-            await self.telegram_api.send_message(chat_id=message.chat.id, text=t("mode_cancelled", user.language))
-            await self.db.commit()
-            return
-
-        if is_menu_text(text, user.language):
-            await clear_pending_action(user)
-
-        if text == t("menu_language", user.language):
-            await self.telegram_api.send_message(
-                chat_id=message.chat.id,
-                text=t("choose_language", user.language),
-                reply_markup=build_language_keyboard(),
-            )
-            await self.db.commit()
-            return
-
-        if text == t("menu_long_text", user.language):
-            if get_plan(user).name == "free":
-                await self.telegram_api.send_message(chat_id=message.chat.id, text=t("long_text_paid_only", user.language))
-            else:
-                await set_pending_action(user, "await_long_text_input")
-                await self.telegram_api.send_message(chat_id=message.chat.id, text=t("request_long_text", user.language))
-            await self.db.commit()
-            return
-
-        if text == t("menu_limit", user.language):
-            await self._send_usage(message.chat.id, user)
-            await self.db.commit()
-            return
-
-        if text == t("menu_invite", user.language):
-            bot_username = "YourBotUsername"
-            await self.telegram_api.send_message(
-                chat_id=message.chat.id,
-                text=t("invite_text", user.language).format(bot_username=bot_username, user_id=user.telegram_id),
-            )
-            await self.db.commit()
-            return
-
-        if text == t("menu_subscription", user.language):
-            await self.telegram_api.send_message(
-                chat_id=message.chat.id,
-                text=t("subscription_catalog", user.language).format(
-                    student_price=settings.student_price_usd,
-                    pro_price=settings.pro_price_usd,
-                ),
-                reply_markup=build_subscription_keyboard(user.language),
-            )
-            await self.db.commit()
-            return
-
-        if text == t("menu_image", user.language):
-            await self._start_image_flow(chat_id=message.chat.id, user=user)
-            await self.db.commit()
-            return
-
-        if text == t("menu_photo_analysis", user.language):
-            await set_pending_action(user, "await_photo_upload")
-            await self.telegram_api.send_message(chat_id=message.chat.id, text=t("photo_analysis_prompt_request", user.language))
+        # One lookup: commands by their first token, menu buttons by label in any supported language.
+        if text.startswith("/"):
+            handler = self._COMMAND_HANDLERS.get(text.split(maxsplit=1)[0].partition("@")[0])
+        else:
+            menu = MENU_INDEX.get(text)
+            handler = self._MENU_HANDLERS[menu[0]] if menu else None
+            if handler:
+                await clear_pending_action(user)
+        if handler:
+            await handler(self, message.chat.id, user)
             await self.db.commit()
             return
 
@@ -217,7 +190,7 @@ class BotService:
             return
 
         if pending_action == "await_photo_upload" and not message.photo:
-            await self.telegram_api.send_message(chat_id=message.chat.id, text=t("photo_analysis_prompt_request", user.language))
+            await self._reply(message.chat.id, t("photo_analysis_prompt_request", user.language))
             await self.db.commit()
             return
 
@@ -233,26 +206,73 @@ class BotService:
             await self.db.commit()
             return
 
-        action = action_from_menu_text(text, user.language)
-        if action:
-            await self._start_text_action_flow(chat_id=message.chat.id, user=user, action=action)
-            await self.db.commit()
-            return
+        await self._reply(message.chat.id, t("start_text", user.language), main_menu_markup(user.language))
+        await self.db.commit()
+
+    async def _command_start(self, chat_id: int, user) -> None:
+        await clear_pending_action(user)
+        await self._handle_start(chat_id, user)
+
+    async def _command_help(self, chat_id: int, user) -> None:
+        await self._reply(chat_id, t("help_text", user.language))
+
+    async def _command_cancel(self, chat_id: int, user) -> None:
+        await clear_pending_action(user)
+        await self._reply(chat_id, t("mode_cancelled", user.language))
+
+    async def _menu_language(self, chat_id: int, user) -> None:
+        await self._reply(chat_id, t("choose_language", user.language), LANGUAGE_MARKUP)
+
+    async def _menu_long_text(self, chat_id: int, user) -> None:
+        if get_plan(user).name == "free":
+            await self._reply(chat_id, t("long_text_paid_only", user.language))
+        else:
+            await set_pending_action(user, "await_long_text_input")
+            await self._reply(chat_id, t("request_long_text", user.language))
 
-        await self.telegram_api.send_message(
-            chat_id=message.chat.id,
-            text=t("start_text", user.language),
-            reply_markup=build_main_menu(user.language),
+    async def _menu_limit(self, chat_id: int, user) -> None:
+        await self._send_usage(chat_id, user)
+
+    async def _menu_invite(self, chat_id: int, user) -> None:
+        bot_username = "YourBotUsername"
+        await self._reply(
+            chat_id,
+            t("invite_text", user.language).format(bot_username=bot_username, user_id=user.telegram_id),
         )
-        await self.db.commit()
+
+    async def _menu_subscription(self, chat_id: int, user) -> None:
+        await self._reply(
+            chat_id,
+            t("subscription_catalog", user.language).format(
+                student_price=settings.student_price_usd,
+                pro_price=settings.pro_price_usd,
+            ),
+            subscription_markup(user.language),
+        )
+
+    async def _menu_image(self, chat_id: int, user) -> None:
+        await self._start_image_flow(chat_id=chat_id, user=user)
+
+    async def _menu_photo_analysis(self, chat_id: int, user) -> None:
+        await set_pending_action(user, "await_photo_upload")
+        await self._reply(chat_id, t("photo_analysis_prompt_request", user.language))
+
+    async def _menu_explain(self, chat_id: int, user) -> None:
+        await self._start_text_action_flow(chat_id=chat_id, user=user, action="explain_topic")
+
+    async def _menu_solve(self, chat_id: int, user) -> None:
+        await self._start_text_action_flow(chat_id=chat_id, user=user, action="solve_problem")
+
+    async def _menu_summary(self, chat_id: int, user) -> None:
+        await self._start_text_action_flow(chat_id=chat_id, user=user, action="short_summary")
 
     async def _start_image_flow(self, chat_id: int, user) -> None:
         if get_plan(user).name != "pro":
-            await self.telegram_api.send_message(chat_id=chat_id, text=t("image_paid_only", user.language))
+            await self._reply(chat_id, t("image_paid_only", user.language))
             return
 
         await set_pending_action(user, "await_image_prompt")
-        await self.telegram_api.send_message(chat_id=chat_id, text=t("image_prompt_request", user.language))
+        await self._reply(chat_id, t("image_prompt_request", user.language))
 
     async def _start_text_action_flow(self, chat_id: int, user, action: str) -> None:
         key_map = {
@@ -271,7 +291,7 @@ class BotService:
         request_key = key_map.get(action, "request_explain_topic")
         pending_value = pending_map.get(action, "await_explain_topic_input")
         await set_pending_action(user, pending_value)
-        await self.telegram_api.send_message(chat_id=chat_id, text=t(request_key, user.language))
+        await self._reply(chat_id, t(request_key, user.language))
 
     async def _run_llm_action(self, chat_id: int, user, action: str, user_input: str) -> None:
         system_prompt, user_prompt = build_llm_prompts(action, user.language, user_input=user_input)
@@ -293,6 +313,7 @@ class BotService:
 
                 await self.logs.create(
                     telegram_id=user.telegram_id,
+                    timings=self.timings,
                     action=action,
                     plan=user.plan,
                     prompt_text=prompt_for_log,
@@ -316,6 +337,7 @@ class BotService:
 
             await self.logs.create(
                 telegram_id=user.telegram_id,
+                timings=self.timings,
                 action=action,
                 plan=user.plan,
                 prompt_text=prompt_for_log,
@@ -324,16 +346,24 @@ class BotService:
             return
 
         try:
-            llm_result = await self.llm.generate(
-                system_prompt=system_prompt,
-                user_prompt=user_prompt,
-                max_output_tokens=limit_result.max_output_tokens,
-                lang=user.language,
-            )
-            await self.telegram_api.send_message(chat_id=chat_id, text=llm_result.text)
+            with self.timings.span("upstream"):
+                llm_result = await drain.guard(
+                    self.llm.generate(
+                        system_prompt=system_prompt,
+                        user_prompt=user_prompt,
+                        max_output_tokens=limit_result.max_output_tokens,
+                        lang=user.language,
+                        action=action,
+                    )
+                )
+            self.timings.ttfb_ms = llm_result.ttfb_ms
+            with self.timings.span("telegram"):
+                await self.telegram_api.send_message(chat_id=chat_id, text=llm_result.text)
             consume_monthly_tokens(user, llm_result.total_tokens)
             await self.logs.create(
                 telegram_id=user.telegram_id,
+                timings=self.timings,
+                model=llm_result.model,
                 action=action,
                 plan=user.plan,
                 prompt_text=prompt_for_log,
@@ -349,6 +379,8 @@ class BotService:
                 await rollback_long_text_request(user)
             await self.logs.create(
                 telegram_id=user.telegram_id,
+                timings=self.timings,
+                model=self.llm.model,
                 action=action,
                 plan=user.plan,
                 prompt_text=prompt_for_log,
@@ -356,7 +388,7 @@ class BotService:
                 error_message=str(exc)[:500],
             )
             try:
-                await self.telegram_api.send_message(chat_id=chat_id, text=t("llm_error", user.language))
+                await self.telegram_api.send_message(chat_id=chat_id, text=t(_error_key(exc, "llm_error"), user.language))
             except Exception:
                 pass
 
@@ -375,6 +407,7 @@ class BotService:
 
             await self.logs.create(
                 telegram_id=user.telegram_id,
+                timings=self.timings,
                 action="image_generate",
                 plan=user.plan,
                 prompt_text=image_prompt,
@@ -383,10 +416,15 @@ class BotService:
             return
 
         try:
-            result = await self.llm.generate_image(image_prompt)
-            await self.telegram_api.send_photo_bytes(chat_id=chat_id, image_bytes=result.image_bytes)
+            with self.timings.span("upstream"):
+                result = await drain.guard(self.llm.generate_image(image_prompt))
+            self.timings.ttfb_ms = result.ttfb_ms
+            with self.timings.span("telegram"):
+                await self.telegram_api.send_photo_bytes(chat_id=chat_id, image_bytes=result.image_bytes)
             await self.logs.create(
                 telegram_id=user.telegram_id,
+                timings=self.timings,
+                model=result.model,
                 action="image_generate",
                 plan=user.plan,
                 prompt_text=image_prompt,
@@ -397,6 +435,8 @@ class BotService:
             await rollback_image_request(user, used_bonus_credit=limit_result.used_bonus_credit)
             await self.logs.create(
                 telegram_id=user.telegram_id,
+                timings=self.timings,
+                model=self.llm.image_model,
                 action="image_generate",
                 plan=user.plan,
                 prompt_text=image_prompt,
@@ -404,7 +444,7 @@ class BotService:
                 error_message=str(exc)[:500],
             )
             try:
-                await self.telegram_api.send_message(chat_id=chat_id, text=t("image_error", user.language))
+                await self.telegram_api.send_message(chat_id=chat_id, text=t(_error_key(exc, "image_error"), user.language))
             except Exception:
                 pass
 
@@ -424,6 +464,7 @@ class BotService:
                 await self.telegram_api.send_message(chat_id=chat_id, text=t("limit_reached_monthly", user.language))
             await self.logs.create(
                 telegram_id=user.telegram_id,
+                timings=self.timings,
                 action="photo_analysis",
                 plan=user.plan,
                 prompt_text=user_prompt,
@@ -440,6 +481,7 @@ class BotService:
                 await self.telegram_api.send_message(chat_id=chat_id, text=t("photo_analysis_monthly_limit", user.language))
             await self.logs.create(
                 telegram_id=user.telegram_id,
+                timings=self.timings,
                 action="photo_analysis",
                 plan=user.plan,
                 prompt_text=user_prompt,
@@ -449,17 +491,25 @@ class BotService:
 
         largest = max(photo_sizes, key=lambda p: p.file_size or 0)
         try:
-            image_url = await self.telegram_api.get_file_download_url(largest.file_id)
-            llm_result = await self.llm.analyze_photo(
-                image_url=image_url,
-                user_prompt=user_prompt,
-                max_output_tokens=request_limit.max_output_tokens,
-                lang=user.language,
-            )
-            await self.telegram_api.send_message(chat_id=chat_id, text=llm_result.text)
+            with self.timings.span("telegram"):
+                image_url = await self.telegram_api.get_file_download_url(largest.file_id)
+            with self.timings.span("upstream"):
+                llm_result = await drain.guard(
+                    self.llm.analyze_photo(
+                        image_url=image_url,
+                        user_prompt=user_prompt,
+                        max_output_tokens=request_limit.max_output_tokens,
+                        lang=user.language,
+                    )
+                )
+            self.timings.ttfb_ms = llm_result.ttfb_ms
+            with self.timings.span("telegram"):
+                await self.telegram_api.send_message(chat_id=chat_id, text=llm_result.text)
             consume_monthly_tokens(user, llm_result.total_tokens)
             await self.logs.create(
                 telegram_id=user.telegram_id,
+                timings=self.timings,
+                model=llm_result.model,
                 action="photo_analysis",
                 plan=user.plan,
                 prompt_text=user_prompt,
@@ -474,6 +524,8 @@ class BotService:
             await rollback_request(user)
             await self.logs.create(
                 telegram_id=user.telegram_id,
+                timings=self.timings,
+                model=self.llm.model,
                 action="photo_analysis",
                 plan=user.plan,
                 prompt_text=user_prompt,
@@ -481,24 +533,18 @@ class BotService:
                 error_message=str(exc)[:500],
             )
             try:
-                await self.telegram_api.send_message(chat_id=chat_id, text=t("photo_analysis_error", user.language))
+                await self.telegram_api.send_message(
+                    chat_id=chat_id, text=t(_error_key(exc, "photo_analysis_error"), user.language)
+                )
             except Exception:
                 pass
 
     async def _handle_start(self, chat_id: int, user) -> None:
         if user.language not in SUPPORTED_LANGUAGES:
-            await self.telegram_api.send_message(
-                chat_id=chat_id,
-                text=t("choose_language", FALLBACK_LANGUAGE),
-                reply_markup=build_language_keyboard(),
-            )
+            await self._reply(chat_id, t("choose_language", FALLBACK_LANGUAGE), LANGUAGE_MARKUP)
             return
 
-        await self.telegram_api.send_message(
-            chat_id=chat_id,
-            text=t("start_text", user.language),
-            reply_markup=build_main_menu(user.language),
-        )
+        await self._reply(chat_id, t("start_text", user.language), main_menu_markup(user.language))
 
     async def _send_usage(self, chat_id: int, user) -> None:
         plan = get_plan(user)
@@ -528,4 +574,23 @@ class BotService:
             daily_long_text=daily_long_text_usage,
             daily_long_text_limit=plan.daily_long_text_limit,
         )
-        await self.telegram_api.send_message(chat_id=chat_id, text=text)
+        await self._reply(chat_id, text)
+
+    _COMMAND_HANDLERS = {
+        "/start": _command_start,
+        "/help": _command_help,
+        "/cancel": _command_cancel,
+    }
+
+    _MENU_HANDLERS = {
+        "menu_explain": _menu_explain,
+        "menu_solve": _menu_solve,
+        "menu_summary": _menu_summary,
+        "menu_image": _menu_image,
+        "menu_photo_analysis": _menu_photo_analysis,
+        "menu_long_text": _menu_long_text,
+        "menu_limit": _menu_limit,
+        "menu_invite": _menu_invite,
+        "menu_subscription": _menu_subscription,
+        "menu_language": _menu_language,
+    }
@@ -0,0 +1,159 @@
+import asyncio
+import logging
+from datetime import timedelta
+
+import httpx
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.models.broadcast import DELIVERY_BLOCKED, DELIVERY_FAILED, DELIVERY_SENT, Broadcast
+from app.repositories.broadcast_repo import BroadcastRepository
+from app.repositories.user_repo import UserRepository
+from app.services.telegram_api import TelegramAPI
+
+logger = logging.getLogger(__name__)
+
+SEGMENT_SIZE = 5000
+FLUSH_EVERY = 200
+LEASE = timedelta(seconds=120)
+# Transient failures (Telegram 5xx, network errors) are retried with a growing pause before counting as failed.
+DELIVERY_ATTEMPTS = 3
+RETRY_BACKOFF_SECONDS = 2.0
+
+
+class _Pacer:
+    # Spaces sends evenly so a broadcast stays under its own rate and leaves headroom for webhook replies.
+    def __init__(self, rate_per_sec: float):
+        self.interval = 1 / rate_per_sec
+        self.next_at = 0.0
+
+    async def wait(self) -> None:
+        loop = asyncio.get_running_loop()
+        now = loop.time()
+        send_at = max(now, self.next_at)
+        self.next_at = send_at + self.interval
+        if send_at > now:
+            await asyncio.sleep(send_at - now)
+
+
+class BroadcastRunner:
+    def __init__(
+        self,
+        telegram_api: TelegramAPI | None = None,
+        rate_per_sec: float = settings.broadcast_rate_per_sec,
+        concurrency: int = settings.broadcast_concurrency,
+        poll_interval_seconds: float = 5.0,
+    ):
+        self.telegram_api = telegram_api or TelegramAPI(settings.telegram_bot_token)
+        self.pacer = _Pacer(rate_per_sec)
+        self.concurrency = concurrency
+        self.poll_interval_seconds = poll_interval_seconds
+
+    async def _deliver(self, telegram_id: int, text: str) -> int:
+        for attempt in range(1, DELIVERY_ATTEMPTS + 1):
+            await self.pacer.wait()
+            try:
+                await self.telegram_api.send_message(chat_id=telegram_id, text=text)
+                return DELIVERY_SENT
+            except httpx.HTTPStatusError as exc:
+                # 403: the user blocked the bot or deleted the account. Other 4xx (429 is retried by TelegramAPI) are final.
+                if exc.response.status_code == 403:
+                    return DELIVERY_BLOCKED
+                if exc.response.status_code < 500:
+                    return DELIVERY_FAILED
+            except httpx.TransportError:
+                pass
+            except Exception:
+                return DELIVERY_FAILED
+            if attempt < DELIVERY_ATTEMPTS:
+                await asyncio.sleep(RETRY_BACKOFF_SECONDS * attempt)
+        return DELIVERY_FAILED
+
+    async def _flush(self, broadcast_id: int, results: list[tuple[int, int]]) -> str | None:
+        async with SessionLocal() as db:
+            repo = BroadcastRepository(db)
+            await repo.record_deliveries(broadcast_id, results)
+            await repo.renew_lease(broadcast_id, LEASE)
+            status = await repo.get_status(broadcast_id)
+            await db.commit()
+            return status
+
+    async def _run_segment(self, broadcast: Broadcast) -> bool:
+        async with SessionLocal() as db:
+            segment = [
+                row
+                async for row in UserRepository(db).stream_recipients(
+                    after_user_id=broadcast.last_user_id,
+                    limit=SEGMENT_SIZE,
+                    search=broadcast.filter_search,
+                    plan=broadcast.filter_plan,
+                    is_banned=broadcast.filter_is_banned,
+                )
+            ]
+            already_done = (
+                await BroadcastRepository(db).delivered_ids(broadcast.id, [tg_id for _, tg_id in segment])
+                if segment
+                else set()
+            )
+
+        queue: asyncio.Queue[int] = asyncio.Queue()
+        for _, telegram_id in segment:
+            if telegram_id not in already_done:
+                queue.put_nowait(telegram_id)
+
+        results: list[tuple[int, int]] = []
+        stopped = False
+
+        async def worker() -> None:
+            while not stopped:
+                try:
+                    telegram_id = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                results.append((telegram_id, await self._deliver(telegram_id, broadcast.text)))
+
+        workers = [asyncio.create_task(worker()) for _ in range(self.concurrency)]
+        try:
+            while any(not task.done() for task in workers):
+                await asyncio.wait(workers, timeout=1)
+                if len(results) >= FLUSH_EVERY:
+                    batch, results[:] = results[:], []
+                    if await self._flush(broadcast.id, batch) != "running":
+                        stopped = True
+        finally:
+            stopped = True
+            await asyncio.gather(*workers, return_exceptions=True)
+
+        status = await self._flush(broadcast.id, results)
+        if status != "running":
+            return False
+
+        last_user_id = segment[-1][0] if segment else broadcast.last_user_id
+        done = len(segment) < SEGMENT_SIZE
+        async with SessionLocal() as db:
+            await BroadcastRepository(db).advance_checkpoint(broadcast.id, last_user_id, done=done)
+            await db.commit()
+        broadcast.last_user_id = last_user_id
+        return not done
+
+    async def run_once(self) -> bool:
+        async with SessionLocal() as db:
+            broadcast = await BroadcastRepository(db).claim_next(LEASE)
+            await db.commit()
+        if broadcast is None:
+            return False
+
+        while await self._run_segment(broadcast):
+            pass
+        return True
+
+    async def run_forever(self) -> None:
+        while True:
+            try:
+                if await self.run_once():
+                    continue
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Broadcast runner tick failed")
+            await asyncio.sleep(self.poll_interval_seconds)
@@ -0,0 +1,98 @@
+import asyncio
+import logging
+import signal
+import threading
+import time
+from collections.abc import Awaitable
+from typing import TypeVar
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class ShutdownDeadline(Exception):
+    # An Exception on purpose: the handlers' `except Exception` paths roll back the reservation,
+    # write the error log and tell the user, exactly as for an upstream failure.
+    pass
+
+
+class Drain:
+    # Shutdown drain for slow upstream work (LLM, image generation, photo analysis): once a stop signal
+    # arrives, new webhook updates are refused and running jobs get until the deadline to finish.
+    def __init__(self, deadline_seconds: float = settings.shutdown_drain_seconds):
+        self.deadline_seconds = deadline_seconds
+        self.draining = False
+        self.deadline: float | None = None
+        self.in_flight = 0
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._started = asyncio.Event()
+
+    def install_signal_handlers(self) -> None:
+        # Chained in front of the server's own handlers (uvicorn, asyncio.run), which still shut the process down.
+        self._loop = asyncio.get_running_loop()
+        if threading.current_thread() is not threading.main_thread():
+            return
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            previous = signal.getsignal(sig)
+            if not callable(previous):
+                continue
+
+            def handler(signum, frame, previous=previous):
+                self.begin()
+                previous(signum, frame)
+
+            signal.signal(sig, handler)
+
+    def begin(self) -> None:
+        if self.draining:
+            return
+        self.draining = True
+        self.deadline = time.monotonic() + self.deadline_seconds
+        logger.warning("Draining: %s upstream jobs in flight, deadline %gs", self.in_flight, self.deadline_seconds)
+        # May run inside a signal handler, so only hand the wake-up to the loop.
+        loop = self._loop
+        if loop is not None and not loop.is_closed():
+            loop.call_soon_threadsafe(self._started.set)
+        else:
+            self._started.set()
+
+    def remaining(self) -> float:
+        return max(0.0, self.deadline - time.monotonic()) if self.deadline is not None else 0.0
+
+    async def guard(self, job: Awaitable[T]) -> T:
+        # Runs the job; once draining, waits only until the deadline, then cancels it and raises ShutdownDeadline.
+        task = asyncio.ensure_future(job)
+        self.in_flight += 1
+        try:
+            if not self.draining:
+                started = asyncio.ensure_future(self._started.wait())
+                try:
+                    await asyncio.wait({task, started}, return_when=asyncio.FIRST_COMPLETED)
+                finally:
+                    started.cancel()
+            if not task.done():
+                await asyncio.wait({task}, timeout=self.remaining())
+            if not task.done():
+                task.cancel()
+                await asyncio.gather(task, return_exceptions=True)
+                raise ShutdownDeadline(f"Cancelled after the {self.deadline_seconds:g}s shutdown drain deadline")
+            return task.result()
+        except asyncio.CancelledError:
+            task.cancel()
+            raise
+        finally:
+            self.in_flight -= 1
+
+
+def flush_log_handlers() -> None:
+    for handler in logging.getLogger().handlers:
+        try:
+            handler.flush()
+        except Exception:
+            pass
+
+
+drain = Drain()
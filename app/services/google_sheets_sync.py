@@ -1,14 +1,16 @@
 from __future__ import annotations
 
+import hashlib
+import time
 from dataclasses import dataclass
 from pathlib import Path
 
-import gspread
-from google.oauth2.service_account import Credentials
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import settings
+from app.core.plans import normalize_plan
 from app.models.user import User
+from app.repositories.sheet_row_repo import SheetRowRepository
 from app.repositories.user_repo import UserRepository
 from app.services.limits import month_key_now
 
@@ -29,18 +31,36 @@ HEADERS = [
     "month_key",
 ]
 
+INT_COLUMNS = [
+    "monthly_requests_used",
+    "monthly_tokens_used",
+    "monthly_images_used",
+    "monthly_photo_analyses_used",
+    "monthly_long_texts_used",
+    "bonus_image_credits",
+]
+
+PULL_CHUNK_SIZE = 5000
+UPSERT_CHUNK_SIZE = 1000
+# Column A ranges per batch_get when a delta push checks the rows it is about to overwrite.
+CHECK_RANGES_PER_CALL = 100
+
 
 @dataclass
 class SyncResult:
     pulled_updated: int = 0
     pulled_created: int = 0
     pushed_rows: int = 0
+    pulled_rows: int = 0
+    pull_rows_per_sec: float = 0.0
+    push_mode: str = ""
 
 
 class GoogleSheetsSyncService:
     def __init__(self, db: AsyncSession):
         self.db = db
         self.users = UserRepository(db)
+        self.sheet_rows = SheetRowRepository(db)
 
     def _open_worksheet(self):
         if not settings.google_sheets_id:
@@ -50,6 +70,10 @@ class GoogleSheetsSyncService:
         if not credentials_path.exists():
             raise RuntimeError(f"Service account file not found: {credentials_path}")
 
+        # gspread and google-auth cost ~140 ms and several MB per worker at import; load them on first sync.
+        import gspread
+        from google.oauth2.service_account import Credentials
+
         creds = Credentials.from_service_account_file(
             str(credentials_path),
             scopes=["https://www.googleapis.com/auth/spreadsheets"],
@@ -71,12 +95,7 @@ class GoogleSheetsSyncService:
 
     @staticmethod
     def _normalize_plan(value: str | None) -> str:
-        plan = (value or "free").strip().lower()
-        if plan == "paid":
-            return "pro"
-        if plan not in {"free", "student", "pro"}:
-            return "free"
-        return plan
+        return normalize_plan(value)
 
     def _user_to_row(self, u: User) -> list[str]:
         return [
@@ -95,7 +114,24 @@ class GoogleSheetsSyncService:
             u.month_key,
         ]
 
+    def _values_from_sheet(self, telegram_id: int, data: dict[str, str], current: dict | None) -> dict:
+        # Empty language/month_key/counter cells keep the stored value; new users fall back to defaults.
+        base = current or {}
+        values = {
+            "telegram_id": telegram_id,
+            "username": (data.get("username") or "") or None,
+            "first_name": (data.get("first_name") or "") or None,
+            "language": (data.get("language") or base.get("language") or "en")[:8],
+            "plan": self._normalize_plan(data.get("plan")),
+            "is_banned": self._bool_from_string(data.get("is_banned")),
+            "month_key": (data.get("month_key") or base.get("month_key") or month_key_now())[:7],
+        }
+        for column in INT_COLUMNS:
+            values[column] = self._int_from_string(data.get(column), default=base.get(column, 0))
+        return values
+
     async def pull_from_sheets(self) -> SyncResult:
+        started_at = time.perf_counter()
         ws = self._open_worksheet()
         rows = ws.get_all_values()
         if not rows:
@@ -110,6 +146,8 @@ class GoogleSheetsSyncService:
 
         result = SyncResult()
 
+        # Later rows win when the same telegram_id appears twice, as with the old per-row saves.
+        sheet_rows: dict[int, dict[str, str]] = {}
         for raw in rows[1:]:
             if not raw:
                 continue
@@ -119,101 +157,160 @@ class GoogleSheetsSyncService:
             telegram_id = self._int_from_string(data.get("telegram_id"), default=0)
             if telegram_id <= 0:
                 continue
+            sheet_rows[telegram_id] = data
 
-            user = await self.users.get_by_telegram_id(telegram_id)
-            if not user:
-                user = User(
-                    telegram_id=telegram_id,
-                    username=(data.get("username") or "") or None,
-                    first_name=(data.get("first_name") or "") or None,
-                    language=(data.get("language") or "en")[:8],
-                    plan=self._normalize_plan(data.get("plan")),
-                    is_banned=self._bool_from_string(data.get("is_banned")),
-                    month_key=(data.get("month_key") or month_key_now())[:7],
-                    monthly_requests_used=self._int_from_string(data.get("monthly_requests_used")),
-                    monthly_tokens_used=self._int_from_string(data.get("monthly_tokens_used")),
-                    monthly_images_used=self._int_from_string(data.get("monthly_images_used")),
-                    monthly_photo_analyses_used=self._int_from_string(data.get("monthly_photo_analyses_used")),
-                    monthly_long_texts_used=self._int_from_string(data.get("monthly_long_texts_used")),
-                    bonus_image_credits=self._int_from_string(data.get("bonus_image_credits")),
-                )
-                await self.users.save(user)
-                result.pulled_created += 1
-                continue
+        existing = await self.users.get_rows_by_telegram_ids(list(sheet_rows), HEADERS, chunk_size=PULL_CHUNK_SIZE)
 
-            updated = False
-
-            next_username = (data.get("username") or "") or None
-            if user.username != next_username:
-                user.username = next_username
-                updated = True
-
-            next_first_name = (data.get("first_name") or "") or None
-            if user.first_name != next_first_name:
-                user.first_name = next_first_name
-                updated = True
-
-            next_language = (data.get("language") or user.language)[:8]
-            if next_language and user.language != next_language:
-                user.language = next_language
-                updated = True
-
-            next_plan = self._normalize_plan(data.get("plan"))
-            if user.plan != next_plan:
-                user.plan = next_plan
-                updated = True
-
-            next_banned = self._bool_from_string(data.get("is_banned"))
-            if user.is_banned != next_banned:
-                user.is_banned = next_banned
-                updated = True
-
-            next_month_key = (data.get("month_key") or user.month_key)[:7]
-            if next_month_key and user.month_key != next_month_key:
-                user.month_key = next_month_key
-                updated = True
-
-            int_fields = {
-                "monthly_requests_used": "monthly_requests_used",
-                "monthly_tokens_used": "monthly_tokens_used",
-                "monthly_images_used": "monthly_images_used",
-                "monthly_photo_analyses_used": "monthly_photo_analyses_used",
-                "monthly_long_texts_used": "monthly_long_texts_used",
-                "bonus_image_credits": "bonus_image_credits",
-            }
-            for col, attr in int_fields.items():
-                new_val = self._int_from_string(data.get(col), default=getattr(user, attr))
-                if getattr(user, attr) != new_val:
-                    setattr(user, attr, new_val)
-                    updated = True
-
-            if updated:
-                await self.users.save(user)
+        changed: list[dict] = []
+        for telegram_id, data in sheet_rows.items():
+            current = existing.get(telegram_id)
+            values = self._values_from_sheet(telegram_id, data, current)
+            if current is None:
+                result.pulled_created += 1
+            elif values != current:
                 result.pulled_updated += 1
+            else:
+                continue
+            changed.append(values)
 
+        await self.users.upsert_many(changed, update_columns=HEADERS[1:], chunk_size=UPSERT_CHUNK_SIZE)
         await self.db.commit()
+
+        elapsed = time.perf_counter() - started_at
+        result.pulled_rows = len(sheet_rows)
+        result.pull_rows_per_sec = round(len(sheet_rows) / elapsed, 1) if elapsed > 0 else 0.0
         return result
 
-    async def push_to_sheets(self) -> SyncResult:
-        ws = self._open_worksheet()
-        users = await self.users.list_all_users()
+    @staticmethod
+    def _row_hash(row: list[str]) -> str:
+        return hashlib.blake2b("\x1f".join(row).encode("utf-8"), digest_size=16).hexdigest()
 
-        values = ws.get_all_values()
-        if not values:
-            ws.append_row(HEADERS)
-            values = [HEADERS]
+    @staticmethod
+    def _row_range(first_row: int, last_row: int) -> str:
+        from gspread.utils import rowcol_to_a1
 
-        header = [h.strip() for h in values[0]]
-        if header != HEADERS:
-            ws.clear()
-            ws.append_row(HEADERS)
-            values = [HEADERS]
+        return f"A{first_row}:{rowcol_to_a1(last_row, len(HEADERS))}"
 
+    def _layout_matches(self, ws, row_map: dict[int, tuple[int, str]]) -> bool:
+        # One call for the header and column A: enough to notice cleared, sorted or hand-edited sheets.
+        header_values, id_values = ws.batch_get(["1:1", "A:A"])
+        header = [h.strip() for h in (header_values[0] if header_values else [])]
+        if header != HEADERS:
+            return False
+
+        sheet_ids = [row[0] if row else "" for row in id_values]
+        if len(sheet_ids) != len(row_map) + 1:
+            return False
+        for telegram_id, (row_number, _) in row_map.items():
+            if row_number > len(sheet_ids) or sheet_ids[row_number - 1].strip() != str(telegram_id):
+                return False
+        return True
+
+    def _rows_match(self, ws, expected: dict[int, int], next_row: int) -> bool:
+        # Reads the header and column A of only the rows a delta push writes, so an outbox tick stays O(changes).
+        runs: list[list[int]] = []
+        for row_number in sorted(expected):
+            if runs and runs[-1][1] == row_number - 1:
+                runs[-1][1] = row_number
+            else:
+                runs.append([row_number, row_number])
+        ranges = ["1:1", f"A{next_row}", *(f"A{first}:A{last}" for first, last in runs)]
+        values = []
+        for start in range(0, len(ranges), CHECK_RANGES_PER_CALL):
+            values.extend(ws.batch_get(ranges[start : start + CHECK_RANGES_PER_CALL]))
+
+        header_values, append_values, *run_values = values
+        header = [h.strip() for h in (header_values[0] if header_values else [])]
+        if header != HEADERS:
+            return False
+        # Rows added by hand below ours would be overwritten by the append.
+        if any(cell.strip() for row in append_values for cell in row):
+            return False
+        for (first, last), cells in zip(runs, run_values):
+            sheet_ids = [row[0].strip() if row else "" for row in cells]
+            sheet_ids += [""] * (last - first + 1 - len(sheet_ids))
+            for row_number, sheet_id in enumerate(sheet_ids, start=first):
+                if sheet_id != str(expected[row_number]):
+                    return False
+        return True
+
+    async def _push_full(self, ws, users: list[User]) -> SyncResult:
         rows = [HEADERS] + [self._user_to_row(u) for u in users]
         ws.clear()
         ws.update("A1", rows, value_input_option="RAW")
 
-        return SyncResult(pushed_rows=len(users))
+        await self.sheet_rows.replace_all(
+            [
+                {"telegram_id": u.telegram_id, "row_number": index, "row_hash": self._row_hash(row)}
+                for index, (u, row) in enumerate(zip(users, rows[1:]), start=2)
+            ]
+        )
+        await self.db.commit()
+        return SyncResult(pushed_rows=len(users), push_mode="full")
+
+    async def _push_delta(
+        self, ws, users: list[User], row_map: dict[int, tuple[int, str]], check_rows: bool = False
+    ) -> SyncResult | None:
+        # With check_rows, returns None instead of writing when the sheet no longer matches row_map.
+        next_row = len(row_map) + 2
+        updates: list[dict] = []
+        appended: list[list[str]] = []
+        state: list[dict] = []
+        overwritten: dict[int, int] = {}
+        for u in users:
+            row = self._user_to_row(u)
+            row_hash = self._row_hash(row)
+            known = row_map.get(u.telegram_id)
+            if known is None:
+                row_number = next_row + len(appended)
+                appended.append(row)
+            elif known[1] != row_hash:
+                row_number = known[0]
+                overwritten[row_number] = u.telegram_id
+                updates.append({"range": self._row_range(row_number, row_number), "values": [row]})
+            else:
+                continue
+            state.append({"telegram_id": u.telegram_id, "row_number": row_number, "row_hash": row_hash})
+
+        if check_rows and updates and not self._rows_match(ws, overwritten, next_row):
+            return None
+
+        if appended:
+            last_row = next_row + len(appended) - 1
+            if last_row > ws.row_count:
+                ws.add_rows(last_row - ws.row_count)
+            updates.append({"range": self._row_range(next_row, last_row), "values": appended})
+
+        if updates:
+            ws.batch_update(updates, value_input_option="RAW")
+            await self.sheet_rows.upsert_many(state)
+            await self.db.commit()
+
+        return SyncResult(pushed_rows=len(state), push_mode="delta")
+
+    async def push_to_sheets(self) -> SyncResult:
+        ws = self._open_worksheet()
+        users = await self.users.list_all_users()
+        row_map = await self.sheet_rows.get_all()
+
+        # Rows of users deleted from the database only go away with a rewrite, which also renumbers the rest.
+        stale = row_map.keys() - {u.telegram_id for u in users}
+        if not row_map or stale or not self._layout_matches(ws, row_map):
+            return await self._push_full(ws, users)
+        return await self._push_delta(ws, users, row_map)
+
+    async def push_users(self, telegram_ids: list[int]) -> SyncResult:
+        ws = self._open_worksheet()
+        row_map = await self.sheet_rows.get_all()
+        users = await self.users.list_by_telegram_ids(telegram_ids)
+
+        found = {u.telegram_id for u in users}
+        deleted = any(telegram_id in row_map and telegram_id not in found for telegram_id in telegram_ids)
+        if row_map and not deleted:
+            result = await self._push_delta(ws, users, row_map, check_rows=True)
+            if result is not None:
+                return result
+        return await self._push_full(ws, await self.users.list_all_users())
 
     async def sync_both(self) -> SyncResult:
         pulled = await self.pull_from_sheets()
@@ -222,4 +319,7 @@ class GoogleSheetsSyncService:
             pulled_updated=pulled.pulled_updated,
             pulled_created=pulled.pulled_created,
             pushed_rows=pushed.pushed_rows,
+            push_mode=pushed.push_mode,
+            pulled_rows=pulled.pulled_rows,
+            pull_rows_per_sec=pulled.pull_rows_per_sec,
         )
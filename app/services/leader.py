@@ -0,0 +1,111 @@
+import asyncio
+import logging
+import os
+import socket
+import uuid
+from collections.abc import Awaitable, Callable
+
+from app.core.config import settings
+from app.core.metrics import leader_status
+
+logger = logging.getLogger(__name__)
+
+# Take a free lease, or extend it if it is still ours. A worker that stalled past its TTL cannot renew or
+# release a lease another worker has taken over since, and one that briefly lost Redis resumes its own lease.
+ACQUIRE_LUA = """
+local owner = redis.call('GET', KEYS[1])
+if not owner then
+    return redis.call('SET', KEYS[1], ARGV[1], 'PX', ARGV[2]) and 1 or 0
+end
+if owner == ARGV[1] then
+    return redis.call('PEXPIRE', KEYS[1], ARGV[2])
+end
+return 0
+"""
+RELEASE_LUA = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+class LeaderElection:
+    # One lease in Redis; its holder runs the singleton duties, the other workers only serve requests.
+    def __init__(
+        self,
+        key: str = settings.leader_key,
+        lease_seconds: float = settings.leader_lease_seconds,
+        renew_seconds: float = settings.leader_renew_seconds,
+    ):
+        self.key = key
+        self.lease_ms = int(lease_seconds * 1000)
+        self.renew_seconds = renew_seconds
+        self.identity = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.is_leader = False
+        self._redis = None
+
+    async def _acquire_or_renew(self) -> bool:
+        return bool(await self._redis.eval(ACQUIRE_LUA, 1, self.key, self.identity, self.lease_ms))
+
+    async def _release(self) -> None:
+        try:
+            await self._redis.eval(RELEASE_LUA, 1, self.key, self.identity)
+        except Exception:
+            logger.warning("Could not release leader lease %s", self.key, exc_info=True)
+
+    def _set_leader(self, is_leader: bool) -> None:
+        if is_leader != self.is_leader:
+            logger.info("Worker %s %s leadership", self.identity, "acquired" if is_leader else "lost")
+        self.is_leader = is_leader
+        leader_status.set(1 if is_leader else 0)
+
+    async def run_forever(self, duties: Callable[[], Awaitable[None]]) -> None:
+        if not settings.redis_url:
+            # Single-process deployments: this worker is the only one, so it leads.
+            self._set_leader(True)
+            while True:
+                try:
+                    await duties()
+                    return
+                except asyncio.CancelledError:
+                    raise
+                except Exception:
+                    # Same cadence as the Redis path, e.g. setWebhook failing while the network is still coming up.
+                    logger.error("Singleton duties failed; restarting", exc_info=True)
+                await asyncio.sleep(self.renew_seconds)
+
+        from app.db.redis import redis_client
+
+        self._redis = redis_client
+        duties_task: asyncio.Task | None = None
+        try:
+            while True:
+                try:
+                    leading = await self._acquire_or_renew()
+                except Exception:
+                    # Step down rather than risk two leaders while Redis is unreachable.
+                    logger.warning("Leader lease check failed", exc_info=True)
+                    leading = False
+                self._set_leader(leading)
+
+                if leading and duties_task is None:
+                    duties_task = asyncio.create_task(duties())
+                elif leading and duties_task.done() and not duties_task.cancelled() and duties_task.exception():
+                    logger.error("Singleton duties failed; restarting", exc_info=duties_task.exception())
+                    duties_task = asyncio.create_task(duties())
+                elif not leading and duties_task is not None:
+                    duties_task.cancel()
+                    await asyncio.gather(duties_task, return_exceptions=True)
+                    duties_task = None
+                await asyncio.sleep(self.renew_seconds)
+        finally:
+            if duties_task is not None:
+                duties_task.cancel()
+                await asyncio.gather(duties_task, return_exceptions=True)
+            if self.is_leader:
+                await self._release()
+                self._set_leader(False)
+
+
+leader = LeaderElection()
@@ -1,6 +1,7 @@
 from dataclasses import dataclass
 from datetime import datetime
 
+from app.core.metrics import quota_rejections
 from app.core.plans import PLAN_MAP, PlanConfig
 from app.models.user import User
 
@@ -14,6 +15,11 @@ class LimitPrecheckResult:
     used_bonus_credit: bool = False
 
 
+def _rejected(reason: str, daily_requests: int = 0) -> LimitPrecheckResult:
+    quota_rejections.inc(reason)
+    return LimitPrecheckResult(allowed=False, reason=reason, daily_requests=daily_requests)
+
+
 def month_key_now() -> str:
     return datetime.utcnow().strftime("%Y-%m")
 
@@ -26,21 +32,35 @@ def get_plan(user: User) -> PlanConfig:
     return PLAN_MAP.get(user.plan, PLAN_MAP["free"])
 
 
+def monthly_reset_values() -> dict:
+    return {
+        "month_key": month_key_now(),
+        "monthly_requests_used": 0,
+        "monthly_tokens_used": 0,
+        "monthly_images_used": 0,
+        "monthly_photo_analyses_used": 0,
+        "monthly_long_texts_used": 0,
+    }
+
+
+def daily_reset_values() -> dict:
+    return {
+        "day_key": day_key_now(),
+        "daily_requests_used": 0,
+        "daily_images_used": 0,
+        "daily_photo_analyses_used": 0,
+        "daily_long_texts_used": 0,
+    }
+
+
 def reset_monthly_limits(user: User) -> None:
-    user.month_key = month_key_now()
-    user.monthly_requests_used = 0
-    user.monthly_tokens_used = 0
-    user.monthly_images_used = 0
-    user.monthly_photo_analyses_used = 0
-    user.monthly_long_texts_used = 0
+    for attr, value in monthly_reset_values().items():
+        setattr(user, attr, value)
 
 
 def reset_daily_limits(user: User) -> None:
-    user.day_key = day_key_now()
-    user.daily_requests_used = 0
-    user.daily_images_used = 0
-    user.daily_photo_analyses_used = 0
-    user.daily_long_texts_used = 0
+    for attr, value in daily_reset_values().items():
+        setattr(user, attr, value)
 
 
 def sync_month_if_needed(user: User) -> None:
@@ -79,19 +99,19 @@ async def precheck_and_consume_request(user: User, estimated_input_tokens: int)
     sync_day_if_needed(user)
 
     if user.monthly_requests_used >= plan.monthly_requests_limit:
-        return LimitPrecheckResult(allowed=False, reason="monthly")
+        return _rejected("monthly")
 
     remaining_monthly_tokens = plan.monthly_tokens_limit - user.monthly_tokens_used
     if remaining_monthly_tokens <= estimated_input_tokens:
-        return LimitPrecheckResult(allowed=False, reason="monthly")
+        return _rejected("monthly")
 
     dynamic_output_limit = min(plan.max_output_tokens, remaining_monthly_tokens - estimated_input_tokens)
     if dynamic_output_limit <= 0:
-        return LimitPrecheckResult(allowed=False, reason="monthly")
+        return _rejected("monthly")
 
     daily_after_increment = user.daily_requests_used + 1
     if daily_after_increment > plan.daily_requests_limit:
-        return LimitPrecheckResult(allowed=False, reason="daily", daily_requests=daily_after_increment)
+        return _rejected("daily", daily_requests=daily_after_increment)
 
     user.daily_requests_used = daily_after_increment
     user.monthly_requests_used += 1
@@ -108,14 +128,14 @@ async def precheck_and_consume_long_text_request(user: User) -> LimitPrecheckRes
     sync_day_if_needed(user)
 
     if plan.monthly_long_text_limit <= 0 or plan.daily_long_text_limit <= 0:
-        return LimitPrecheckResult(allowed=False, reason="long_text_plan")
+        return _rejected("long_text_plan")
 
     if user.monthly_long_texts_used >= plan.monthly_long_text_limit:
-        return LimitPrecheckResult(allowed=False, reason="long_text_monthly")
+        return _rejected("long_text_monthly")
 
     daily_after_increment = user.daily_long_texts_used + 1
     if daily_after_increment > plan.daily_long_text_limit:
-        return LimitPrecheckResult(allowed=False, reason="long_text_daily", daily_requests=daily_after_increment)
+        return _rejected("long_text_daily", daily_requests=daily_after_increment)
 
     user.daily_long_texts_used = daily_after_increment
     user.monthly_long_texts_used += 1
@@ -130,17 +150,17 @@ async def precheck_and_consume_image_request(user: User) -> LimitPrecheckResult:
     use_bonus_credit = False
     if plan.monthly_images_limit <= 0:
         if user.bonus_image_credits <= 0:
-            return LimitPrecheckResult(allowed=False, reason="image_plan")
+            return _rejected("image_plan")
         use_bonus_credit = True
     elif user.monthly_images_used >= plan.monthly_images_limit:
         if user.bonus_image_credits <= 0:
-            return LimitPrecheckResult(allowed=False, reason="image_monthly")
+            return _rejected("image_monthly")
         use_bonus_credit = True
 
     effective_daily_limit = plan.daily_images_limit if plan.daily_images_limit > 0 else 1
     daily_after_increment = user.daily_images_used + 1
     if daily_after_increment > effective_daily_limit:
-        return LimitPrecheckResult(allowed=False, reason="image_daily", daily_requests=daily_after_increment)
+        return _rejected("image_daily", daily_requests=daily_after_increment)
 
     user.daily_images_used = daily_after_increment
     if use_bonus_credit:
@@ -157,11 +177,11 @@ async def precheck_and_consume_photo_analysis_request(user: User) -> LimitPreche
     sync_day_if_needed(user)
 
     if user.monthly_photo_analyses_used >= plan.monthly_photo_analysis_limit:
-        return LimitPrecheckResult(allowed=False, reason="photo_monthly")
+        return _rejected("photo_monthly")
 
     daily_after_increment = user.daily_photo_analyses_used + 1
     if daily_after_increment > plan.daily_photo_analysis_limit:
-        return LimitPrecheckResult(allowed=False, reason="photo_daily", daily_requests=daily_after_increment)
+        return _rejected("photo_daily", daily_requests=daily_after_increment)
 
     user.daily_photo_analyses_used = daily_after_increment
     user.monthly_photo_analyses_used += 1
@@ -1,9 +1,11 @@
 import base64
+import time
 from dataclasses import dataclass
 
 import httpx
 
 from app.core.config import settings
+from app.core.metrics import image_generation_seconds, llm_request_seconds, upstream_call
 from app.core.i18n import t
 
 
@@ -14,6 +16,7 @@ class LLMResult:
     output_tokens: int
     total_tokens: int
     model: str
+    ttfb_ms: float | None = None
 
 
 @dataclass
@@ -21,6 +24,7 @@ class ImageResult:
     image_bytes: bytes
     mime_type: str
     model: str
+    ttfb_ms: float | None = None
 
 
 class LLMService:
@@ -28,14 +32,28 @@ class LLMService:
         self.api_key = settings.openai_api_key
         self.model = settings.openai_model
         self.image_model = settings.openai_image_model
-        self.base_url = "https://api.openai.com/v1/responses"
-        self.image_url = "https://api.openai.com/v1/images/generations"
+        api_root = settings.openai_base_url.rstrip("/")
+        self.base_url = f"{api_root}/responses"
+        self.image_url = f"{api_root}/images/generations"
+
+    @staticmethod
+    async def _post_json(url: str, headers: dict, payload: dict, timeout: float) -> tuple[dict, float]:
+        # Streamed only to time the response headers (time to first byte) apart from the body download.
+        async with httpx.AsyncClient(timeout=timeout) as client:
+            started_at = time.perf_counter()
+            async with client.stream("POST", url, headers=headers, json=payload) as response:
+                ttfb_ms = (time.perf_counter() - started_at) * 1000
+                await response.aread()
+        response.raise_for_status()
+        return response.json(), ttfb_ms
 
     def estimate_tokens(self, text: str) -> int:
         # Approximation suitable for pre-check before real provider usage report.
         return max(1, len(text) // 4)
 
-    async def generate(self, system_prompt: str, user_prompt: str, max_output_tokens: int, lang: str) -> LLMResult:
+    async def generate(
+        self, system_prompt: str, user_prompt: str, max_output_tokens: int, lang: str, action: str = "generate"
+    ) -> LLMResult:
         if not self.api_key:
             message = t("generic_answer", lang)
             in_tokens = self.estimate_tokens(system_prompt + user_prompt)
@@ -67,10 +85,8 @@ class LLMService:
             "max_output_tokens": max_output_tokens,
         }
 
-        async with httpx.AsyncClient(timeout=40) as client:
-            response = await client.post(self.base_url, headers=headers, json=payload)
-            response.raise_for_status()
-            data = response.json()
+        with upstream_call(llm_request_seconds, "openai", action, self.model):
+            data, ttfb_ms = await self._post_json(self.base_url, headers, payload, timeout=40)
 
         text = data.get("output_text")
         if not text:
@@ -87,6 +103,7 @@ class LLMService:
             output_tokens=output_tokens,
             total_tokens=total_tokens,
             model=data.get("model", self.model),
+            ttfb_ms=ttfb_ms,
         )
 
     async def generate_image(self, prompt: str) -> ImageResult:
@@ -103,10 +120,8 @@ class LLMService:
             "size": "1024x1024",
         }
 
-        async with httpx.AsyncClient(timeout=80) as client:
-            response = await client.post(self.image_url, headers=headers, json=payload)
-            response.raise_for_status()
-            data = response.json()
+        with upstream_call(image_generation_seconds, "openai", self.image_model):
+            data, ttfb_ms = await self._post_json(self.image_url, headers, payload, timeout=80)
 
         item = (data.get("data") or [{}])[0]
         b64 = item.get("b64_json")
@@ -117,6 +132,7 @@ class LLMService:
             image_bytes=base64.b64decode(b64),
             mime_type="image/png",
             model=data.get("model", self.image_model),
+            ttfb_ms=ttfb_ms,
         )
 
     async def analyze_photo(self, image_url: str, user_prompt: str, max_output_tokens: int, lang: str) -> LLMResult:
@@ -154,10 +170,8 @@ class LLMService:
             "max_output_tokens": max_output_tokens,
         }
 
-        async with httpx.AsyncClient(timeout=80) as client:
-            response = await client.post(self.base_url, headers=headers, json=payload)
-            response.raise_for_status()
-            data = response.json()
+        with upstream_call(llm_request_seconds, "openai", "photo_analysis", self.model):
+            data, ttfb_ms = await self._post_json(self.base_url, headers, payload, timeout=80)
 
         text = data.get("output_text") or self._extract_text(data)
         usage = data.get("usage", {})
@@ -171,6 +185,7 @@ class LLMService:
             output_tokens=output_tokens,
             total_tokens=total_tokens,
             model=data.get("model", self.model),
+            ttfb_ms=ttfb_ms,
         )
 
     @staticmethod
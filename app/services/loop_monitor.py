@@ -0,0 +1,106 @@
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from datetime import datetime, timezone
+
+from app.core.config import settings
+from app.core.metrics import event_loop_lag_recent, event_loop_lag_seconds, event_loop_stalls
+
+logger = logging.getLogger(__name__)
+
+RECENT_SAMPLES = 600
+MAX_STALLS = 20
+STACK_LIMIT = 30
+
+
+class LoopLagMonitor:
+    def __init__(
+        self,
+        enabled: bool = settings.loop_monitor_enabled,
+        interval_seconds: float = settings.loop_monitor_interval_seconds,
+        stall_ms: int = settings.loop_monitor_stall_ms,
+    ):
+        self.enabled = enabled
+        self.interval = interval_seconds
+        self.stall_threshold = stall_ms / 1000
+        self.recent: deque[float] = deque(maxlen=RECENT_SAMPLES)
+        self.stalls: deque[dict] = deque(maxlen=MAX_STALLS)
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._loop_thread_id: int | None = None
+        self._heartbeat = time.monotonic()
+        self._open_stall: dict | None = None
+        self._stop = threading.Event()
+
+    def quantiles(self) -> dict[str, float]:
+        samples = sorted(self.recent)
+        if not samples:
+            return {}
+        last = len(samples) - 1
+        return {quantile: samples[min(last, int(float(quantile) * len(samples)))] for quantile in ("0.5", "0.9", "0.99", "1")}
+
+    def export(self) -> None:
+        for quantile, value in self.quantiles().items():
+            event_loop_lag_recent.set(value, quantile)
+
+    def _capture(self, blocked_for: float) -> dict:
+        frame = sys._current_frames().get(self._loop_thread_id)
+        task = asyncio.current_task(self._loop)
+        coro = task.get_coro() if task else None
+        return {
+            "at": datetime.now(timezone.utc).isoformat(),
+            "blocked_ms_at_capture": round(blocked_for * 1000, 1),
+            "lag_ms": None,
+            "task": task.get_name() if task else None,
+            "coroutine": getattr(coro, "__qualname__", None),
+            "stack": traceback.format_stack(frame, limit=STACK_LIMIT) if frame else [],
+        }
+
+    def _watch(self) -> None:
+        # The loop cannot observe itself while blocked, so a thread grabs the loop thread's stack mid-stall.
+        check_every = max(0.01, self.stall_threshold / 2)
+        captured_heartbeat = None
+        while not self._stop.wait(check_every):
+            heartbeat = self._heartbeat
+            blocked_for = time.monotonic() - heartbeat - self.interval
+            if blocked_for < self.stall_threshold or heartbeat == captured_heartbeat:
+                continue
+            captured_heartbeat = heartbeat
+            stall = self._capture(blocked_for)
+            self._open_stall = stall
+            self.stalls.append(stall)
+            logger.warning(
+                "Event loop blocked for %.0f ms in task %s (%s):\n%s",
+                blocked_for * 1000,
+                stall["task"],
+                stall["coroutine"],
+                "".join(stall["stack"]),
+            )
+
+    async def run_forever(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._stop.clear()
+        watchdog = threading.Thread(target=self._watch, name="loop-lag-watchdog", daemon=True)
+        watchdog.start()
+        try:
+            while True:
+                scheduled_at = time.perf_counter()
+                self._heartbeat = time.monotonic()
+                await asyncio.sleep(self.interval)
+                lag = max(0.0, time.perf_counter() - scheduled_at - self.interval)
+                self.recent.append(lag)
+                event_loop_lag_seconds.observe(lag)
+                if lag >= self.stall_threshold:
+                    event_loop_stalls.inc()
+                    if self._open_stall is not None:
+                        self._open_stall["lag_ms"] = round(lag * 1000, 1)
+                self._open_stall = None
+        finally:
+            self._stop.set()
+
+
+loop_monitor = LoopLagMonitor()
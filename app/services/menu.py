@@ -1,4 +1,6 @@
-from app.core.i18n import SUPPORTED_LANGUAGES, t
+import json
+
+from app.core.i18n import FALLBACK_LANGUAGE, SUPPORTED_LANGUAGES, t
 
 
 def build_main_menu(lang: str) -> dict:
@@ -42,3 +44,21 @@ def build_subscription_keyboard(lang: str) -> dict:
             ]
         ]
     }
+
+
+def _serialize(markup: dict) -> str:
+    return json.dumps(markup, ensure_ascii=False, separators=(",", ":"))
+
+
+# Keyboards never change at runtime: serialize them once per language. Telegram accepts reply_markup as a JSON string.
+MAIN_MENU_MARKUP = {lang: _serialize(build_main_menu(lang)) for lang in SUPPORTED_LANGUAGES}
+SUBSCRIPTION_MARKUP = {lang: _serialize(build_subscription_keyboard(lang)) for lang in SUPPORTED_LANGUAGES}
+LANGUAGE_MARKUP = _serialize(build_language_keyboard())
+
+
+def main_menu_markup(lang: str) -> str:
+    return MAIN_MENU_MARKUP.get(lang) or MAIN_MENU_MARKUP[FALLBACK_LANGUAGE]
+
+
+def subscription_markup(lang: str) -> str:
+    return SUBSCRIPTION_MARKUP.get(lang) or SUBSCRIPTION_MARKUP[FALLBACK_LANGUAGE]
@@ -0,0 +1,115 @@
+import asyncio
+import logging
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Protocol
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.repositories.outbox_repo import OutboxRepository
+
+logger = logging.getLogger(__name__)
+
+
+class OutboxSink(Protocol):
+    name: str
+
+    async def apply(self, db: AsyncSession, telegram_ids: list[int]) -> None: ...
+
+
+class GoogleSheetsSink:
+    name = "google_sheets"
+
+    async def apply(self, db: AsyncSession, telegram_ids: list[int]) -> None:
+        from app.services.google_sheets_sync import GoogleSheetsSyncService
+
+        await GoogleSheetsSyncService(db).push_users(telegram_ids)
+
+
+@dataclass
+class OutboxBatchResult:
+    sink: str
+    events: int = 0
+    users: int = 0
+    lag_seconds: float = 0.0
+
+
+def default_sinks() -> list[OutboxSink]:
+    sinks: list[OutboxSink] = []
+    if settings.google_sheets_id:
+        sinks.append(GoogleSheetsSink())
+    return sinks
+
+
+class OutboxConsumer:
+    def __init__(
+        self,
+        sinks: list[OutboxSink],
+        batch_size: int = settings.outbox_batch_size,
+        poll_interval_seconds: float = settings.outbox_poll_interval_seconds,
+    ):
+        self.sinks = sinks
+        self.batch_size = batch_size
+        self.poll_interval_seconds = poll_interval_seconds
+        self.last_results: dict[str, OutboxBatchResult] = {}
+
+    async def run_once(self) -> list[OutboxBatchResult]:
+        results = []
+        for sink in self.sinks:
+            result = await self._consume(sink)
+            if result is not None:
+                self.last_results[sink.name] = result
+                results.append(result)
+
+        async with SessionLocal() as db:
+            await OutboxRepository(db).purge_consumed([sink.name for sink in self.sinks])
+            await db.commit()
+        return results
+
+    async def _consume(self, sink: OutboxSink) -> OutboxBatchResult | None:
+        # Short transactions on both sides of the sink call: nothing stays open during Sheets HTTP requests.
+        async with SessionLocal() as db:
+            repo = OutboxRepository(db)
+            checkpoint = await repo.get_checkpoint(sink.name)
+            previous = (checkpoint.last_xid, checkpoint.last_id)
+            events = await repo.fetch_batch(checkpoint, self.batch_size)
+            await db.commit()
+        if not events:
+            return OutboxBatchResult(sink=sink.name)
+
+        telegram_ids = sorted({event.telegram_id for event in events})
+        async with SessionLocal() as sink_db:
+            await sink.apply(sink_db, telegram_ids)
+
+        # Checkpoint moves only after the sink succeeded: a crash replays the batch (at-least-once).
+        last = events[-1]
+        async with SessionLocal() as db:
+            advanced = await OutboxRepository(db).advance_checkpoint(sink.name, previous, (last.xid, last.id))
+            await db.commit()
+        if not advanced:
+            logger.warning("Outbox checkpoint for %s moved during the batch; another consumer is running", sink.name)
+            return None
+
+        oldest = min(event.created_at for event in events)
+        lag = (datetime.now(timezone.utc) - oldest).total_seconds()
+        return OutboxBatchResult(
+            sink=sink.name,
+            events=len(events),
+            users=len(telegram_ids),
+            lag_seconds=round(max(0.0, lag), 3),
+        )
+
+    async def run_forever(self) -> None:
+        while True:
+            try:
+                results = await self.run_once()
+                # Drain a backlog without waiting for the next tick.
+                if any(result.events >= self.batch_size for result in results):
+                    continue
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Outbox consumer tick failed")
+            await asyncio.sleep(self.poll_interval_seconds)
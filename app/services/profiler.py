@@ -0,0 +1,151 @@
+import inspect
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from dataclasses import dataclass, field
+
+# Leaf frames of threads that are waiting rather than working (event loop poll, parked threads).
+# uvloop polls in C, so its idle loop thread stops at the Python frame that started the loop.
+IDLE_LEAVES = {
+    ("selectors.py", "select"),
+    ("threading.py", "wait"),
+    ("thread.py", "_worker"),
+    ("runners.py", "run"),
+    ("base_events.py", "run_forever"),
+}
+MAX_STACK_DEPTH = 128
+# asyncio's own loop frames between the entry point and the coroutines it steps.
+_LOOP_INTERNALS = {"events.py", "base_events.py"}
+
+
+def _short_path(filename: str) -> str:
+    cwd = os.getcwd()
+    if filename.startswith(cwd):
+        return os.path.relpath(filename, cwd)
+    parts = filename.replace("\\", "/").split("/")
+    return "/".join(parts[-2:])
+
+
+@dataclass
+class ProfileResult:
+    duration_seconds: float
+    interval_seconds: float
+    samples: int = 0
+    idle_samples: int = 0
+    stacks: Counter = field(default_factory=Counter)
+    self_counts: Counter = field(default_factory=Counter)
+    total_counts: Counter = field(default_factory=Counter)
+
+    def collapsed(self) -> str:
+        # Brendan Gregg's folded format: "root;caller;callee count", one stack per line.
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+    def top(self, limit: int) -> list[dict]:
+        busy = max(1, self.samples - self.idle_samples)
+        return [
+            {
+                "function": name,
+                "self_samples": self.self_counts[name],
+                "self_pct": round(self.self_counts[name] / busy * 100, 2),
+                "total_samples": self.total_counts[name],
+                "total_pct": round(self.total_counts[name] / busy * 100, 2),
+            }
+            for name, _ in self.self_counts.most_common(limit)
+        ]
+
+
+def loop_entry() -> tuple[int, object] | None:
+    # Call from a coroutine: the running loop's thread and the code that entered the loop (asyncio.run,
+    # uvicorn's runner). That frame is only ever a leaf while the loop waits in native code, e.g. uvloop's poll.
+    frame, entry = sys._getframe(1), None
+    while frame is not None:
+        if frame.f_code.co_flags & (inspect.CO_COROUTINE | inspect.CO_ASYNC_GENERATOR | inspect.CO_ITERABLE_COROUTINE):
+            entry = None
+        elif entry is None and os.path.basename(frame.f_code.co_filename) not in _LOOP_INTERNALS:
+            entry = frame.f_code
+        frame = frame.f_back
+    return (threading.get_ident(), entry) if entry is not None else None
+
+
+class SamplingProfiler:
+    # Samples every thread's Python stack from a background thread; the profiled code is not instrumented.
+    def __init__(self, interval_seconds: float = 0.01, include_idle: bool = False, loop: tuple[int, object] | None = None):
+        self.interval = interval_seconds
+        self.include_idle = include_idle
+        self.loop = loop
+        self._labels: dict = {}
+
+    def _label(self, code) -> str:
+        label = self._labels.get(code)
+        if label is None:
+            label = self._labels[code] = f"{code.co_name} ({_short_path(code.co_filename)}:{code.co_firstlineno})"
+        return label
+
+    def _sample(self, result: ProfileResult, own_ident: int, thread_names: dict[int, str]) -> None:
+        for ident, frame in sys._current_frames().items():
+            if ident == own_ident:
+                continue
+            leaf = frame.f_code
+            result.samples += 1
+            if (os.path.basename(leaf.co_filename), leaf.co_name) in IDLE_LEAVES or (ident, leaf) == self.loop:
+                result.idle_samples += 1
+                if not self.include_idle:
+                    continue
+
+            labels = []
+            while frame is not None and len(labels) < MAX_STACK_DEPTH:
+                labels.append(self._label(frame.f_code))
+                frame = frame.f_back
+            labels.reverse()
+            thread_name = thread_names.get(ident, f"thread-{ident}")
+            result.stacks[";".join([thread_name, *labels])] += 1
+            result.self_counts[labels[-1]] += 1
+            for label in set(labels):
+                result.total_counts[label] += 1
+
+    def run(self, seconds: float) -> ProfileResult:
+        # Blocking; call from a worker thread.
+        result = ProfileResult(duration_seconds=seconds, interval_seconds=self.interval)
+        own_ident = threading.get_ident()
+        deadline = time.monotonic() + seconds
+        next_at = time.monotonic()
+        while next_at < deadline:
+            thread_names = {thread.ident: thread.name for thread in threading.enumerate()}
+            self._sample(result, own_ident, thread_names)
+            next_at += self.interval
+            time.sleep(max(0.0, next_at - time.monotonic()))
+        return result
+
+
+def start_memory_trace(frames: int) -> tuple[tracemalloc.Snapshot, bool]:
+    started_here = not tracemalloc.is_tracing()
+    if started_here:
+        tracemalloc.start(frames)
+    return tracemalloc.take_snapshot(), started_here
+
+
+def finish_memory_trace(before: tracemalloc.Snapshot, started_here: bool, group_by: str, limit: int) -> dict:
+    after = tracemalloc.take_snapshot()
+    traced_current, traced_peak = tracemalloc.get_traced_memory()
+    if started_here:
+        tracemalloc.stop()
+
+    ignore = [tracemalloc.Filter(False, tracemalloc.__file__)]
+    diff = after.filter_traces(ignore).compare_to(before.filter_traces(ignore), group_by)
+    return {
+        "traced_current_bytes": traced_current,
+        "traced_peak_bytes": traced_peak,
+        "top": [
+            {
+                "location": "; ".join(f"{_short_path(frame.filename)}:{frame.lineno}" for frame in stat.traceback),
+                "size_diff_bytes": stat.size_diff,
+                "count_diff": stat.count_diff,
+                "size_bytes": stat.size,
+                "count": stat.count,
+            }
+            for stat in diff[:limit]
+        ],
+    }
@@ -1,5 +1,3 @@
-from app.core.i18n import t
-
 LANGUAGE_HINT = {
     "uk": "Ukrainian",
     "en": "English",
@@ -10,33 +8,6 @@ LANGUAGE_HINT = {
 }
 
 
-def action_from_menu_text(text: str, lang: str) -> str | None:
-    if text == t("menu_explain", lang):
-        return "explain_topic"
-    if text == t("menu_solve", lang):
-        return "solve_problem"
-    if text == t("menu_summary", lang):
-        return "short_summary"
-    if text == t("menu_long_text", lang):
-        return "long_text"
-    return None
-
-
-def is_menu_text(text: str, lang: str) -> bool:
-    return text in {
-        t("menu_explain", lang),
-        t("menu_solve", lang),
-        t("menu_summary", lang),
-        t("menu_image", lang),
-        t("menu_photo_analysis", lang),
-        t("menu_long_text", lang),
-        t("menu_limit", lang),
-        t("menu_invite", lang),
-        t("menu_subscription", lang),
-        t("menu_language", lang),
-    }
-
-
 def build_llm_prompts(action: str, lang: str, user_input: str) -> tuple[str, str]:
     target_language = LANGUAGE_HINT.get(lang, "English")
     system_prompt = (
@@ -0,0 +1,146 @@
+import asyncio
+import logging
+import time
+import weakref
+from contextlib import asynccontextmanager
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Takes one token from the global and the chat bucket atomically, or returns how many ms to wait.
+TOKEN_BUCKET_LUA = """
+local now_parts = redis.call('TIME')
+local now = tonumber(now_parts[1]) * 1000 + math.floor(tonumber(now_parts[2]) / 1000)
+
+local function refill(key, rate, burst)
+    local state = redis.call('HMGET', key, 'tokens', 'ts')
+    local tokens = tonumber(state[1]) or burst
+    local ts = tonumber(state[2]) or now
+    return math.min(burst, tokens + (now - ts) * rate / 1000)
+end
+
+local global_rate, global_burst = tonumber(ARGV[1]), tonumber(ARGV[2])
+local chat_rate, chat_burst = tonumber(ARGV[3]), tonumber(ARGV[4])
+local global_tokens = refill(KEYS[1], global_rate, global_burst)
+local chat_tokens = refill(KEYS[2], chat_rate, chat_burst)
+
+if global_tokens >= 1 and chat_tokens >= 1 then
+    redis.call('HSET', KEYS[1], 'tokens', global_tokens - 1, 'ts', now)
+    redis.call('PEXPIRE', KEYS[1], 60000)
+    redis.call('HSET', KEYS[2], 'tokens', chat_tokens - 1, 'ts', now)
+    redis.call('PEXPIRE', KEYS[2], 60000)
+    return 0
+end
+
+local wait = 0
+if global_tokens < 1 then wait = math.max(wait, (1 - global_tokens) * 1000 / global_rate) end
+if chat_tokens < 1 then wait = math.max(wait, (1 - chat_tokens) * 1000 / chat_rate) end
+return math.ceil(wait)
+"""
+
+
+class LocalTokenBuckets:
+    def __init__(self, global_rate: float, global_burst: int, chat_rate: float, chat_burst: int):
+        self.global_rate = global_rate
+        self.global_burst = global_burst
+        self.chat_rate = chat_rate
+        self.chat_burst = chat_burst
+        self._global = (float(global_burst), time.monotonic())
+        self._chats: dict[int, tuple[float, float]] = {}
+
+    @staticmethod
+    def _refill(state: tuple[float, float], rate: float, burst: int, now: float) -> float:
+        tokens, ts = state
+        return min(burst, tokens + (now - ts) * rate)
+
+    def try_acquire(self, chat_id: int) -> float:
+        now = time.monotonic()
+        global_tokens = self._refill(self._global, self.global_rate, self.global_burst, now)
+        chat_tokens = self._refill(self._chats.get(chat_id, (self.chat_burst, now)), self.chat_rate, self.chat_burst, now)
+
+        if global_tokens >= 1 and chat_tokens >= 1:
+            self._global = (global_tokens - 1, now)
+            self._chats[chat_id] = (chat_tokens - 1, now)
+            if len(self._chats) > 10_000:
+                self._drop_full_buckets(now)
+            return 0.0
+
+        wait = 0.0
+        if global_tokens < 1:
+            wait = max(wait, (1 - global_tokens) / self.global_rate)
+        if chat_tokens < 1:
+            wait = max(wait, (1 - chat_tokens) / self.chat_rate)
+        return wait
+
+    def _drop_full_buckets(self, now: float) -> None:
+        self._chats = {
+            chat_id: state
+            for chat_id, state in self._chats.items()
+            if self._refill(state, self.chat_rate, self.chat_burst, now) < self.chat_burst
+        }
+
+
+class TelegramRateLimiter:
+    def __init__(
+        self,
+        redis_url: str,
+        global_rate: float,
+        global_burst: int,
+        chat_rate: float,
+        chat_burst: int,
+        key_prefix: str = "tg_rate",
+    ):
+        self.redis_url = redis_url
+        self.global_rate = global_rate
+        self.global_burst = global_burst
+        self.chat_rate = chat_rate
+        self.chat_burst = chat_burst
+        self.key_prefix = key_prefix
+        self.local = LocalTokenBuckets(global_rate, global_burst, chat_rate, chat_burst)
+        self._script = None
+        self._chat_locks: weakref.WeakValueDictionary[int, asyncio.Lock] = weakref.WeakValueDictionary()
+
+    def _redis_script(self):
+        if self._script is None:
+            from app.db.redis import redis_client
+
+            self._script = redis_client.register_script(TOKEN_BUCKET_LUA)
+        return self._script
+
+    async def _try_acquire(self, chat_id: int) -> float:
+        if not self.redis_url:
+            return self.local.try_acquire(chat_id)
+
+        try:
+            wait_ms = await self._redis_script()(
+                keys=[f"{self.key_prefix}:global", f"{self.key_prefix}:chat:{chat_id}"],
+                args=[self.global_rate, self.global_burst, self.chat_rate, self.chat_burst],
+            )
+            return int(wait_ms) / 1000
+        except Exception:
+            # Fail open to the per-process buckets rather than stalling replies on a Redis outage.
+            logger.warning("Redis rate limiter unavailable, using local buckets", exc_info=True)
+            return self.local.try_acquire(chat_id)
+
+    @asynccontextmanager
+    async def chat_slot(self, chat_id: int):
+        # The per-chat lock is FIFO, so queued sends (including 429 retries) keep their order within a chat.
+        lock = self._chat_locks.get(chat_id)
+        if lock is None:
+            lock = asyncio.Lock()
+            self._chat_locks[chat_id] = lock
+
+        async with lock:
+            while (wait := await self._try_acquire(chat_id)) > 0:
+                await asyncio.sleep(wait)
+            yield
+
+
+telegram_rate_limiter = TelegramRateLimiter(
+    redis_url=settings.redis_url,
+    global_rate=settings.telegram_global_rate_per_sec,
+    global_burst=settings.telegram_global_burst,
+    chat_rate=settings.telegram_chat_rate_per_sec,
+    chat_burst=settings.telegram_chat_burst,
+)
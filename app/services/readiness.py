@@ -0,0 +1,110 @@
+import asyncio
+import logging
+import time
+
+import httpx
+from sqlalchemy import text
+
+from app.core.config import settings
+from app.core.metrics import worker_id
+from app.db.session import engine, warm_pool
+from app.services.drain import drain
+from app.services.leader import leader
+
+logger = logging.getLogger(__name__)
+
+CHECK_TIMEOUT_SECONDS = 3.0
+
+
+async def _timed(check) -> dict:
+    started_at = time.perf_counter()
+    try:
+        detail = await asyncio.wait_for(check(), CHECK_TIMEOUT_SECONDS)
+        ok = True
+    except Exception as exc:
+        # The message can carry URLs with the bot token or DSNs; /health/ready is public, so it only goes to the log.
+        logger.warning("Readiness check %s failed", check.__name__, exc_info=True)
+        detail = type(exc).__name__
+        ok = False
+    result = {"ok": ok, "latency_ms": round((time.perf_counter() - started_at) * 1000, 1)}
+    if detail:
+        result["detail"] = detail
+    return result
+
+
+async def check_postgres() -> None:
+    async with engine.connect() as conn:
+        await conn.execute(text("SELECT 1"))
+
+
+async def check_redis() -> None:
+    from app.db.redis import redis_client
+
+    await redis_client.ping()
+
+
+async def _reachable(url: str, headers: dict | None = None) -> str:
+    # Any answer below 500 proves DNS, TLS and the route work; 401/404 from a stub or a keyless call still count.
+    async with httpx.AsyncClient(timeout=CHECK_TIMEOUT_SECONDS) as client:
+        response = await client.get(url, headers=headers)
+    if response.status_code >= 500:
+        raise RuntimeError(f"HTTP {response.status_code}")
+    return f"HTTP {response.status_code}"
+
+
+async def check_telegram() -> str:
+    return await _reachable(f"{settings.telegram_api_base_url.rstrip('/')}/bot{settings.telegram_bot_token}/getMe")
+
+
+async def check_openai() -> str:
+    headers = {"Authorization": f"Bearer {settings.openai_api_key}"} if settings.openai_api_key else None
+    return await _reachable(f"{settings.openai_base_url.rstrip('/')}/models", headers=headers)
+
+
+class Readiness:
+    def __init__(self, upstream_ttl_seconds: float = settings.readiness_upstream_ttl_seconds):
+        self.ready = False
+        self.upstream_ttl = upstream_ttl_seconds
+        self._upstreams: dict = {}
+        self._upstreams_checked_at = 0.0
+
+    async def warm_up(self) -> None:
+        # Menus and i18n tables are compiled when app.core.i18n / app.services.menu are imported,
+        # which happens before the lifespan runs; what is left is opening connections.
+        warmed, upstreams = await asyncio.gather(warm_pool(settings.db_pool_warm_connections), self._upstream_checks())
+        if settings.redis_url:
+            try:
+                await check_redis()
+            except Exception:
+                # Not fatal: the rate limiter falls back to local buckets; /health/ready reports it.
+                logger.warning("Redis unavailable during warm-up", exc_info=True)
+        logger.info("Warm-up done: %s DB connections opened, upstreams %s", warmed, upstreams)
+        self.ready = True
+
+    async def _upstream_checks(self) -> dict:
+        # Cached: probes run every few seconds and should not turn into Bot API / OpenAI traffic.
+        if time.monotonic() - self._upstreams_checked_at >= self.upstream_ttl:
+            telegram, openai = await asyncio.gather(_timed(check_telegram), _timed(check_openai))
+            self._upstreams = {"telegram": telegram, "openai": openai}
+            self._upstreams_checked_at = time.monotonic()
+        return self._upstreams
+
+    async def check(self) -> tuple[bool, dict]:
+        checks = {"postgres": _timed(check_postgres)}
+        if settings.redis_url:
+            checks["redis"] = _timed(check_redis)
+        results = dict(zip(checks, await asyncio.gather(*checks.values())))
+        upstreams = await self._upstream_checks()
+
+        required = list(results.values())
+        if settings.readiness_require_upstreams:
+            required += list(upstreams.values())
+        ok = self.ready and not drain.draining and all(result["ok"] for result in required)
+        if drain.draining:
+            status = "draining"
+        else:
+            status = "ready" if ok else ("starting" if not self.ready else "unavailable")
+        return ok, {"status": status, "worker": worker_id(), "leader": leader.is_leader, "checks": results, "upstreams": upstreams}
+
+
+readiness = Readiness()
@@ -1,31 +1,95 @@
+import asyncio
+from dataclasses import dataclass
+
 import httpx
 
+from app.core.config import settings
+from app.core.metrics import telegram_api_seconds, upstream_call, upstream_errors
 from app.schemas.telegram import TelegramResponse
+from app.services.rate_limiter import TelegramRateLimiter, telegram_rate_limiter
+
+
+@dataclass
+class DeferredMethod:
+    # A Bot API call returned in the webhook HTTP response instead of a separate outbound request.
+    method: str
+    params: dict
+
+    def as_webhook_response(self) -> dict:
+        return {"method": self.method, **self.params}
 
 
 class TelegramAPI:
-    def __init__(self, bot_token: str):
+    def __init__(self, bot_token: str, rate_limiter: TelegramRateLimiter | None = None):
         self.bot_token = bot_token
-        self.base_url = f"https://api.telegram.org/bot{bot_token}"
+        self.api_root = settings.telegram_api_base_url.rstrip("/")
+        self.base_url = f"{self.api_root}/bot{bot_token}"
+        self.rate_limiter = rate_limiter or telegram_rate_limiter
+        self.max_retries = settings.telegram_max_retries
+
+    @staticmethod
+    def _retry_after(response: httpx.Response) -> float:
+        try:
+            return float(response.json().get("parameters", {}).get("retry_after", 1))
+        except Exception:
+            return 1.0
+
+    async def _send_to_chat(self, chat_id: int, method: str, timeout: float, **request_kwargs) -> TelegramResponse:
+        async with self.rate_limiter.chat_slot(chat_id):
+            attempt = 0
+            while True:
+                with upstream_call(telegram_api_seconds, "telegram", method):
+                    async with httpx.AsyncClient(timeout=timeout) as client:
+                        response = await client.post(f"{self.base_url}/{method}", **request_kwargs)
+                    if response.status_code != 429 or attempt >= self.max_retries:
+                        response.raise_for_status()
+                        return TelegramResponse(**response.json())
+
+                attempt += 1
+                upstream_errors.inc("telegram", "429")
+                # Still holding the chat slot, so later messages for this chat wait behind the retry.
+                await asyncio.sleep(self._retry_after(response))
 
     async def set_webhook(self, webhook_url: str) -> None:
-        async with httpx.AsyncClient(timeout=10) as client:
-            await client.post(f"{self.base_url}/setWebhook", json={"url": webhook_url})
+        with upstream_call(telegram_api_seconds, "telegram", "setWebhook"):
+            async with httpx.AsyncClient(timeout=10) as client:
+                await client.post(f"{self.base_url}/setWebhook", json={"url": webhook_url})
+
+    async def delete_webhook(self) -> None:
+        with upstream_call(telegram_api_seconds, "telegram", "deleteWebhook"):
+            async with httpx.AsyncClient(timeout=10) as client:
+                response = await client.post(f"{self.base_url}/deleteWebhook")
+                response.raise_for_status()
 
-    async def send_message(self, chat_id: int, text: str, reply_markup: dict | None = None) -> TelegramResponse:
+    async def get_updates(
+        self,
+        offset: int,
+        limit: int,
+        timeout: int,
+        allowed_updates: list[str] | None = None,
+    ) -> list[dict]:
+        payload = {"offset": offset, "limit": limit, "timeout": timeout}
+        if allowed_updates is not None:
+            payload["allowed_updates"] = allowed_updates
+
+        # The HTTP timeout must outlast the long-poll window Telegram holds the request open for.
+        async with httpx.AsyncClient(timeout=timeout + 10) as client:
+            response = await client.post(f"{self.base_url}/getUpdates", json=payload)
+            response.raise_for_status()
+            return TelegramResponse(**response.json()).result or []
+
+    async def send_message(self, chat_id: int, text: str, reply_markup: dict | str | None = None) -> TelegramResponse:
         payload = {"chat_id": chat_id, "text": text}
         if reply_markup:
             payload["reply_markup"] = reply_markup
 
-        async with httpx.AsyncClient(timeout=15) as client:
-            response = await client.post(f"{self.base_url}/sendMessage", json=payload)
-            response.raise_for_status()
-            return TelegramResponse(**response.json())
+        return await self._send_to_chat(chat_id, "sendMessage", timeout=15, json=payload)
 
     async def answer_callback_query(self, callback_query_id: str) -> None:
         payload = {"callback_query_id": callback_query_id}
-        async with httpx.AsyncClient(timeout=10) as client:
-            await client.post(f"{self.base_url}/answerCallbackQuery", json=payload)
+        with upstream_call(telegram_api_seconds, "telegram", "answerCallbackQuery"):
+            async with httpx.AsyncClient(timeout=10) as client:
+                await client.post(f"{self.base_url}/answerCallbackQuery", json=payload)
 
     async def send_photo_bytes(
         self,
@@ -40,19 +104,25 @@ class TelegramAPI:
 
         files = {"photo": (filename, image_bytes, "image/png")}
 
-        async with httpx.AsyncClient(timeout=60) as client:
-            response = await client.post(f"{self.base_url}/sendPhoto", data=data, files=files)
-            response.raise_for_status()
-            return TelegramResponse(**response.json())
+        return await self._send_to_chat(chat_id, "sendPhoto", timeout=60, data=data, files=files)
+
+    async def call_deferred(self, deferred: DeferredMethod) -> None:
+        if deferred.method == "sendMessage":
+            await self.send_message(**deferred.params)
+        elif deferred.method == "answerCallbackQuery":
+            await self.answer_callback_query(deferred.params["callback_query_id"])
+        else:
+            raise ValueError(f"Unsupported deferred method: {deferred.method}")
 
     async def get_file_download_url(self, file_id: str) -> str:
-        async with httpx.AsyncClient(timeout=20) as client:
-            response = await client.get(f"{self.base_url}/getFile", params={"file_id": file_id})
-            response.raise_for_status()
-            payload = TelegramResponse(**response.json())
+        with upstream_call(telegram_api_seconds, "telegram", "getFile"):
+            async with httpx.AsyncClient(timeout=20) as client:
+                response = await client.get(f"{self.base_url}/getFile", params={"file_id": file_id})
+                response.raise_for_status()
+                payload = TelegramResponse(**response.json())
 
         file_path = (payload.result or {}).get("file_path")
         if not file_path:
             raise RuntimeError("Telegram getFile did not return file_path")
 
-        return f"https://api.telegram.org/file/bot{self.bot_token}/{file_path}"
+        return f"{self.api_root}/file/bot{self.bot_token}/{file_path}"
@@ -0,0 +1,40 @@
+import json
+
+from pydantic import ValidationError
+
+from app.schemas.telegram import TelegramUpdate
+
+try:
+    import orjson
+
+    loads = orjson.loads
+except ImportError:
+    loads = json.loads
+
+# Update types BotService acts on; everything else (edited messages, channel posts, member updates...) is acked unread.
+RELEVANT_UPDATE_TYPES = ("message", "callback_query")
+
+
+class MalformedUpdate(ValueError):
+    pass
+
+
+def update_from_dict(data: dict) -> TelegramUpdate | None:
+    if not any(data.get(update_type) is not None for update_type in RELEVANT_UPDATE_TYPES):
+        return None
+
+    # The schemas declare only the fields BotService reads; the rest of the payload is skipped, not materialized.
+    try:
+        return TelegramUpdate.model_validate(data)
+    except ValidationError as exc:
+        raise MalformedUpdate(str(exc)) from exc
+
+
+def parse_update(body: bytes) -> TelegramUpdate | None:
+    try:
+        data = loads(body)
+    except ValueError as exc:
+        raise MalformedUpdate(str(exc)) from exc
+    if not isinstance(data, dict):
+        raise MalformedUpdate("update body is not an object")
+    return update_from_dict(data)
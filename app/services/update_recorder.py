@@ -0,0 +1,150 @@
+import asyncio
+import gzip
+import hashlib
+import json
+import logging
+import os
+import secrets
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+from app.core.config import settings
+from app.core.i18n import MENU_INDEX
+from app.services.update_parser import loads
+
+logger = logging.getLogger(__name__)
+
+FLUSH_INTERVAL_SECONDS = 1.0
+MAX_BUFFERED = 50_000
+SEGMENT_MAX_BYTES = 64 * 1024 * 1024
+
+SCRUB_TEXT_KEYS = {"text", "caption", "first_name", "last_name", "username", "title", "phone_number", "bio", "address", "vcard"}
+HASH_STRING_KEYS = {"file_id", "file_unique_id", "foursquare_id", "google_place_id"}
+COORDINATE_KEYS = {"latitude", "longitude"}
+# ~11 km: enough to tell a location message from a venue, not enough to find anyone.
+COORDINATE_DECIMALS = 1
+
+
+class UpdateRecorder:
+    def __init__(
+        self,
+        enabled: bool = settings.update_recorder_enabled,
+        directory: str = settings.update_recorder_dir,
+        segment_seconds: int = settings.update_recorder_segment_seconds,
+        salt: str = settings.update_recorder_salt,
+    ):
+        self.enabled = enabled
+        self.directory = Path(directory)
+        self.segment_seconds = segment_seconds
+        # Without a configured salt, ids stay linkable within one process only.
+        self.salt = (salt or secrets.token_hex(16)).encode()
+        self.buffer: list[tuple[float, bytes]] = []
+        self.dropped = 0
+        self.segment_path: Path | None = None
+        self.segment_started_at = 0.0
+
+    def record(self, body: bytes) -> None:
+        # Hot path: keep the raw bytes; parsing, scrubbing and compression happen in the flusher.
+        if not self.enabled:
+            return
+        if len(self.buffer) >= MAX_BUFFERED:
+            self.dropped += 1
+            return
+        self.buffer.append((time.time(), body))
+
+    def _anon_id(self, value: int) -> int:
+        digest = hashlib.blake2b(str(value).encode(), key=self.salt, digest_size=8).digest()
+        anon = int.from_bytes(digest, "big") % 10**10 + 10**9
+        # Keep the sign: negative ids are groups and channels.
+        return -anon if value < 0 else anon
+
+    def _anon_string(self, value: str) -> str:
+        return hashlib.blake2b(value.encode(), key=self.salt, digest_size=12).hexdigest()
+
+    @staticmethod
+    def _shape(value: str) -> str:
+        return "".join("x" if ch.isalpha() else "0" if ch.isdigit() else ch for ch in value)
+
+    @classmethod
+    def _scrub_text(cls, value: str) -> str:
+        # Menu labels and command tokens drive routing, so they survive; everything else (including
+        # "/start <payload>" arguments) keeps only its shape and length.
+        if value in MENU_INDEX:
+            return value
+        if value.startswith("/"):
+            command = value.split(maxsplit=1)[0]
+            return command + cls._shape(value[len(command) :])
+        return cls._shape(value)
+
+    @staticmethod
+    def _is_id_key(key: str) -> bool:
+        return key in {"id", "chat_id"} or key.endswith("user_id")
+
+    def anonymize(self, node):
+        if isinstance(node, dict):
+            result = {}
+            for key, value in node.items():
+                if self._is_id_key(key) and isinstance(value, int):
+                    result[key] = self._anon_id(value)
+                elif key.endswith("user_ids") and isinstance(value, list):
+                    result[key] = [self._anon_id(item) if isinstance(item, int) else item for item in value]
+                elif key in COORDINATE_KEYS and isinstance(value, (int, float)):
+                    result[key] = round(value, COORDINATE_DECIMALS)
+                elif key in SCRUB_TEXT_KEYS and isinstance(value, str):
+                    result[key] = self._scrub_text(value)
+                elif key in HASH_STRING_KEYS and isinstance(value, str):
+                    result[key] = self._anon_string(value)
+                else:
+                    result[key] = self.anonymize(value)
+            return result
+        if isinstance(node, list):
+            return [self.anonymize(item) for item in node]
+        return node
+
+    def _segment_for(self, now: float) -> Path:
+        if (
+            self.segment_path is None
+            or now - self.segment_started_at >= self.segment_seconds
+            or (self.segment_path.exists() and self.segment_path.stat().st_size >= SEGMENT_MAX_BYTES)
+        ):
+            stamp = datetime.fromtimestamp(now, tz=timezone.utc).strftime("%Y%m%dT%H%M%S")
+            self.segment_path = self.directory / f"updates-{stamp}-{os.getpid()}.ndjson.gz"
+            self.segment_started_at = now
+        return self.segment_path
+
+    def _write(self, batch: list[tuple[float, bytes]]) -> None:
+        lines = []
+        for arrived_at, body in batch:
+            try:
+                update = self.anonymize(loads(body))
+            except ValueError:
+                continue
+            lines.append(json.dumps({"t": round(arrived_at, 6), "update": update}, ensure_ascii=False))
+        if not lines:
+            return
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        # Each flush appends one gzip member; gzip readers stream multi-member files transparently.
+        with gzip.open(self._segment_for(batch[0][0]), "at", encoding="utf-8") as handle:
+            handle.write("\n".join(lines) + "\n")
+
+    async def flush(self) -> None:
+        if not self.buffer:
+            return
+        batch, self.buffer = self.buffer, []
+        await asyncio.to_thread(self._write, batch)
+
+    async def run_forever(self) -> None:
+        try:
+            while True:
+                await asyncio.sleep(FLUSH_INTERVAL_SECONDS)
+                try:
+                    await self.flush()
+                except Exception:
+                    logger.exception("Update recorder flush failed")
+        finally:
+            await self.flush()
+
+
+update_recorder = UpdateRecorder()
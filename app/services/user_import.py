@@ -0,0 +1,245 @@
+import csv
+import json
+import re
+import time
+from collections import deque
+from collections.abc import AsyncIterator
+from dataclasses import dataclass
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.plans import normalize_plan
+from app.services.limits import month_key_now
+
+STAGING_TABLE = "users_import_staging"
+MONTH_KEY_RE = re.compile(r"\d{4}-(0[1-9]|1[0-2])")
+# Column bounds; a value outside them would make asyncpg abort the whole COPY instead of rejecting one row.
+BIGINT_MAX = 2**63 - 1
+INTEGER_MIN, INTEGER_MAX = -(2**31), 2**31 - 1
+
+INT_COLUMNS = [
+    "monthly_requests_used",
+    "monthly_tokens_used",
+    "monthly_images_used",
+    "monthly_photo_analyses_used",
+    "monthly_long_texts_used",
+    "bonus_image_credits",
+]
+# Columns not in the import file that must still be filled for new users.
+DAILY_COLUMNS = [
+    "daily_requests_used",
+    "daily_images_used",
+    "daily_photo_analyses_used",
+    "daily_long_texts_used",
+]
+STAGING_COLUMNS = ["seq", "telegram_id", "username", "first_name", "language", "plan", "is_banned", "month_key", *INT_COLUMNS]
+SYNC_COLUMNS = STAGING_COLUMNS[2:]
+
+CREATE_STAGING_SQL = f"""
+CREATE TEMP TABLE {STAGING_TABLE} (
+    seq BIGINT NOT NULL,
+    telegram_id BIGINT NOT NULL,
+    username VARCHAR(255),
+    first_name VARCHAR(255),
+    language VARCHAR(8),
+    plan VARCHAR(16) NOT NULL,
+    is_banned BOOLEAN NOT NULL,
+    month_key VARCHAR(7),
+    {", ".join(f"{column} INTEGER" for column in INT_COLUMNS)}
+) ON COMMIT DROP
+"""
+
+
+def _merge_sql() -> str:
+    # Empty language/month_key/counter cells keep the stored value, as in the Sheets pull.
+    insert_columns = ["telegram_id", *SYNC_COLUMNS, "day_key", *DAILY_COLUMNS]
+    select_values = [
+        "s.telegram_id",
+        "s.username",
+        "s.first_name",
+        "COALESCE(s.language, u.language, 'en')",
+        "s.plan",
+        "s.is_banned",
+        "COALESCE(s.month_key, u.month_key, :month_key)",
+        *(f"COALESCE(s.{column}, u.{column}, 0)" for column in INT_COLUMNS),
+        "COALESCE(u.day_key, '1970-01-01')",
+        *(f"COALESCE(u.{column}, 0)" for column in DAILY_COLUMNS),
+    ]
+    set_clause = ", ".join(f"{column} = EXCLUDED.{column}" for column in SYNC_COLUMNS)
+    current = ", ".join(f"users.{column}" for column in SYNC_COLUMNS)
+    incoming = ", ".join(f"EXCLUDED.{column}" for column in SYNC_COLUMNS)
+    return f"""
+WITH latest AS (
+    SELECT DISTINCT ON (telegram_id) * FROM {STAGING_TABLE} ORDER BY telegram_id, seq DESC
+), upserted AS (
+    INSERT INTO users ({", ".join(insert_columns)})
+    SELECT {", ".join(select_values)}
+    FROM latest s LEFT JOIN users u ON u.telegram_id = s.telegram_id
+    ON CONFLICT (telegram_id) DO UPDATE SET {set_clause}, updated_at = now()
+    WHERE ({current}) IS DISTINCT FROM ({incoming})
+    RETURNING (xmax = 0) AS inserted
+)
+SELECT
+    count(*) FILTER (WHERE inserted) AS created,
+    count(*) FILTER (WHERE NOT inserted) AS updated,
+    (SELECT count(*) FROM latest) AS distinct_users
+FROM upserted
+"""
+
+
+MERGE_SQL = _merge_sql()
+
+
+@dataclass
+class ImportResult:
+    rows_read: int = 0
+    rows_rejected: int = 0
+    distinct_users: int = 0
+    created: int = 0
+    updated: int = 0
+    elapsed_seconds: float = 0.0
+    rows_per_sec: float = 0.0
+
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    buffer = b""
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            yield line.decode("utf-8-sig").rstrip("\r")
+    if buffer:
+        yield buffer.decode("utf-8-sig").rstrip("\r")
+
+
+def _int_or_none(value) -> int | None:
+    try:
+        return int(str(value).strip())
+    except Exception:
+        return None
+
+
+def _bool_from_value(value) -> bool:
+    if isinstance(value, bool):
+        return value
+    return str(value or "").strip().lower() in {"1", "true", "yes", "y"}
+
+
+def _text_or_none(value, max_length: int) -> str | None:
+    text_value = str(value if value is not None else "").strip()
+    return text_value[:max_length] or None
+
+
+class _LineFeed:
+    # Sync iterator for a single csv.reader; lines are pushed from the async stream one record at a time.
+    def __init__(self):
+        self.lines: deque[str] = deque()
+
+    def __iter__(self):
+        return self
+
+    def __next__(self) -> str:
+        if not self.lines:
+            raise StopIteration
+        return self.lines.popleft()
+
+
+class UserImportService:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    @staticmethod
+    def _to_record(seq: int, data: dict) -> tuple | None:
+        telegram_id = _int_or_none(data.get("telegram_id"))
+        if telegram_id is None or not 0 < telegram_id <= BIGINT_MAX:
+            return None
+        counters = [_int_or_none(data.get(column)) for column in INT_COLUMNS]
+        if any(value is not None and not INTEGER_MIN <= value <= INTEGER_MAX for value in counters):
+            return None
+        # Empty keeps the stored month; anything else must be YYYY-MM or the limit resets misfire.
+        month_key = _text_or_none(data.get("month_key"), 32)
+        if month_key is not None and not MONTH_KEY_RE.fullmatch(month_key):
+            return None
+
+        return (
+            seq,
+            telegram_id,
+            _text_or_none(data.get("username"), 255),
+            _text_or_none(data.get("first_name"), 255),
+            _text_or_none(data.get("language"), 8),
+            normalize_plan(data.get("plan")),
+            _bool_from_value(data.get("is_banned")),
+            month_key,
+            *counters,
+        )
+
+    async def _records(self, lines: AsyncIterator[str], fmt: str, result: ImportResult) -> AsyncIterator[tuple]:
+        header: list[str] | None = None
+        feed = _LineFeed()
+        reader = csv.reader(feed)
+        pending_quotes = 0
+        async for line in lines:
+            if not pending_quotes and not line.strip():
+                continue
+
+            if fmt == "csv":
+                # A quoted field may span lines: hand the reader a record only once its quotes are balanced.
+                feed.lines.append(line + "\n")
+                pending_quotes += line.count('"')
+                if pending_quotes % 2:
+                    continue
+                pending_quotes = 0
+                values = next(reader)
+                if header is None:
+                    header = [value.strip() for value in values]
+                    if "telegram_id" not in header:
+                        raise ValueError("CSV header must contain telegram_id")
+                    continue
+                data = dict(zip(header, values))
+            else:
+                try:
+                    data = json.loads(line)
+                except ValueError:
+                    data = None
+                if not isinstance(data, dict):
+                    result.rows_read += 1
+                    result.rows_rejected += 1
+                    continue
+
+            result.rows_read += 1
+            record = self._to_record(result.rows_read, data)
+            if record is None:
+                result.rows_rejected += 1
+                continue
+            yield record
+
+        if pending_quotes:
+            raise ValueError("CSV ends inside a quoted field")
+
+    async def import_lines(self, lines: AsyncIterator[str], fmt: str) -> ImportResult:
+        if fmt not in {"csv", "ndjson"}:
+            raise ValueError("Format must be csv or ndjson")
+
+        started_at = time.perf_counter()
+        result = ImportResult()
+
+        conn = await self.db.connection()
+        await conn.execute(text(CREATE_STAGING_SQL))
+        raw = await conn.get_raw_connection()
+        await raw.driver_connection.copy_records_to_table(
+            STAGING_TABLE,
+            records=self._records(lines, fmt, result),
+            columns=STAGING_COLUMNS,
+        )
+
+        row = (await conn.execute(text(MERGE_SQL), {"month_key": month_key_now()})).one()
+        await self.db.commit()
+
+        result.created = int(row.created or 0)
+        result.updated = int(row.updated or 0)
+        result.distinct_users = int(row.distinct_users or 0)
+        elapsed = time.perf_counter() - started_at
+        result.elapsed_seconds = round(elapsed, 3)
+        result.rows_per_sec = round(result.rows_read / elapsed, 1) if elapsed > 0 else 0.0
+        return result
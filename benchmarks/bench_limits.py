@@ -0,0 +1,62 @@
+from app.services.limits import (
+    precheck_and_consume_image_request,
+    precheck_and_consume_long_text_request,
+    precheck_and_consume_photo_analysis_request,
+    precheck_and_consume_request,
+    rollback_image_request,
+    rollback_long_text_request,
+    rollback_photo_analysis_request,
+    rollback_request,
+)
+from benchmarks.harness import make_user, run_coroutine
+
+
+# Each case consumes and rolls back so the user stays in the same state across iterations.
+def bench_request_consume_rollback(benchmark):
+    user = make_user()
+
+    def consume():
+        result = run_coroutine(precheck_and_consume_request(user, 120))
+        run_coroutine(rollback_request(user))
+        return result
+
+    assert benchmark(consume).allowed
+
+
+def bench_request_rejected_monthly(benchmark):
+    user = make_user(plan="free")
+    user.monthly_requests_used = 50
+    assert benchmark(lambda: run_coroutine(precheck_and_consume_request(user, 120))).reason == "monthly"
+
+
+def bench_long_text_consume_rollback(benchmark):
+    user = make_user()
+
+    def consume():
+        result = run_coroutine(precheck_and_consume_long_text_request(user))
+        run_coroutine(rollback_long_text_request(user))
+        return result
+
+    assert benchmark(consume).allowed
+
+
+def bench_image_consume_rollback(benchmark):
+    user = make_user()
+
+    def consume():
+        result = run_coroutine(precheck_and_consume_image_request(user))
+        run_coroutine(rollback_image_request(user, result.used_bonus_credit))
+        return result
+
+    assert benchmark(consume).allowed
+
+
+def bench_photo_consume_rollback(benchmark):
+    user = make_user()
+
+    def consume():
+        result = run_coroutine(precheck_and_consume_photo_analysis_request(user))
+        run_coroutine(rollback_photo_analysis_request(user))
+        return result
+
+    assert benchmark(consume).allowed
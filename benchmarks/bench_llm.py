@@ -0,0 +1,20 @@
+from app.services.llm import LLMService
+
+# A long multi-part answer: 200 output items with 20 text parts each (~1.5 MB of text).
+LARGE_PAYLOAD = {
+    "output": [
+        {
+            "type": "message",
+            "content": [
+                {"type": "output_text", "text": f"Paragraph {item}.{part}: " + "step by step explanation " * 15}
+                for part in range(20)
+            ]
+            + [{"type": "refusal", "refusal": ""}],
+        }
+        for item in range(200)
+    ]
+}
+
+
+def bench_extract_text_large(benchmark):
+    assert benchmark(LLMService._extract_text, LARGE_PAYLOAD).startswith("Paragraph 0.0")
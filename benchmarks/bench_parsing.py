@@ -0,0 +1,28 @@
+import json
+
+from app.schemas.telegram import TelegramUpdate
+from app.services.update_parser import parse_update
+from benchmarks.update_parsing import SAMPLES
+
+BODIES = {name: json.dumps(sample, ensure_ascii=False).encode("utf-8") for name, sample in SAMPLES.items()}
+
+
+def bench_pydantic_text_message(benchmark):
+    body = BODIES["text_message"]
+    assert benchmark(lambda: TelegramUpdate.model_validate(json.loads(body))).message
+
+
+def bench_parse_text_message(benchmark):
+    assert benchmark(parse_update, BODIES["text_message"]).message
+
+
+def bench_parse_photo_message(benchmark):
+    assert benchmark(parse_update, BODIES["photo_message"]).message.photo
+
+
+def bench_parse_callback_query(benchmark):
+    assert benchmark(parse_update, BODIES["callback_query"]).callback_query
+
+
+def bench_parse_ignored_update(benchmark):
+    assert benchmark(parse_update, BODIES["my_chat_member"]) is None
@@ -0,0 +1,23 @@
+from app.services.google_sheets_sync import GoogleSheetsSyncService
+from benchmarks.harness import make_user
+
+USER_COUNT = 100_000
+
+
+def _service() -> GoogleSheetsSyncService:
+    # Only the pure row helpers are timed; no session or Sheets client is needed.
+    return GoogleSheetsSyncService.__new__(GoogleSheetsSyncService)
+
+
+def bench_user_to_row_100k(benchmark):
+    service = _service()
+    users = [make_user(telegram_id=5_000_000 + index) for index in range(USER_COUNT)]
+    rows = benchmark(lambda: [service._user_to_row(user) for user in users])
+    assert len(rows) == USER_COUNT
+
+
+def bench_row_hash_100k(benchmark):
+    service = _service()
+    rows = [service._user_to_row(make_user(telegram_id=5_000_000 + index)) for index in range(USER_COUNT)]
+    hashes = benchmark(lambda: [service._row_hash(row) for row in rows])
+    assert len(hashes) == USER_COUNT
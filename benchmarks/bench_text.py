@@ -0,0 +1,36 @@
+from app.core.i18n import I18N, MENU_INDEX, t
+from app.services.menu import build_main_menu, main_menu_markup
+from app.services.prompts import build_llm_prompts
+
+MENU_TAP = I18N["menu_limit"]["pl"]
+USER_TEXT = "Explain Newton's second law with an everyday example and a short quiz"
+
+
+def bench_i18n_t(benchmark):
+    assert benchmark(t, "start_text", "uk")
+
+
+def bench_i18n_t_fallback_language(benchmark):
+    assert benchmark(t, "start_text", "unset") == t("start_text", "en")
+
+
+def bench_menu_index_hit(benchmark):
+    # Replaces is_menu_text/action_from_menu_text: one lookup for any language.
+    assert benchmark(MENU_INDEX.get, MENU_TAP) == ("menu_limit", "pl")
+
+
+def bench_menu_index_miss(benchmark):
+    assert benchmark(MENU_INDEX.get, USER_TEXT) is None
+
+
+def bench_build_llm_prompts(benchmark):
+    system_prompt, user_prompt = benchmark(build_llm_prompts, "explain_topic", "uk", user_input=USER_TEXT)
+    assert USER_TEXT in user_prompt
+
+
+def bench_build_main_menu(benchmark):
+    assert benchmark(build_main_menu, "kk")["keyboard"]
+
+
+def bench_main_menu_markup_cached(benchmark):
+    assert benchmark(main_menu_markup, "kk").startswith("{")
@@ -0,0 +1,94 @@
+import argparse
+import asyncio
+import sys
+
+from sqlalchemy import delete
+
+from app.core.i18n import t
+from app.db.session import SessionLocal, engine
+from app.db.statement_stats import StatementBudgetExceeded, statement_budget
+from app.models.query_log import QueryLog
+from app.models.user import User
+from app.schemas.telegram import TelegramUpdate
+from app.services.bot_logic import BotService
+from app.services.llm import LLMResult
+
+# Reserved for this check; its rows are deleted before and after a run.
+TELEGRAM_ID = 999_000_000_001
+# (label, message text, max SQL statements), run in order as one user's conversation. Day and month keys
+# are synced by the LLM step, so the last menu tap is the steady state every returning user sees.
+SCENARIOS = [
+    ("first /start", "/start", 2),  # SELECT user, INSERT user
+    ("menu tap, sets pending action", t("menu_explain", "en"), 2),  # SELECT, UPDATE pending_action
+    ("text to LLM", "What is photosynthesis?", 4),  # SELECT, UPDATE counters + INSERT query_log, UPDATE pending
+    ("menu tap, read only", t("menu_limit", "en"), 1),  # SELECT
+]
+
+
+class _TelegramStub:
+    async def send_message(self, chat_id: int, text: str, reply_markup=None) -> None:
+        pass
+
+    async def answer_callback_query(self, callback_query_id: str) -> None:
+        pass
+
+
+async def _generate(**kwargs) -> LLMResult:
+    return LLMResult(text="stub answer", input_tokens=50, output_tokens=20, total_tokens=70, model="stub")
+
+
+def _update(update_id: int, text: str) -> TelegramUpdate:
+    return TelegramUpdate.model_validate(
+        {
+            "update_id": update_id,
+            "message": {
+                "message_id": update_id,
+                "date": 0,
+                "chat": {"id": TELEGRAM_ID, "type": "private"},
+                "from": {"id": TELEGRAM_ID, "is_bot": False, "first_name": "Budget", "language_code": "en"},
+                "text": text,
+            },
+        }
+    )
+
+
+async def _cleanup() -> None:
+    async with SessionLocal() as db:
+        await db.execute(delete(QueryLog).where(QueryLog.telegram_id == TELEGRAM_ID))
+        await db.execute(delete(User).where(User.telegram_id == TELEGRAM_ID))
+        await db.commit()
+
+
+async def _run() -> list[str]:
+    failures = []
+    await _cleanup()
+    try:
+        for update_id, (label, text, budget) in enumerate(SCENARIOS, start=1):
+            # A fresh session per update, as the webhook handler uses.
+            async with SessionLocal() as db:
+                bot = BotService(db=db, telegram_api=_TelegramStub(), defer_replies=True)
+                bot.llm.generate = _generate
+                try:
+                    with statement_budget(budget, label) as stats:
+                        await bot.handle_update(_update(update_id, text))
+                except StatementBudgetExceeded as exc:
+                    failures.append(str(exc))
+            print(f"{label:32} {stats.statements:>3} statements (budget {budget}), {stats.db_ms:.1f} ms")
+    finally:
+        await _cleanup()
+        await engine.dispose()
+    return failures
+
+
+def main() -> None:
+    argparse.ArgumentParser(
+        description="SQL statement budgets per update path; needs DATABASE_URL pointing at a migrated database."
+    ).parse_args()
+    failures = asyncio.run(_run())
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
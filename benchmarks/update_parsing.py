@@ -0,0 +1,102 @@
+import argparse
+import json
+import timeit
+
+from app.schemas.telegram import TelegramUpdate
+from app.services.update_parser import parse_update
+
+SAMPLES = {
+    "text_message": {
+        "update_id": 900000001,
+        "message": {
+            "message_id": 1201,
+            "from": {"id": 5550001, "is_bot": False, "first_name": "Olena", "username": "olena_k", "language_code": "uk"},
+            "chat": {"id": 5550001, "first_name": "Olena", "username": "olena_k", "type": "private"},
+            "date": 1760000000,
+            "text": "Поясни теорему Піфагора простими словами",
+        },
+    },
+    "photo_message": {
+        "update_id": 900000002,
+        "message": {
+            "message_id": 1202,
+            "from": {"id": 5550002, "is_bot": False, "first_name": "Max", "language_code": "en"},
+            "chat": {"id": 5550002, "type": "private"},
+            "date": 1760000001,
+            "caption": "What is on this slide?",
+            "photo": [
+                {"file_id": f"AgACAgIAAxkBAAI{i}", "file_unique_id": f"AQAD{i}", "width": w, "height": w, "file_size": w * 90}
+                for i, w in enumerate([90, 320, 800, 1280])
+            ],
+        },
+    },
+    "callback_query": {
+        "update_id": 900000003,
+        "callback_query": {
+            "id": "4382bfdwdsb323b2d9",
+            "from": {"id": 5550003, "is_bot": False, "first_name": "Ana", "language_code": "es"},
+            "message": {
+                "message_id": 1203,
+                "from": {"id": 777000, "is_bot": True, "first_name": "Student Bot"},
+                "chat": {"id": 5550003, "type": "private"},
+                "date": 1760000002,
+                "text": "Choose a language",
+            },
+            "chat_instance": "-8812377",
+            "data": "set_lang:es",
+        },
+    },
+    "edited_message": {
+        "update_id": 900000004,
+        "edited_message": {
+            "message_id": 1204,
+            "from": {"id": 5550004, "is_bot": False, "first_name": "Ivan"},
+            "chat": {"id": 5550004, "type": "private"},
+            "date": 1760000003,
+            "edit_date": 1760000010,
+            "text": "typo fixed",
+        },
+    },
+    "my_chat_member": {
+        "update_id": 900000005,
+        "my_chat_member": {
+            "chat": {"id": 5550005, "type": "private"},
+            "from": {"id": 5550005, "is_bot": False, "first_name": "Eva"},
+            "date": 1760000004,
+            "old_chat_member": {"user": {"id": 777000, "is_bot": True, "first_name": "Student Bot"}, "status": "member"},
+            "new_chat_member": {"user": {"id": 777000, "is_bot": True, "first_name": "Student Bot"}, "status": "kicked"},
+        },
+    },
+}
+
+
+def _pydantic_parse(body: bytes) -> TelegramUpdate:
+    # What the webhook did before: stdlib JSON plus full validation of every update.
+    return TelegramUpdate.model_validate(json.loads(body))
+
+
+def run(number: int) -> dict[str, dict[str, float]]:
+    results = {}
+    for name, sample in SAMPLES.items():
+        body = json.dumps(sample, ensure_ascii=False).encode("utf-8")
+        baseline = min(timeit.repeat(lambda: _pydantic_parse(body), number=number, repeat=5)) / number
+        fast = min(timeit.repeat(lambda: parse_update(body), number=number, repeat=5)) / number
+        results[name] = {
+            "pydantic_us": round(baseline * 1e6, 2),
+            "fast_path_us": round(fast * 1e6, 2),
+            "speedup": round(baseline / fast, 1),
+        }
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Microbenchmark for webhook update parsing.")
+    parser.add_argument("--number", type=int, default=20000)
+    args = parser.parse_args()
+
+    for name, row in run(args.number).items():
+        print(f"{name:16} pydantic {row['pydantic_us']:8.2f} us   fast path {row['fast_path_us']:8.2f} us   x{row['speedup']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+import argparse
+import asyncio
+import gzip
+import heapq
+import json
+import time
+from collections import defaultdict
+from collections.abc import Iterator
+from datetime import datetime, timezone
+from pathlib import Path
+
+import httpx
+
+from app.core.i18n import MENU_INDEX
+from loadtest.webhook_load import Sample, summarize
+
+
+def parse_speed(value: str) -> float:
+    # "1", "1x", "10x" or "max" (0 = no pacing).
+    if value == "max":
+        return 0.0
+    speed = float(value.rstrip("x"))
+    if speed <= 0:
+        raise argparse.ArgumentTypeError("speed must be positive or 'max'")
+    return speed
+
+
+def segment_files(paths: list[Path]) -> list[Path]:
+    files: list[Path] = []
+    for path in paths:
+        files.extend(sorted(path.glob("*.ndjson.gz")) if path.is_dir() else [path])
+    return files
+
+
+def _segment_records(path: Path) -> Iterator[tuple[float, dict]]:
+    with gzip.open(path, "rt", encoding="utf-8") as handle:
+        for line in handle:
+            if line.strip():
+                record = json.loads(line)
+                yield record["t"], record["update"]
+
+
+def iter_records(files: list[Path]) -> Iterator[tuple[float, dict]]:
+    # Every worker writes its own segments, which overlap in time; interleave them by arrival.
+    return heapq.merge(*(_segment_records(path) for path in files), key=lambda record: record[0])
+
+
+def classify(update: dict) -> str:
+    if "callback_query" in update:
+        return "callback"
+    message = update.get("message")
+    if not message:
+        return "other"
+    if message.get("photo"):
+        return "photo"
+    text = message.get("text") or ""
+    if text.startswith("/"):
+        return "command"
+    if text in MENU_INDEX:
+        return "menu"
+    return "text" if text else "other"
+
+
+def user_key(update: dict) -> int:
+    for kind in ("message", "callback_query", "edited_message"):
+        item = update.get(kind)
+        if item:
+            sender = item.get("from") or item.get("chat") or {}
+            return sender.get("id", 0)
+    return 0
+
+
+class Replayer:
+    def __init__(self, args: argparse.Namespace):
+        self.args = args
+        self.samples: list[Sample] = []
+        self.in_flight = asyncio.Semaphore(args.max_in_flight)
+        self.user_locks: dict[int, asyncio.Lock] = defaultdict(asyncio.Lock)
+        self.late_starts = 0
+
+    async def _send(self, client: httpx.AsyncClient, update: dict) -> None:
+        # Per-user order is kept even when pacing is off or responses are slow.
+        async with self.user_locks[user_key(update)], self.in_flight:
+            started_at = time.perf_counter()
+            error = None
+            try:
+                response = await client.post(self.args.path, json=update)
+                if response.status_code >= 400:
+                    error = f"http_{response.status_code}"
+            except httpx.TimeoutException:
+                error = "timeout"
+            except httpx.HTTPError as exc:
+                error = type(exc).__name__
+            self.samples.append(Sample(classify(update), time.perf_counter() - started_at, error))
+
+    async def run(self, files: list[Path]) -> dict:
+        args = self.args
+        limits = httpx.Limits(max_connections=args.max_in_flight, max_keepalive_connections=args.max_in_flight)
+        started_wall = datetime.now(timezone.utc).isoformat()
+        tasks: set[asyncio.Task] = set()
+        async with httpx.AsyncClient(base_url=args.url, timeout=args.timeout, limits=limits) as client:
+            started_at = time.perf_counter()
+            first_t = None
+            recorded_span = 0.0
+            for index, (arrived_at, update) in enumerate(iter_records(files)):
+                if args.limit and index >= args.limit:
+                    break
+                first_t = arrived_at if first_t is None else first_t
+                recorded_span = max(recorded_span, arrived_at - first_t)
+                if args.speed:
+                    delay = started_at + (arrived_at - first_t) / args.speed - time.perf_counter()
+                    if delay > 0:
+                        await asyncio.sleep(delay)
+                    elif delay < -0.05:
+                        self.late_starts += 1
+                else:
+                    while len(tasks) >= args.max_in_flight * 4:
+                        await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                task = asyncio.create_task(self._send(client, update))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            if tasks:
+                await asyncio.wait(tasks)
+            elapsed = time.perf_counter() - started_at
+
+        by_type: dict[str, list[Sample]] = defaultdict(list)
+        for sample in self.samples:
+            by_type[sample.update_type].append(sample)
+        return {
+            "started_at": started_wall,
+            "config": {
+                "url": args.url,
+                "segments": [str(path) for path in files],
+                "speed": args.speed or "max",
+                "max_in_flight": args.max_in_flight,
+            },
+            "recorded_span_seconds": round(recorded_span, 3),
+            "elapsed_seconds": round(elapsed, 3),
+            "throughput_rps": round(len(self.samples) / elapsed, 2) if elapsed else 0.0,
+            "late_starts": self.late_starts,
+            "overall": summarize(self.samples),
+            "by_type": {name: summarize(items) for name, items in sorted(by_type.items())},
+        }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Replay recorded webhook segments against a local instance.")
+    parser.add_argument("paths", nargs="+", type=Path, help="segment files or directories of *.ndjson.gz")
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--secret", required=True, help="TELEGRAM_WEBHOOK_SECRET of the target instance")
+    parser.add_argument("--speed", type=parse_speed, default=1.0, help="1x (recorded pace), Nx, or max")
+    parser.add_argument("--max-in-flight", type=int, default=500)
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--limit", type=int, default=0, help="stop after this many updates")
+    parser.add_argument("--json-out", default="")
+    args = parser.parse_args()
+    args.path = f"/telegram/webhook/{args.secret}"
+
+    files = segment_files(args.paths)
+    if not files:
+        parser.error("no segment files found")
+
+    report = asyncio.run(Replayer(args).run(files))
+    print(
+        f"replayed {report['overall']['count']} updates ({report['recorded_span_seconds']}s recorded) "
+        f"in {report['elapsed_seconds']}s -> {report['throughput_rps']} updates/s, late starts {report['late_starts']}"
+    )
+    for name, row in [*report["by_type"].items(), ("ALL", report["overall"])]:
+        print(
+            f"{name:10} {row['count']:>7} err {row['error_rate'] * 100:>6.2f}%  "
+            f"p50 {row['p50_ms']:>8.1f}  p95 {row['p95_ms']:>8.1f}  p99 {row['p99_ms']:>8.1f} ms"
+        )
+    if args.json_out:
+        with open(args.json_out, "w", encoding="utf-8") as handle:
+            json.dump(report, handle, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,275 @@
+import argparse
+import asyncio
+import base64
+import json
+import random
+import re
+import time
+from collections import Counter
+from dataclasses import dataclass
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+
+# 1x1 transparent PNG, returned for generated images and file downloads.
+PNG_1PX = base64.b64decode(
+    "iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAYAAAAfFcSJAAAADUlEQVR42mNkYPhfDwAChwGA60e6kgAAAABJRU5ErkJggg=="
+)
+MULTIPART_FIELD = re.compile(rb'name="([^"]+)"\r\n\r\n([^\r]*)\r\n')
+STUB_ANSWER = (
+    "Here is a short explanation.\n"
+    "- Key idea one\n"
+    "- Key idea two\n"
+    "- Worked example with steps\n"
+    "Quiz: 1) What is the key idea? 2) Give an example. 3) Check your answer."
+)
+
+
+@dataclass
+class Latency:
+    kind: str = "fixed"
+    a: float = 0.0
+    b: float = 0.0
+
+    def sample(self) -> float:
+        if self.kind == "uniform":
+            return random.uniform(self.a, self.b)
+        if self.kind == "lognormal":
+            # a: median seconds, b: sigma; long right tail like real LLM calls.
+            return random.lognormvariate(0, self.b) * self.a
+        if self.kind == "exp":
+            return random.expovariate(1 / self.a) if self.a > 0 else 0.0
+        return self.a
+
+
+def parse_latency(spec: str) -> Latency:
+    # "fixed:0.05", "uniform:0.02,0.1", "lognormal:0.8,0.5" (median, sigma), "exp:0.2" (mean).
+    kind, _, args = spec.partition(":")
+    values = [float(part) for part in args.split(",") if part] or [0.0]
+    if kind not in {"fixed", "uniform", "lognormal", "exp"}:
+        raise argparse.ArgumentTypeError(f"Unknown latency distribution: {kind}")
+    return Latency(kind=kind, a=values[0], b=values[1] if len(values) > 1 else 0.0)
+
+
+@dataclass
+class UpstreamProfile:
+    latency: Latency
+    error_rate: float = 0.0
+    rate_limit_rate: float = 0.0
+    retry_after: int = 1
+
+    def fault(self) -> int | None:
+        roll = random.random()
+        if roll < self.rate_limit_rate:
+            return 429
+        if roll < self.rate_limit_rate + self.error_rate:
+            return 500
+        return None
+
+
+class StubState:
+    def __init__(self, telegram: UpstreamProfile, openai: UpstreamProfile, stream_chunk_delay: float):
+        self.telegram = telegram
+        self.openai = openai
+        self.stream_chunk_delay = stream_chunk_delay
+        self.calls: Counter[str] = Counter()
+        self.faults: Counter[str] = Counter()
+        self.started_at = time.time()
+        self.message_id = 0
+
+
+def _telegram_fault(state: StubState, method: str) -> JSONResponse | None:
+    status = state.telegram.fault()
+    if status is None:
+        return None
+    state.faults[f"telegram.{method}.{status}"] += 1
+    if status == 429:
+        retry_after = state.telegram.retry_after
+        return JSONResponse(
+            {
+                "ok": False,
+                "error_code": 429,
+                "description": f"Too Many Requests: retry after {retry_after}",
+                "parameters": {"retry_after": retry_after},
+            },
+            status_code=429,
+        )
+    return JSONResponse({"ok": False, "error_code": 500, "description": "Internal Server Error"}, status_code=500)
+
+
+def _openai_fault(state: StubState, endpoint: str) -> JSONResponse | None:
+    status = state.openai.fault()
+    if status is None:
+        return None
+    state.faults[f"openai.{endpoint}.{status}"] += 1
+    headers = {"retry-after": str(state.openai.retry_after)} if status == 429 else None
+    message = "Rate limit reached" if status == 429 else "The server had an error"
+    return JSONResponse({"error": {"message": message, "type": "stub_error"}}, status_code=status, headers=headers)
+
+
+async def _read_params(request: Request) -> dict:
+    content_type = request.headers.get("content-type", "")
+    if content_type.startswith("application/json"):
+        return await request.json()
+    if content_type.startswith("multipart/form-data"):
+        # Only the short text fields matter here (chat_id, caption); skip a multipart parser dependency.
+        body = await request.body()
+        return {
+            match.group(1).decode(): match.group(2).decode("utf-8", "replace")
+            for match in MULTIPART_FIELD.finditer(body)
+        }
+    return dict(request.query_params)
+
+
+def _telegram_result(state: StubState, method: str, params: dict):
+    if method in {"sendMessage", "sendPhoto"}:
+        state.message_id += 1
+        chat_id = int(params.get("chat_id") or 0)
+        result = {"message_id": state.message_id, "date": int(time.time()), "chat": {"id": chat_id, "type": "private"}}
+        if "text" in params:
+            result["text"] = params["text"]
+        return result
+    if method == "getFile":
+        file_id = params.get("file_id", "file")
+        return {"file_id": file_id, "file_unique_id": file_id[-8:], "file_size": len(PNG_1PX), "file_path": f"photos/{file_id}.png"}
+    if method == "getMe":
+        return {"id": 777000, "is_bot": True, "first_name": "Stub Bot", "username": "stub_bot"}
+    return True
+
+
+async def _stream_response(state: StubState, payload: dict):
+    model = payload.get("model", "stub-model")
+    response_id = f"resp_stub_{state.calls['openai.responses']}"
+    words = STUB_ANSWER.split(" ")
+
+    def event(data: dict) -> str:
+        return f"event: {data['type']}\ndata: {json.dumps(data)}\n\n"
+
+    yield event({"type": "response.created", "response": {"id": response_id, "model": model, "status": "in_progress"}})
+    for index, word in enumerate(words):
+        await asyncio.sleep(state.stream_chunk_delay)
+        delta = word if index == 0 else f" {word}"
+        yield event({"type": "response.output_text.delta", "item_id": "msg_stub", "output_index": 0, "delta": delta})
+    yield event({"type": "response.output_text.done", "item_id": "msg_stub", "output_index": 0, "text": STUB_ANSWER})
+    yield event({"type": "response.completed", "response": _response_body(payload, model, response_id)})
+
+
+def _response_body(payload: dict, model: str, response_id: str) -> dict:
+    input_chars = len(json.dumps(payload.get("input", "")))
+    max_output = int(payload.get("max_output_tokens") or 512)
+    output_tokens = min(len(STUB_ANSWER) // 4, max_output)
+    input_tokens = max(1, input_chars // 4)
+    return {
+        "id": response_id,
+        "object": "response",
+        "status": "completed",
+        "model": model,
+        "output": [
+            {
+                "type": "message",
+                "id": "msg_stub",
+                "role": "assistant",
+                "content": [{"type": "output_text", "text": STUB_ANSWER}],
+            }
+        ],
+        "output_text": STUB_ANSWER,
+        "usage": {"input_tokens": input_tokens, "output_tokens": output_tokens, "total_tokens": input_tokens + output_tokens},
+    }
+
+
+def create_app(state: StubState) -> FastAPI:
+    app = FastAPI(title="Telegram/OpenAI stub")
+
+    @app.get("/stats")
+    async def stats() -> dict:
+        return {"uptime_seconds": round(time.time() - state.started_at, 1), "calls": state.calls, "faults": state.faults}
+
+    @app.api_route("/bot{token}/{method}", methods=["GET", "POST"])
+    async def telegram_method(token: str, method: str, request: Request):
+        params = await _read_params(request)
+        state.calls[f"telegram.{method}"] += 1
+        await asyncio.sleep(state.telegram.latency.sample())
+        if method == "getUpdates":
+            # Nothing ever arrives: hold the long poll like Telegram does, capped to keep shutdown quick.
+            await asyncio.sleep(min(float(params.get("timeout") or 0), 5.0))
+            return {"ok": True, "result": []}
+        fault = _telegram_fault(state, method)
+        if fault is not None:
+            return fault
+        return {"ok": True, "result": _telegram_result(state, method, params)}
+
+    @app.get("/file/bot{token}/{file_path:path}")
+    async def telegram_file(token: str, file_path: str):
+        state.calls["telegram.file"] += 1
+        await asyncio.sleep(state.telegram.latency.sample())
+        return Response(PNG_1PX, media_type="image/png")
+
+    @app.post("/v1/responses")
+    async def responses(request: Request):
+        payload = await request.json()
+        state.calls["openai.responses"] += 1
+        await asyncio.sleep(state.openai.latency.sample())
+        fault = _openai_fault(state, "responses")
+        if fault is not None:
+            return fault
+        if payload.get("stream"):
+            return StreamingResponse(_stream_response(state, payload), media_type="text/event-stream")
+        response_id = f"resp_stub_{state.calls['openai.responses']}"
+        return _response_body(payload, payload.get("model", "stub-model"), response_id)
+
+    @app.post("/v1/images/generations")
+    async def images(request: Request):
+        payload = await request.json()
+        state.calls["openai.images"] += 1
+        await asyncio.sleep(state.openai.latency.sample())
+        fault = _openai_fault(state, "images")
+        if fault is not None:
+            return fault
+        return {
+            "created": int(time.time()),
+            "model": payload.get("model", "stub-image-model"),
+            "data": [{"b64_json": base64.b64encode(PNG_1PX).decode("ascii")}],
+        }
+
+    return app
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Local stand-in for the Telegram Bot API and OpenAI endpoints.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8081)
+    parser.add_argument("--telegram-latency", type=parse_latency, default=parse_latency("lognormal:0.05,0.4"))
+    parser.add_argument("--telegram-error-rate", type=float, default=0.0)
+    parser.add_argument("--telegram-429-rate", type=float, default=0.0)
+    parser.add_argument("--openai-latency", type=parse_latency, default=parse_latency("lognormal:1.5,0.6"))
+    parser.add_argument("--openai-error-rate", type=float, default=0.0)
+    parser.add_argument("--openai-429-rate", type=float, default=0.0)
+    parser.add_argument("--retry-after", type=int, default=1)
+    parser.add_argument("--stream-chunk-delay", type=float, default=0.02)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    if args.seed is not None:
+        random.seed(args.seed)
+
+    state = StubState(
+        telegram=UpstreamProfile(
+            latency=args.telegram_latency,
+            error_rate=args.telegram_error_rate,
+            rate_limit_rate=args.telegram_429_rate,
+            retry_after=args.retry_after,
+        ),
+        openai=UpstreamProfile(
+            latency=args.openai_latency,
+            error_rate=args.openai_error_rate,
+            rate_limit_rate=args.openai_429_rate,
+            retry_after=args.retry_after,
+        ),
+        stream_chunk_delay=args.stream_chunk_delay,
+    )
+    uvicorn.run(create_app(state), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,324 @@
+import argparse
+import asyncio
+import itertools
+import json
+import random
+import time
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+
+import httpx
+
+from app.core.i18n import I18N, MENU_KEYS, SUPPORTED_LANGUAGES
+
+DEFAULT_MIX = "menu=30,text=35,photo=10,callback=15,command=10"
+USER_ID_BASE = 7_000_000_000
+# Pool stats are per worker; new connections may land on another one, so ask again for the same worker.
+POOL_SNAPSHOT_ATTEMPTS = 10
+
+TEXT_MODES = ("menu_explain", "menu_solve", "menu_summary")
+SAMPLE_TEXTS = [
+    "Photosynthesis",
+    "Explain Newton's second law with an example",
+    "2x + 5 = 17, find x",
+    "Solve: a train travels 120 km in 1.5 hours, what is its average speed?",
+    "The French Revolution began in 1789 and reshaped politics in Europe. " * 6,
+    "Що таке квадратне рівняння?",
+    "Объясни закон Ома простыми словами",
+    "¿Qué es la mitosis?",
+]
+
+
+def parse_mix(spec: str) -> dict[str, float]:
+    mix = {}
+    for part in spec.split(","):
+        name, _, weight = part.partition("=")
+        if name.strip() not in {"menu", "text", "photo", "callback", "command"}:
+            raise argparse.ArgumentTypeError(f"Unknown update type in mix: {name}")
+        mix[name.strip()] = float(weight)
+    return mix
+
+
+@dataclass
+class SimUser:
+    telegram_id: int
+    language: str
+    in_text_mode: bool = False
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+
+
+class UpdateFactory:
+    def __init__(self, rng: random.Random):
+        self.rng = rng
+        self.update_ids = itertools.count(1)
+        self.message_ids = itertools.count(1)
+
+    def _message(self, user: SimUser, **fields) -> dict:
+        return {
+            "update_id": next(self.update_ids),
+            "message": {
+                "message_id": next(self.message_ids),
+                "from": {"id": user.telegram_id, "is_bot": False, "first_name": "Load", "language_code": user.language},
+                "chat": {"id": user.telegram_id, "type": "private"},
+                "date": int(time.time()),
+                **fields,
+            },
+        }
+
+    def menu_tap(self, user: SimUser, key: str | None = None) -> dict:
+        key = key or self.rng.choice(MENU_KEYS)
+        return self._message(user, text=I18N[key][user.language])
+
+    def text(self, user: SimUser) -> dict:
+        return self._message(user, text=self.rng.choice(SAMPLE_TEXTS))
+
+    def photo(self, user: SimUser) -> dict:
+        file_id = f"load-photo-{self.rng.randrange(10**9)}"
+        sizes = [
+            {"file_id": f"{file_id}-{width}", "file_unique_id": f"u{width}", "width": width, "height": width, "file_size": width * 90}
+            for width in (90, 320, 800)
+        ]
+        return self._message(user, photo=sizes, caption=self.rng.choice(["", "What is on this slide?", "Solve this"]))
+
+    def command(self, user: SimUser) -> dict:
+        return self._message(user, text=self.rng.choice(["/start", "/help", "/cancel"]))
+
+    def callback(self, user: SimUser) -> dict:
+        data = self.rng.choice(
+            [f"set_lang:{user.language}", "set_plan:free", "set_plan:student", "set_plan:pro"]
+        )
+        return {
+            "update_id": next(self.update_ids),
+            "callback_query": {
+                "id": str(self.rng.randrange(10**12)),
+                "from": {"id": user.telegram_id, "is_bot": False, "first_name": "Load", "language_code": user.language},
+                "message": {
+                    "message_id": next(self.message_ids),
+                    "chat": {"id": user.telegram_id, "type": "private"},
+                    "date": int(time.time()),
+                    "text": "menu",
+                },
+                "chat_instance": "load",
+                "data": data,
+            },
+        }
+
+
+@dataclass
+class Sample:
+    update_type: str
+    latency: float
+    error: str | None
+
+
+def percentile(sorted_values: list[float], fraction: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(fraction * len(sorted_values) + 0.5) - 1))
+    return sorted_values[index]
+
+
+def summarize(samples: list[Sample]) -> dict:
+    latencies = sorted(sample.latency for sample in samples)
+    errors = Counter(sample.error for sample in samples if sample.error)
+    return {
+        "count": len(samples),
+        "errors": sum(errors.values()),
+        "error_rate": round(sum(errors.values()) / len(samples), 4) if samples else 0.0,
+        "error_kinds": dict(errors),
+        "mean_ms": round(sum(latencies) / len(latencies) * 1000, 2) if latencies else 0.0,
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 2),
+        "max_ms": round(latencies[-1] * 1000, 2) if latencies else 0.0,
+    }
+
+
+class LoadRunner:
+    def __init__(self, args: argparse.Namespace):
+        self.args = args
+        self.rng = random.Random(args.seed)
+        self.factory = UpdateFactory(self.rng)
+        languages = list(SUPPORTED_LANGUAGES)
+        self.users = [
+            SimUser(telegram_id=USER_ID_BASE + index, language=self.rng.choice(languages)) for index in range(args.users)
+        ]
+        self.mix_names = list(args.mix)
+        self.mix_weights = [args.mix[name] for name in self.mix_names]
+        self.samples: list[Sample] = []
+        self.in_flight = asyncio.Semaphore(args.max_in_flight)
+        self.late_starts = 0
+
+    async def _post(self, client: httpx.AsyncClient, update_type: str, body: dict) -> None:
+        async with self.in_flight:
+            started_at = time.perf_counter()
+            error = None
+            try:
+                response = await client.post(self.args.path, json=body)
+                if response.status_code >= 400:
+                    error = f"http_{response.status_code}"
+            except httpx.TimeoutException:
+                error = "timeout"
+            except httpx.HTTPError as exc:
+                error = type(exc).__name__
+            self.samples.append(Sample(update_type, time.perf_counter() - started_at, error))
+
+    async def _user_event(self, client: httpx.AsyncClient, user: SimUser, update_type: str) -> None:
+        # A simulated user sends one update at a time, like a person waiting for the reply.
+        async with user.lock:
+            if update_type == "text":
+                if not user.in_text_mode:
+                    await self._post(client, "menu", self.factory.menu_tap(user, self.rng.choice(TEXT_MODES)))
+                await self._post(client, "text", self.factory.text(user))
+                user.in_text_mode = False
+            elif update_type == "menu":
+                body = self.factory.menu_tap(user)
+                user.in_text_mode = body["message"]["text"] in {I18N[key][user.language] for key in TEXT_MODES}
+                await self._post(client, "menu", body)
+            elif update_type == "photo":
+                await self._post(client, "photo", self.factory.photo(user))
+            elif update_type == "command":
+                await self._post(client, "command", self.factory.command(user))
+                user.in_text_mode = False
+            else:
+                await self._post(client, "callback", self.factory.callback(user))
+
+    async def run(self) -> dict:
+        args = self.args
+        limits = httpx.Limits(max_connections=args.max_in_flight, max_keepalive_connections=args.max_in_flight)
+        started_wall = datetime.now(timezone.utc).isoformat()
+        async with httpx.AsyncClient(base_url=args.url, timeout=args.timeout, limits=limits) as client:
+            pool_before = await self._pool_status(client)
+            tasks: set[asyncio.Task] = set()
+            started_at = time.perf_counter()
+            next_at = started_at
+            total = int(args.rate * args.duration)
+            for _ in range(total):
+                # Open loop: arrivals follow the target rate (Poisson) regardless of response times.
+                next_at += self.rng.expovariate(args.rate)
+                delay = next_at - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                elif delay < -0.05:
+                    self.late_starts += 1
+                update_type = self.rng.choices(self.mix_names, weights=self.mix_weights)[0]
+                task = asyncio.create_task(self._user_event(client, self.rng.choice(self.users), update_type))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            if tasks:
+                await asyncio.wait(tasks)
+            elapsed = time.perf_counter() - started_at
+            pool_after = await self._pool_status(client, worker=pool_before.get("worker") if pool_before else None)
+
+        by_type: dict[str, list[Sample]] = defaultdict(list)
+        for sample in self.samples:
+            by_type[sample.update_type].append(sample)
+        return {
+            "started_at": started_wall,
+            "config": {
+                "url": args.url + args.path.replace(args.secret, "***"),
+                "rate": args.rate,
+                "duration": args.duration,
+                "users": args.users,
+                "mix": args.mix,
+                "max_in_flight": args.max_in_flight,
+                "seed": args.seed,
+            },
+            "elapsed_seconds": round(elapsed, 3),
+            "throughput_rps": round(len(self.samples) / elapsed, 2) if elapsed else 0.0,
+            "late_starts": self.late_starts,
+            "overall": summarize(self.samples),
+            "by_type": {name: summarize(items) for name, items in sorted(by_type.items())},
+            "db_pool": self._pool_delta(pool_before, pool_after),
+            "db_pool_note": self._pool_note(pool_before, pool_after),
+        }
+
+    async def _pool_status(self, client: httpx.AsyncClient, worker: str | None = None) -> dict | None:
+        if not self.args.admin_token:
+            return None
+        status = None
+        for _ in range(POOL_SNAPSHOT_ATTEMPTS if worker else 1):
+            try:
+                response = await client.get("/admin/db/pool", headers={"X-Admin-Token": self.args.admin_token})
+                response.raise_for_status()
+                status = response.json()
+            except httpx.HTTPError:
+                return None
+            if status.get("worker") == worker:
+                break
+        return status
+
+    @staticmethod
+    def _pool_note(before: dict | None, after: dict | None) -> str | None:
+        if before and after and before.get("worker") != after.get("worker"):
+            return f"snapshots came from different workers ({before.get('worker')}, {after.get('worker')}); no pool delta"
+        if before and after:
+            return f"worker {after.get('worker')} only; other workers are not included"
+        return None
+
+    @staticmethod
+    def _pool_delta(before: dict | None, after: dict | None) -> dict | None:
+        if not before or not after or before.get("worker") != after.get("worker"):
+            return None
+        waits = after["waits"] - before["waits"]
+        wait_total = after["wait_seconds_total"] - before["wait_seconds_total"]
+        return {
+            "checkouts": after["checkouts"] - before["checkouts"],
+            "waits": waits,
+            "wait_seconds_total": round(wait_total, 6),
+            "mean_wait_ms": round(wait_total / waits * 1000, 3) if waits else 0.0,
+            # The server keeps one max since process start.
+            "max_wait_ms_since_start": round(after["wait_seconds_max"] * 1000, 3),
+            "pool_size": after["size"],
+        }
+
+
+def print_report(report: dict) -> None:
+    print(
+        f"{report['overall']['count']} updates in {report['elapsed_seconds']}s "
+        f"-> {report['throughput_rps']} updates/s (target {report['config']['rate']}/s, late starts {report['late_starts']})"
+    )
+    print(f"{'type':10} {'count':>7} {'err%':>6} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9}")
+    for name, row in [*report["by_type"].items(), ("ALL", report["overall"])]:
+        print(
+            f"{name:10} {row['count']:>7} {row['error_rate'] * 100:>6.2f} "
+            f"{row['p50_ms']:>9.1f} {row['p95_ms']:>9.1f} {row['p99_ms']:>9.1f} {row['max_ms']:>9.1f}"
+        )
+    if report["overall"]["error_kinds"]:
+        print(f"errors: {report['overall']['error_kinds']}")
+    if report["db_pool_note"]:
+        print(f"db pool: {report['db_pool_note']}")
+    if report["db_pool"]:
+        pool = report["db_pool"]
+        print(
+            f"db pool: {pool['checkouts']} checkouts, {pool['waits']} waits, mean wait {pool['mean_wait_ms']} ms, "
+            f"max wait {pool['max_wait_ms_since_start']} ms (since start), size {pool['pool_size']}"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Drive synthetic Telegram updates at the webhook and report latency.")
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--secret", required=True, help="TELEGRAM_WEBHOOK_SECRET of the target instance")
+    parser.add_argument("--rate", type=float, default=50.0, help="target updates per second")
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds")
+    parser.add_argument("--users", type=int, default=2000)
+    parser.add_argument("--mix", type=parse_mix, default=parse_mix(DEFAULT_MIX))
+    parser.add_argument("--max-in-flight", type=int, default=500)
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--admin-token", default="", help="enables DB pool wait stats via /admin/db/pool")
+    parser.add_argument("--json-out", default="", help="write the machine-readable report to this path")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+    args.path = f"/telegram/webhook/{args.secret}"
+
+    report = asyncio.run(LoadRunner(args).run())
+    print_report(report)
+    if args.json_out:
+        with open(args.json_out, "w", encoding="utf-8") as handle:
+            json.dump(report, handle, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -4,4 +4,5 @@ set -euo pipefail
 HOST="${APP_HOST:-0.0.0.0}"
 PORT="${APP_PORT:-8000}"
 
+python -m app.migrate
 uvicorn app.main:app --host "${HOST}" --port "${PORT}" --reload
@@ -3,5 +3,16 @@ set -euo pipefail
 
 HOST="${APP_HOST:-0.0.0.0}"
 PORT="${PORT:-${APP_PORT:-8000}}"
+WORKERS="${WEB_CONCURRENCY:-$(nproc 2>/dev/null || echo 1)}"
 
-exec uvicorn app.main:app --host "${HOST}" --port "${PORT}"
+# Without Redis every worker would elect itself leader and run the outbox and broadcast loops.
+if [[ -z "${REDIS_URL:-}" && "${WORKERS}" -gt 1 ]]; then
+  echo "REDIS_URL is not set; starting 1 worker instead of ${WORKERS}" >&2
+  WORKERS=1
+fi
+
+python -m app.migrate
+# Jobs stop at SHUTDOWN_DRAIN_SECONDS (20); uvicorn cancels what is left at 25, before a 30 s platform kill.
+exec uvicorn app.main:app --host "${HOST}" --port "${PORT}" \
+  --workers "${WORKERS}" --loop uvloop --http httptools \
+  --timeout-graceful-shutdown 25